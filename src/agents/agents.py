@@ -1,19 +1,75 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+
+from langchain_core.tools import BaseTool
 from langgraph.prebuilt import create_react_agent
 
 from src.prompts import apply_prompt_template
 from src.llms.llm import get_llm_by_type
 from src.config.agents import AGENT_LLM_MAP
+from src.config.configuration import Configuration
+
+logger = logging.getLogger(__name__)
+
+# Cache for compiled agents, evicting the least recently used ones
+_agent_cache: OrderedDict[tuple, object] = OrderedDict()
+_agent_cache_lock = threading.Lock()
+AGENT_CACHE_SIZE = int(os.getenv("AGENT_CACHE_SIZE", "32"))
+
+
+def _get_tool_key(tool: BaseTool) -> tuple:
+    """Identify a tool by its name, a hash of its schema and the tool object itself.
+
+    The object identity is part of the key because tools can be bound to state
+    such as an MCP session, so equal schemas do not make tools interchangeable.
+    """
+    schema = json.dumps(
+        {"description": tool.description, "args": tool.args},
+        sort_keys=True,
+        default=str,
+    )
+    return (tool.name, hashlib.sha256(schema.encode()).hexdigest(), id(tool))
 
 
 # Create agents using configured LLM types
 def create_agent(agent_name: str, agent_type: str, tools: list, prompt_template: str):
-    """Factory function to create agents with consistent configuration."""
-    return create_react_agent(
+    """Factory function to create agents with consistent configuration.
+
+    Compiled agents are cached by agent, model and tool set, since compiling
+    the agent graph again for every step is a noticeable cost.
+    """
+    model = get_llm_by_type(AGENT_LLM_MAP[agent_type])
+    key = (
+        agent_name,
+        agent_type,
+        AGENT_LLM_MAP[agent_type],
+        id(model),
+        prompt_template,
+        tuple(_get_tool_key(tool) for tool in tools),
+    )
+    with _agent_cache_lock:
+        if key in _agent_cache:
+            _agent_cache.move_to_end(key)
+            return _agent_cache[key]
+
+    agent = create_react_agent(
         name=agent_name,
-        model=get_llm_by_type(AGENT_LLM_MAP[agent_type]),
+        model=model,
         tools=tools,
-        prompt=lambda state: apply_prompt_template(prompt_template, state),
+        prompt=lambda state, config: apply_prompt_template(
+            prompt_template, state, Configuration.from_runnable_config(config)
+        ),
     )
+    with _agent_cache_lock:
+        _agent_cache[key] = agent
+        while len(_agent_cache) > AGENT_CACHE_SIZE:
+            _agent_cache.popitem(last=False)
+    logger.debug(f"Compiled agent {agent_name} with {len(tools)} tools")
+    return agent
@@ -1,10 +1,11 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import os
 from typing import Literal
 
 # Define available LLM types
-LLMType = Literal["basic", "reasoning", "vision"]
+LLMType = Literal["basic", "reasoning", "vision", "fast"]
 
 # Define agent-LLM mapping
 AGENT_LLM_MAP: dict[str, LLMType] = {
@@ -16,4 +17,24 @@ AGENT_LLM_MAP: dict[str, LLMType] = {
     "podcast_script_writer": "basic",
     "ppt_composer": "basic",
     "prose_writer": "basic",
+    "summarizer": "basic",
 }
+
+
+def _parse_llm_cascade(value: str) -> dict[str, list[LLMType]]:
+    """Parse cascades written as `role=model,model;role=model,model`."""
+    cascade = {}
+    for entry in filter(None, (entry.strip() for entry in value.split(";"))):
+        role, _, chain = entry.partition("=")
+        cascade[role.strip()] = [
+            llm_type.strip() for llm_type in chain.split(",") if llm_type.strip()
+        ]
+    return cascade
+
+
+# Define the roles answering with a chain of models, cheapest first, such as
+# `coordinator=fast,basic`. A model is only escalated from when its answer is not
+# valid for the role, so only the coordinator and the planner support it.
+AGENT_LLM_CASCADE: dict[str, list[LLMType]] = _parse_llm_cascade(
+    os.getenv("AGENT_LLM_CASCADE", "")
+)
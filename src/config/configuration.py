@@ -15,6 +15,15 @@ class Configuration:
     max_plan_iterations: int = 1  # Maximum number of plan iterations
     max_step_num: int = 3  # Maximum number of steps in a plan
     max_search_results: int = 3  # Maximum number of search results
+    background_investigation_timeout: int = 30  # Seconds before planning without it
+    max_concurrent_steps: int = 1  # Maximum number of plan steps executed concurrently
+    max_concurrent_crawls: int = 5  # Maximum number of urls crawled concurrently
+    findings_policy: str = "truncate"  # full, truncate, recent or summary
+    findings_budget_chars: int = 20000  # Maximum size of prior findings in a prompt
+    prompt_layout: str = "default"  # default or prefix_cache
+    prompt_time_granularity: int = (
+        3600  # Seconds the time is rounded to in prefix_cache
+    )
     mcp_settings: dict = None  # MCP settings, including dynamic loaded tools
 
     @classmethod
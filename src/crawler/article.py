@@ -2,6 +2,7 @@
 # SPDX-License-Identifier: MIT
 
 import re
+from typing import Optional
 from urllib.parse import urljoin
 
 from markdownify import markdownify as md
@@ -9,6 +10,8 @@ from markdownify import markdownify as md
 
 class Article:
     url: str
+    # How the article was crawled: a crawl strategy, or "cache"
+    strategy: Optional[str] = None
 
     def __init__(self, title: str, html_content: str):
         self.title = title
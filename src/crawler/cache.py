@@ -0,0 +1,213 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from typing import Any, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import httpx
+
+from src.utils.lru_table import LRUTable
+
+from .article import Article
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that track the visitor rather than select the content. The
+# common "ref" is not one of them, as it selects content on sites like GitHub
+_TRACKING_PARAMS = frozenset({"fbclid", "gclid", "mc_cid", "mc_eid"})
+_DEFAULT_PORTS = {"http": 80, "https": 443}
+
+
+def canonicalize_url(url: str) -> str:
+    """Normalize a url so that the spellings of the same page share a cache entry.
+
+    The scheme and host are lowercased, default ports, fragments and tracking
+    parameters dropped, and the remaining query parameters sorted.
+    """
+    parts = urlsplit(url.strip())
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and parts.port != _DEFAULT_PORTS.get(scheme):
+        host = f"{host}:{parts.port}"
+    query = sorted(
+        (name, value)
+        for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if name.lower() not in _TRACKING_PARAMS and not name.lower().startswith("utm_")
+    )
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+
+def get_validators(response: httpx.Response) -> tuple[Optional[str], Optional[str]]:
+    """Get the ETag and Last-Modified headers a page can be revalidated with."""
+    return response.headers.get("etag"), response.headers.get("last-modified")
+
+
+class CachedArticle:
+    def __init__(
+        self,
+        article: Article,
+        etag: Optional[str],
+        last_modified: Optional[str],
+        fresh: bool,
+    ):
+        self.article = article
+        self.etag = etag
+        self.last_modified = last_modified
+        self.fresh = fresh
+
+    def get_conditional_headers(self) -> dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class CrawlCache:
+    """Cache of crawled articles in an embedded SQLite database.
+
+    Articles are keyed by the hash of their canonical url. They expire after the
+    TTL, and the least recently used ones are evicted to stay within the size
+    limit. With revalidation enabled, an expired article whose page sent an ETag
+    or Last-Modified header is kept, so that a conditional request can confirm
+    it is still current instead of crawling and extracting the page again.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_bytes: int = 512 * 1024 * 1024,
+        ttl_seconds: int = 24 * 3600,
+        revalidate: bool = False,
+    ):
+        self.path = path
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.revalidate = revalidate
+        self.hits = 0
+        self.misses = 0
+        self.stale = 0
+        self.revalidated = 0
+        self._table = LRUTable(path, "articles", ("etag", "last_modified"))
+
+    @staticmethod
+    def get_key(url: str) -> str:
+        return hashlib.sha256(canonicalize_url(url).encode()).hexdigest()
+
+    def close(self) -> None:
+        self._table.close()
+
+    def lookup(self, url: str) -> Optional[CachedArticle]:
+        """Get the cached article of a url, fresh or waiting for revalidation."""
+        key = self.get_key(url)
+        now = time.time()
+        with self._table.transaction():
+            row = self._table.get(key, "value, etag, last_modified, created_at")
+            if row is None:
+                self.misses += 1
+                return None
+            value, etag, last_modified, created_at = row
+            fresh = self.ttl_seconds <= 0 or created_at >= now - self.ttl_seconds
+            if not fresh and not (self.revalidate and (etag or last_modified)):
+                self._table.delete(key)
+                self.misses += 1
+                return None
+            self._table.set(key, accessed_at=now)
+            if fresh:
+                self.hits += 1
+            else:
+                self.stale += 1
+        item = json.loads(value)
+        article = Article(title=item["title"], html_content=item["html_content"])
+        article.url = url
+        return CachedArticle(article, etag, last_modified, fresh)
+
+    def update(
+        self,
+        url: str,
+        article: Article,
+        etag: Optional[str] = None,
+        last_modified: Optional[str] = None,
+    ) -> None:
+        """Store the article of a url, then evict entries over the limits."""
+        value = json.dumps(
+            {"title": article.title, "html_content": article.html_content},
+            ensure_ascii=False,
+        )
+        size = len(value.encode())
+        if self.max_bytes > 0 and size > self.max_bytes:
+            logger.debug(f"Not caching an article of {size} bytes")
+            return
+        now = time.time()
+        with self._table.transaction():
+            if self.ttl_seconds > 0:
+                # Expired articles that can be revalidated are left to the LRU
+                self._table.delete_created_before(
+                    now - self.ttl_seconds,
+                    unless=(
+                        "etag IS NOT NULL OR last_modified IS NOT NULL"
+                        if self.revalidate
+                        else None
+                    ),
+                )
+            self._table.put(
+                self.get_key(url), value, now, etag=etag, last_modified=last_modified
+            )
+            self._table.evict(max_bytes=self.max_bytes)
+
+    def renew(self, url: str) -> None:
+        """Mark the article of a url as fresh again, once its page was unchanged."""
+        now = time.time()
+        with self._table.transaction():
+            self._table.set(self.get_key(url), created_at=now, accessed_at=now)
+            self.revalidated += 1
+
+    def clear(self) -> None:
+        self._table.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get the hit, revalidation and miss counters, along with the cache size."""
+        entries, size = self._table.size()
+        lookups = self.hits + self.stale + self.misses
+        return {
+            "hits": self.hits,
+            "revalidated": self.revalidated,
+            "stale": self.stale,
+            "misses": self.misses,
+            "hit_rate": (self.hits + self.revalidated) / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_crawl_cache: Optional[CrawlCache] = None
+_crawl_cache_lock = threading.Lock()
+
+
+def get_crawl_cache() -> Optional[CrawlCache]:
+    """Get the crawl cache configured by the environment, if enabled.
+
+    The cache is opt-in: set CRAWL_CACHE=sqlite to enable it.
+    """
+    global _crawl_cache
+    if os.getenv("CRAWL_CACHE", "").lower() != "sqlite":
+        return None
+    with _crawl_cache_lock:
+        if _crawl_cache is None:
+            _crawl_cache = CrawlCache(
+                os.getenv("CRAWL_CACHE_PATH", "crawl_cache.db"),
+                max_bytes=int(
+                    os.getenv("CRAWL_CACHE_MAX_BYTES", str(512 * 1024 * 1024))
+                ),
+                ttl_seconds=int(os.getenv("CRAWL_CACHE_TTL_SECONDS", str(24 * 3600))),
+                revalidate=os.getenv("CRAWL_CACHE_REVALIDATE", "").lower() == "true",
+            )
+            logger.info(f"Caching crawled articles in {_crawl_cache.path}")
+        return _crawl_cache
@@ -1,32 +1,232 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import logging
 import sys
+from typing import Optional, Union
+
+import httpx
 
 from .article import Article
+from .cache import CachedArticle, get_crawl_cache, get_validators
+from .http_client import BlockedURLError, arequest_public_url, request_public_url
 from .jina_client import JinaClient
 from .readability_extractor import ReadabilityExtractor
+from .strategies import (
+    DIRECT_FETCH_HEADERS,
+    CrawlStrategy,
+    crawl_strategy_stats,
+    get_crawl_strategies,
+    get_unusable_reason,
+)
+
+logger = logging.getLogger(__name__)
+
+Validators = tuple[Optional[str], Optional[str]]
 
 
 class Crawler:
+    # To help LLMs better understand content, we extract clean
+    # articles from HTML, convert them to markdown, and split
+    # them into text and image blocks for one single and unified
+    # LLM message.
+    #
+    # Most pages are fetched directly from their origin. Jina, which
+    # renders scripts, takes over the pages that fail to fetch or come
+    # out empty, and the urls that do not point to the internet, which
+    # are never fetched directly. It's not the best crawler on readability, however it's
+    # much easier and free to use.
+    #
+    # Instead of using Jina's own markdown converter, we'll use
+    # our own solution to get better readability results.
+
     def crawl(self, url: str) -> Article:
-        # To help LLMs better understand content, we extract clean
-        # articles from HTML, convert them to markdown, and split
-        # them into text and image blocks for one single and unified
-        # LLM message.
-        #
-        # Jina is not the best crawler on readability, however it's
-        # much easier and free to use.
-        #
-        # Instead of using Jina's own markdown converter, we'll use
-        # our own solution to get better readability results.
-        jina_client = JinaClient()
-        html = jina_client.crawl(url, return_format="html")
-        extractor = ReadabilityExtractor()
-        article = extractor.extract_article(html)
+        cache = get_crawl_cache()
+        cached = cache.lookup(url) if cache else None
+        if cached and cached.fresh:
+            return self._serve_cached(cached)
+        response = None
+        if cached:
+            try:
+                response = request_public_url(
+                    "GET", url, headers=self._get_revalidation_headers(cached)
+                )
+            except (httpx.HTTPError, BlockedURLError) as e:
+                logger.info(f"Failed to revalidate {url} ({e!r}), crawling it again")
+            else:
+                if response.status_code == 304:
+                    cache.renew(url)
+                    return self._serve_cached(cached)
+
+        strategies = get_crawl_strategies()
+        for level, strategy in enumerate(strategies):
+            validators: Validators = (None, None)
+            try:
+                if strategy is CrawlStrategy.DIRECT:
+                    if response is None:
+                        response = request_public_url(
+                            "GET", url, headers=DIRECT_FETCH_HEADERS
+                        )
+                    html = self._get_html(response)
+                    validators = get_validators(response)
+                else:
+                    html = JinaClient().crawl(url, return_format="html")
+                article = self._extract(url, html)
+            except Exception as e:
+                if level == len(strategies) - 1:
+                    raise
+                self._fall_back(url, strategies, level, self._get_error_reason(e))
+                continue
+            if level < len(strategies) - 1:
+                if reason := get_unusable_reason(html, article):
+                    self._fall_back(url, strategies, level, reason)
+                    continue
+            break
+
+        self._record(url, article, strategy)
+        if cache and article.html_content:
+            if strategy is not CrawlStrategy.DIRECT and cache.revalidate:
+                validators = self._fetch_validators(url)
+            cache.update(url, article, *validators)
+        return article
+
+    async def acrawl(self, url: str) -> Article:
+        """Crawl a url without blocking the event loop, sharing pooled connections."""
+        cache = get_crawl_cache()
+        # The cache is a SQLite database, so it is read and written in worker threads
+        cached = await asyncio.to_thread(cache.lookup, url) if cache else None
+        if cached and cached.fresh:
+            return self._serve_cached(cached)
+        response = None
+        if cached:
+            try:
+                response = await arequest_public_url(
+                    "GET", url, headers=self._get_revalidation_headers(cached)
+                )
+            except (httpx.HTTPError, BlockedURLError) as e:
+                logger.info(f"Failed to revalidate {url} ({e!r}), crawling it again")
+            else:
+                if response.status_code == 304:
+                    await asyncio.to_thread(cache.renew, url)
+                    return self._serve_cached(cached)
+
+        strategies = get_crawl_strategies()
+        for level, strategy in enumerate(strategies):
+            validators: Validators = (None, None)
+            try:
+                if strategy is CrawlStrategy.DIRECT:
+                    if response is None:
+                        response = await arequest_public_url(
+                            "GET", url, headers=DIRECT_FETCH_HEADERS
+                        )
+                    html = self._get_html(response)
+                    validators = get_validators(response)
+                else:
+                    html = await JinaClient().acrawl(url, return_format="html")
+                # The extraction is CPU bound, so it runs in a worker thread
+                article = await asyncio.to_thread(self._extract, url, html)
+            except Exception as e:
+                if level == len(strategies) - 1:
+                    raise
+                self._fall_back(url, strategies, level, self._get_error_reason(e))
+                continue
+            if level < len(strategies) - 1:
+                if reason := get_unusable_reason(html, article):
+                    self._fall_back(url, strategies, level, reason)
+                    continue
+            break
+
+        self._record(url, article, strategy)
+        if cache and article.html_content:
+            if strategy is not CrawlStrategy.DIRECT and cache.revalidate:
+                validators = await self._afetch_validators(url)
+            await asyncio.to_thread(cache.update, url, article, *validators)
+        return article
+
+    @staticmethod
+    def _extract(url: str, html: str) -> Article:
+        article = ReadabilityExtractor().extract_article(html)
         article.url = url
         return article
 
+    @staticmethod
+    def _get_html(response: httpx.Response) -> str:
+        response.raise_for_status()
+        content_type = response.headers.get("content-type", "text/html")
+        if "html" not in content_type:
+            # Documents such as PDFs are left to Jina, which can read them
+            raise ValueError(f"Unsupported content type {content_type}")
+        return response.text
+
+    @staticmethod
+    def _get_error_reason(error: Exception) -> str:
+        if isinstance(error, httpx.HTTPStatusError):
+            return f"status {error.response.status_code}"
+        if isinstance(error, ValueError):
+            return str(error)
+        return type(error).__name__
+
+    @staticmethod
+    def _get_revalidation_headers(cached: CachedArticle) -> dict[str, str]:
+        return {**DIRECT_FETCH_HEADERS, **cached.get_conditional_headers()}
+
+    @staticmethod
+    def _serve_cached(cached: CachedArticle) -> Article:
+        cached.article.strategy = "cache"
+        return cached.article
+
+    @staticmethod
+    def _fall_back(
+        url: str, strategies: list[CrawlStrategy], level: int, reason: str
+    ) -> None:
+        logger.info(
+            f"Crawling {url} with {strategies[level].value} failed ({reason}), "
+            f"falling back to {strategies[level + 1].value}"
+        )
+        crawl_strategy_stats.record_fallback(strategies[level], reason)
+
+    @staticmethod
+    def _record(url: str, article: Article, strategy: CrawlStrategy) -> None:
+        logger.info(f"Crawled {url} with {strategy.value}")
+        article.strategy = strategy.value
+        crawl_strategy_stats.record(strategy)
+
+    # Pages crawled through Jina come without the headers of the origin, which
+    # are asked for separately to be able to revalidate the cached article
+    @staticmethod
+    def _fetch_validators(url: str) -> Validators:
+        try:
+            return get_validators(request_public_url("HEAD", url))
+        except (httpx.HTTPError, BlockedURLError):
+            return None, None
+
+    @staticmethod
+    async def _afetch_validators(url: str) -> Validators:
+        try:
+            return get_validators(await arequest_public_url("HEAD", url))
+        except (httpx.HTTPError, BlockedURLError):
+            return None, None
+
+    async def acrawl_many(
+        self, urls: list[str], max_concurrency: int = 5
+    ) -> list[Union[Article, Exception]]:
+        """
+        Crawl urls at the same time, at most `max_concurrency` of them at once.
+
+        Returns:
+            The article of each url in order, or the error its crawl failed with
+        """
+        semaphore = asyncio.Semaphore(max(max_concurrency, 1))
+
+        async def crawl(url: str) -> Article:
+            async with semaphore:
+                return await self.acrawl(url)
+
+        return await asyncio.gather(
+            *(crawl(url) for url in urls), return_exceptions=True
+        )
+
 
 if __name__ == "__main__":
     if len(sys.argv) == 2:
@@ -35,4 +235,5 @@ if __name__ == "__main__":
         url = "https://fintel.io/zh-hant/s/br/nvdc34"
     crawler = Crawler()
     article = crawler.crawl(url)
+    print(f"Crawled with {article.strategy}")
     print(article.to_markdown())
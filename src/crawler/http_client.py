@@ -0,0 +1,281 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import ipaddress
+import logging
+import os
+import socket
+import threading
+import time
+from typing import Optional
+
+import httpcore
+import httpx
+
+from src.utils.http_client import HTTPClientRegistry
+
+logger = logging.getLogger(__name__)
+
+# Statuses worth retrying, as the next attempt may succeed
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+MAX_RETRIES = int(os.getenv("CRAWLER_MAX_RETRIES", "2"))
+RETRY_BACKOFF_SECONDS = float(os.getenv("CRAWLER_RETRY_BACKOFF_SECONDS", "0.5"))
+MAX_REDIRECTS = 10
+
+_PUBLIC_URL_SCHEMES = ("http", "https")
+
+
+def _get_timeout() -> httpx.Timeout:
+    return httpx.Timeout(
+        float(os.getenv("CRAWLER_READ_TIMEOUT_SECONDS", "30")),
+        connect=float(os.getenv("CRAWLER_CONNECT_TIMEOUT_SECONDS", "10")),
+    )
+
+
+def _get_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("CRAWLER_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=20,
+    )
+
+
+class BlockedURLError(ValueError):
+    """A url the crawler must not fetch itself, as it does not point to the internet."""
+
+
+def _is_public_address(address: str) -> bool:
+    ip = ipaddress.ip_address(address.split("%")[0])
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    return ip.is_global and not (
+        ip.is_private
+        or ip.is_loopback
+        or ip.is_link_local
+        or ip.is_reserved
+        or ip.is_multicast
+        or ip.is_unspecified
+    )
+
+
+def _get_host(url: httpx.URL) -> str:
+    if url.scheme not in _PUBLIC_URL_SCHEMES:
+        raise BlockedURLError(f"unsupported scheme {url.scheme or 'none'}")
+    if not url.host:
+        raise BlockedURLError("url without host")
+    return url.host
+
+
+def _get_public_addresses(host: str, addresses: list[tuple]) -> list[str]:
+    """Get the addresses a host resolved to, once they are all public."""
+    public_addresses = []
+    for *_, sockaddr in addresses:
+        if not _is_public_address(sockaddr[0]):
+            logger.warning(f"Blocked request to {host} resolving to {sockaddr[0]}")
+            raise BlockedURLError("non-public address")
+        if sockaddr[0] not in public_addresses:
+            public_addresses.append(sockaddr[0])
+    return public_addresses
+
+
+class _PublicNetworkBackend(httpcore.SyncBackend):
+    """Network backend connecting only to public addresses.
+
+    A host is resolved once, checked, and connected to by the checked address,
+    so that it cannot resolve to another address in between, as a page could
+    make it do to reach the services of the crawler's own network. TLS still
+    uses the host name, for SNI and to verify the certificate.
+    """
+
+    def connect_tcp(self, host: str, port: int, *args, **kwargs):
+        try:
+            addresses = socket.getaddrinfo(host, port, type=socket.SOCK_STREAM)
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(f"Cannot resolve {host}: {e}") from e
+        *fallbacks, address = _get_public_addresses(host, addresses)
+        for fallback in fallbacks:
+            try:
+                return super().connect_tcp(fallback, port, *args, **kwargs)
+            except httpcore.ConnectError as e:
+                logger.debug(f"Connecting to {host} at {fallback} failed: {e!r}")
+        return super().connect_tcp(address, port, *args, **kwargs)
+
+
+class _AsyncPublicNetworkBackend(httpcore.AnyIOBackend):
+    """Async network backend connecting only to public addresses, like `_PublicNetworkBackend`."""
+
+    async def connect_tcp(self, host: str, port: int, *args, **kwargs):
+        try:
+            addresses = await asyncio.get_running_loop().getaddrinfo(
+                host, port, type=socket.SOCK_STREAM
+            )
+        except socket.gaierror as e:
+            raise httpcore.ConnectError(f"Cannot resolve {host}: {e}") from e
+        *fallbacks, address = _get_public_addresses(host, addresses)
+        for fallback in fallbacks:
+            try:
+                return await super().connect_tcp(fallback, port, *args, **kwargs)
+            except httpcore.ConnectError as e:
+                logger.debug(f"Connecting to {host} at {fallback} failed: {e!r}")
+        return await super().connect_tcp(address, port, *args, **kwargs)
+
+
+class _PublicHTTPTransport(httpx.HTTPTransport):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        # httpx has no option for the network backend of its connection pool
+        self._pool._network_backend = _PublicNetworkBackend()
+
+
+class _AsyncPublicHTTPTransport(httpx.AsyncHTTPTransport):
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._pool._network_backend = _AsyncPublicNetworkBackend()
+
+
+# The crawled sites are many and mostly fetched once, so they share one client
+_CLIENT_KEY = "crawler"
+
+_registry: Optional[HTTPClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def _get_registry() -> HTTPClientRegistry:
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = HTTPClientRegistry(
+                _get_limits(),
+                transport=_PublicHTTPTransport,
+                async_transport=_AsyncPublicHTTPTransport,
+                timeout=_get_timeout(),
+                follow_redirects=True,
+            )
+        return _registry
+
+
+def get_http_client() -> httpx.Client:
+    """Get the client shared by the sync crawls."""
+    return _get_registry().get_client(_CLIENT_KEY)
+
+
+def get_async_http_client() -> httpx.AsyncClient:
+    """Get the client shared by the async crawls of the running event loop."""
+    return _get_registry().get_loop_client(_CLIENT_KEY)
+
+
+async def close_http_clients() -> None:
+    """Close the shared sync client and the async client of the running loop."""
+    await _get_registry().close_all()
+
+
+def _get_retry_delay(attempt: int, response: Optional[httpx.Response]) -> float:
+    delay = RETRY_BACKOFF_SECONDS * 2**attempt
+    if response is not None:
+        try:
+            # Follow the server's Retry-After, within reason
+            delay = min(float(response.headers["retry-after"]), 30.0)
+        except (KeyError, ValueError):
+            pass
+    return delay
+
+
+def request_with_retries(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request, retrying transport errors and retryable statuses with backoff."""
+    client = get_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            response = client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            logger.debug(f"Request to {url} failed: {e!r}")
+        delay = _get_retry_delay(attempt, response)
+        logger.info(f"Retrying request to {url} in {delay:.1f}s")
+        time.sleep(delay)
+
+
+async def arequest_with_retries(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request asynchronously, retrying like `request_with_retries`."""
+    client = get_async_http_client()
+    for attempt in range(MAX_RETRIES + 1):
+        response = None
+        try:
+            response = await client.request(method, url, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_RETRIES:
+                return response
+        except httpx.TransportError as e:
+            if attempt == MAX_RETRIES:
+                raise
+            logger.debug(f"Request to {url} failed: {e!r}")
+        delay = _get_retry_delay(attempt, response)
+        logger.info(f"Retrying request to {url} in {delay:.1f}s")
+        await asyncio.sleep(delay)
+
+
+def check_public_url(url: str) -> None:
+    """
+    Make sure a url is on the internet, so that pages cannot make the crawler
+    reach the services of its own network.
+
+    Raises:
+        BlockedURLError: If the url is not http(s), or its host resolves to a
+            private, loopback, link-local, reserved or multicast address
+        httpx.ConnectError: If its host cannot be resolved
+    """
+    url = httpx.URL(url)
+    host = _get_host(url)
+    try:
+        addresses = socket.getaddrinfo(host, url.port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise httpx.ConnectError(f"Cannot resolve {host}: {e}") from e
+    _get_public_addresses(host, addresses)
+
+
+async def acheck_public_url(url: str) -> None:
+    """Make sure a url is on the internet, like `check_public_url`."""
+    url = httpx.URL(url)
+    host = _get_host(url)
+    try:
+        addresses = await asyncio.get_running_loop().getaddrinfo(
+            host, url.port, type=socket.SOCK_STREAM
+        )
+    except socket.gaierror as e:
+        raise httpx.ConnectError(f"Cannot resolve {host}: {e}") from e
+    _get_public_addresses(host, addresses)
+
+
+def request_public_url(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request to a url on the internet, checking every redirect too.
+
+    Checking a url before its request lets a blocked one fail without being
+    sent, while the clients check the address they connect to again.
+    """
+    for _ in range(MAX_REDIRECTS + 1):
+        check_public_url(url)
+        response = request_with_retries(method, url, follow_redirects=False, **kwargs)
+        if response.next_request is None:
+            return response
+        method, url = response.next_request.method, str(response.next_request.url)
+    raise httpx.TooManyRedirects(
+        f"Exceeded {MAX_REDIRECTS} redirects", request=response.request
+    )
+
+
+async def arequest_public_url(method: str, url: str, **kwargs) -> httpx.Response:
+    """Send a request to a url on the internet asynchronously, like `request_public_url`."""
+    for _ in range(MAX_REDIRECTS + 1):
+        await acheck_public_url(url)
+        response = await arequest_with_retries(
+            method, url, follow_redirects=False, **kwargs
+        )
+        if response.next_request is None:
+            return response
+        method, url = response.next_request.method, str(response.next_request.url)
+    raise httpx.TooManyRedirects(
+        f"Exceeded {MAX_REDIRECTS} redirects", request=response.request
+    )
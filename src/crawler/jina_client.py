@@ -4,13 +4,15 @@
 import logging
 import os
 
-import requests
+from .http_client import arequest_with_retries, request_with_retries
 
 logger = logging.getLogger(__name__)
 
+JINA_READER_URL = "https://r.jina.ai/"
+
 
 class JinaClient:
-    def crawl(self, url: str, return_format: str = "html") -> str:
+    def _get_headers(self, return_format: str) -> dict[str, str]:
         headers = {
             "Content-Type": "application/json",
             "X-Return-Format": return_format,
@@ -21,6 +23,24 @@ class JinaClient:
             logger.warning(
                 "Jina API key is not set. Provide your own key to access a higher rate limit. See https://jina.ai/reader for more information."
             )
-        data = {"url": url}
-        response = requests.post("https://r.jina.ai/", headers=headers, json=data)
+        return headers
+
+    def crawl(self, url: str, return_format: str = "html") -> str:
+        response = request_with_retries(
+            "POST",
+            JINA_READER_URL,
+            headers=self._get_headers(return_format),
+            json={"url": url},
+        )
+        response.raise_for_status()
+        return response.text
+
+    async def acrawl(self, url: str, return_format: str = "html") -> str:
+        response = await arequest_with_retries(
+            "POST",
+            JINA_READER_URL,
+            headers=self._get_headers(return_format),
+            json={"url": url},
+        )
+        response.raise_for_status()
         return response.text
@@ -0,0 +1,261 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import re
+from typing import Optional
+
+from lxml import etree, html as lxml_html
+
+from .article import Article
+
+# Elements never part of the content of a page
+_REMOVED_TAGS = [
+    "script",
+    "style",
+    "noscript",
+    "template",
+    "iframe",
+    "object",
+    "embed",
+    "form",
+    "button",
+    "input",
+    "select",
+    "textarea",
+    "svg",
+    "canvas",
+    "nav",
+    "aside",
+    "footer",
+]
+# Class names and ids of the boilerplate around the content, unless they also
+# look like the content itself, as readability.js tells them apart
+_UNLIKELY_PATTERN = re.compile(
+    r"-ad-|ad-break|adbox|advert|banner|breadcrumb|combx|comment|community|cookie"
+    r"|disqus|extra|footer|header|legends|menu|modal|nav|newsletter|pager|popup"
+    r"|promo|related|remark|replies|rss|share|shoutbox|sidebar|skyscraper|social"
+    r"|sponsor|subscribe|tweet|twitter|widget",
+    re.IGNORECASE,
+)
+_POSITIVE_PATTERN = re.compile(
+    r"article|body|content|entry|hentry|h-entry|main|page|post|text|blog|story",
+    re.IGNORECASE,
+)
+_NEGATIVE_PATTERN = re.compile(
+    r"-ad-|hidden|^hid$| hid$| hid |^hid |banner|combx|comment|com-|contact|foot"
+    r"|footer|footnote|masthead|media|meta|outbrain|promo|related|scroll|share"
+    r"|shoutbox|sidebar|skyscraper|sponsor|shopping|tags|tool|widget",
+    re.IGNORECASE,
+)
+# Elements whose text is scored as paragraphs of the content
+_SCORED_TAGS = {"p", "pre", "td", "blockquote", "li", "h2", "h3", "h4", "h5", "h6"}
+_BLOCK_TAGS = {
+    "address",
+    "article",
+    "blockquote",
+    "div",
+    "dl",
+    "figure",
+    "ol",
+    "p",
+    "pre",
+    "section",
+    "table",
+    "ul",
+}
+# Attributes kept in the extracted html
+_KEPT_ATTRIBUTES = {"href", "src", "alt", "title", "colspan", "rowspan"}
+_TITLE_SEPARATOR_PATTERN = re.compile(r"\s+[|\-–—:»]\s+")
+# XHTML pages start with an XML declaration, whose encoding lxml refuses in an
+# already decoded string
+_XML_DECLARATION_PATTERN = re.compile(r"^[\s\ufeff]*<\?xml[^>]*\?>")
+_MIN_PARAGRAPH_CHARS = 25
+
+
+def _get_text(element: etree._Element) -> str:
+    return " ".join(element.text_content().split())
+
+
+def _get_class_weight(element: etree._Element) -> float:
+    weight = 0.0
+    for name in (element.get("class"), element.get("id")):
+        if name:
+            if _NEGATIVE_PATTERN.search(name):
+                weight -= 25
+            if _POSITIVE_PATTERN.search(name):
+                weight += 25
+    return weight
+
+
+def _get_link_density(element: etree._Element) -> float:
+    text_length = len(_get_text(element))
+    if not text_length:
+        return 0.0
+    link_length = sum(len(_get_text(link)) for link in element.iter("a"))
+    return link_length / text_length
+
+
+def _get_initial_score(element: etree._Element) -> float:
+    score = {
+        "div": 5,
+        "article": 10,
+        "main": 10,
+        "section": 3,
+        "pre": 3,
+        "td": 3,
+        "blockquote": 3,
+        "address": -3,
+        "ol": -3,
+        "ul": -3,
+        "dl": -3,
+        "dd": -3,
+        "dt": -3,
+        "li": -3,
+        "form": -3,
+        "th": -5,
+    }.get(element.tag, 0)
+    if element.tag in ("h1", "h2", "h3", "h4", "h5", "h6"):
+        score = -5
+    return score + _get_class_weight(element)
+
+
+class LxmlExtractor:
+    """Extract the article of a page in pure Python, scoring its content with lxml.
+
+    A port of the content scoring of readability.js: paragraphs score their
+    parent and grandparent by their length and commas, scores are discounted
+    by the share of link text, and the best scored element is kept along with
+    the siblings that look like part of the same content.
+    """
+
+    def extract_article(self, html: str) -> Article:
+        try:
+            document = lxml_html.document_fromstring(
+                _XML_DECLARATION_PATTERN.sub("", html, count=1)
+            )
+        except (etree.ParserError, ValueError):
+            return Article(title=None, html_content="")
+        title = self._get_title(document)
+        self._remove_boilerplate(document)
+        content = self._get_content(document)
+        if content is None:
+            return Article(title=title, html_content="")
+        self._clean(content)
+        return Article(
+            title=title,
+            html_content=lxml_html.tostring(content, encoding="unicode"),
+        )
+
+    @staticmethod
+    def _get_title(document: etree._Element) -> Optional[str]:
+        for meta in document.iter("meta"):
+            name = meta.get("property") or meta.get("name")
+            if name in ("og:title", "twitter:title") and meta.get("content"):
+                return meta.get("content").strip()
+        title_element = document.find(".//title")
+        title = _get_text(title_element) if title_element is not None else ""
+        if parts := _TITLE_SEPARATOR_PATTERN.split(title):
+            # Drop the site name the title usually ends with
+            if len(parts) > 1 and len(parts[0].split()) >= 3:
+                title = parts[0]
+        if not title:
+            heading = document.find(".//h1")
+            title = _get_text(heading) if heading is not None else ""
+        return title or None
+
+    @staticmethod
+    def _remove_boilerplate(document: etree._Element) -> None:
+        etree.strip_elements(document, etree.Comment, *_REMOVED_TAGS, with_tail=False)
+        for element in list(document.iter("header")):
+            # Headers of articles hold their heading, headers of pages a menu
+            if element.getparent() is not None and element.find(".//h1") is None:
+                element.drop_tree()
+        for element in list(document.iter()):
+            if element.tag in ("html", "body", "article", "main", "a"):
+                continue
+            names = f"{element.get('class', '')} {element.get('id', '')}"
+            if (
+                element.getparent() is not None
+                and _UNLIKELY_PATTERN.search(names)
+                and not _POSITIVE_PATTERN.search(names)
+            ):
+                element.drop_tree()
+            elif element.get("hidden") is not None or re.search(
+                r"display:\s*none", element.get("style", "")
+            ):
+                element.drop_tree()
+
+    @staticmethod
+    def _get_content(document: etree._Element) -> Optional[etree._Element]:
+        scores: dict[etree._Element, float] = {}
+        for element in document.iter(*_SCORED_TAGS):
+            text = _get_text(element)
+            if len(text) < _MIN_PARAGRAPH_CHARS:
+                continue
+            score = 1 + text.count(",") + text.count("，") + min(len(text) / 100, 3)
+            # The parent takes the whole score, the grandparent half of it
+            ancestor = element.getparent()
+            for share in (1.0, 0.5):
+                if ancestor is None or ancestor.tag in ("html", "body"):
+                    break
+                if ancestor not in scores:
+                    scores[ancestor] = _get_initial_score(ancestor)
+                scores[ancestor] += score * share
+                ancestor = ancestor.getparent()
+        if not scores:
+            return document.find("body")
+
+        scores = {
+            element: score * (1 - _get_link_density(element))
+            for element, score in scores.items()
+        }
+        top = max(scores, key=scores.get)
+        parent = top.getparent()
+        if parent is None or parent.tag in ("html", "body"):
+            return top
+
+        # Siblings often hold the rest of the content, such as a lead paragraph
+        threshold = max(10.0, scores[top] * 0.2)
+        content = lxml_html.Element("div")
+        for sibling in list(parent):
+            if not isinstance(sibling.tag, str):
+                continue
+            keep = sibling is top or scores.get(sibling, 0) >= threshold
+            if not keep and sibling.tag == "p":
+                text = _get_text(sibling)
+                link_density = _get_link_density(sibling)
+                keep = (len(text) > 80 and link_density < 0.25) or (
+                    0 < len(text) <= 80 and link_density == 0 and "." in text
+                )
+            if keep:
+                sibling.tail = None
+                if sibling.tag in ("td", "th"):
+                    # Cells of layout tables would be rendered as a table
+                    sibling.tag = "div"
+                content.append(sibling)
+        return content
+
+    @staticmethod
+    def _clean(content: etree._Element) -> None:
+        for element in list(content.iter()):
+            if not isinstance(element.tag, str):
+                continue
+            if element.tag == "img" and not element.get("src"):
+                # Lazily loaded images keep their source in a data attribute
+                for name in ("data-src", "data-original", "data-lazy-src"):
+                    if element.get(name):
+                        element.set("src", element.get(name))
+                        break
+            for name in list(element.attrib):
+                if name not in _KEPT_ATTRIBUTES:
+                    del element.attrib[name]
+        # Blocks of links without much text are menus and link lists
+        for element in list(content.iter(*_BLOCK_TAGS)):
+            if element is content or element.getparent() is None:
+                continue
+            text = _get_text(element)
+            has_media = element.find(".//img") is not None
+            if (not text and not has_media) or (
+                _get_link_density(element) > 0.5 and len(text) < 200
+            ):
+                element.drop_tree()
@@ -1,13 +1,32 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import enum
+import os
+from typing import Optional
+
 from readabilipy import simple_json_from_html_string
 
 from .article import Article
+from .lxml_extractor import LxmlExtractor
+
+
+class ExtractionEngine(enum.Enum):
+    # Mozilla's Readability.js, run by readabilipy in a Node.js process per page
+    READABILIPY = "readabilipy"
+    # Readability's content scoring in pure Python over lxml
+    LXML = "lxml"
 
 
 class ReadabilityExtractor:
+    def __init__(self, engine: Optional[str] = None):
+        self.engine = ExtractionEngine(
+            engine or os.getenv("CRAWLER_EXTRACTION_ENGINE", "") or "readabilipy"
+        )
+
     def extract_article(self, html: str) -> Article:
+        if self.engine is ExtractionEngine.LXML:
+            return LxmlExtractor().extract_article(html)
         article = simple_json_from_html_string(html, use_readability=True)
         return Article(
             title=article.get("title"),
@@ -0,0 +1,84 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import enum
+import logging
+import os
+import re
+import threading
+from collections import Counter
+from typing import Any
+
+from .article import Article
+
+logger = logging.getLogger(__name__)
+
+
+class CrawlStrategy(enum.Enum):
+    # Fetch the page from its origin over the pooled client
+    DIRECT = "direct"
+    # Fetch the page through the Jina reader, which renders scripts
+    JINA = "jina"
+
+
+# Headers of direct fetches, as some sites refuse clients that look like bots
+DIRECT_FETCH_HEADERS = {
+    "User-Agent": "Mozilla/5.0 (compatible; DeerFlow/1.0; +https://github.com/bytedance/deer-flow)",
+    "Accept": "text/html,application/xhtml+xml;q=0.9,*/*;q=0.8",
+}
+
+# Shells of single page apps, whose content only exists once scripts ran
+_JS_RENDERED_PATTERN = re.compile(
+    r"<div[^>]+id=[\"'](?:root|app|__next|__nuxt)[\"'][^>]*>\s*</div>"
+    r"|<noscript>[^<]*(?:enable|enabling|turn on)\s+javascript",
+    re.IGNORECASE,
+)
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+
+
+def get_crawl_strategies() -> list[CrawlStrategy]:
+    """Get the strategies to crawl with in order, each one a fallback of the previous."""
+    names = os.getenv("CRAWLER_STRATEGIES", "") or "direct,jina"
+    return [CrawlStrategy(name.strip()) for name in names.split(",") if name.strip()]
+
+
+def get_unusable_reason(html: str, article: Article) -> str:
+    """Tell why an extracted article is not worth keeping, or "" if it is."""
+    text = _TAG_PATTERN.sub(" ", article.html_content or "").strip()
+    if not text:
+        return "empty article"
+    min_chars = int(os.getenv("CRAWLER_MIN_CONTENT_CHARS", "200"))
+    if len(text) < min_chars and _JS_RENDERED_PATTERN.search(html):
+        return "page rendered by scripts"
+    return ""
+
+
+class CrawlStrategyStats:
+    """Count which strategy served the crawls, and why the others were skipped."""
+
+    def __init__(self):
+        self.served_by: Counter[str] = Counter()
+        self.fallbacks: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, strategy: CrawlStrategy) -> None:
+        with self._lock:
+            self.served_by[strategy.value] += 1
+
+    def record_fallback(self, strategy: CrawlStrategy, reason: str) -> None:
+        with self._lock:
+            self.fallbacks[f"{strategy.value}: {reason}"] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "served_by": dict(self.served_by),
+                "fallbacks": dict(self.fallbacks),
+            }
+
+
+crawl_strategy_stats = CrawlStrategyStats()
+
+
+def get_crawl_strategy_stats() -> dict[str, Any]:
+    return crawl_strategy_stats.stats()
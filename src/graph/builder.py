@@ -2,16 +2,14 @@
 # SPDX-License-Identifier: MIT
 
 from langgraph.graph import StateGraph, START, END
-from langgraph.checkpoint.memory import MemorySaver
 
+from .checkpointer import build_checkpointer
 from .types import State
 from .nodes import (
     coordinator_node,
     planner_node,
     reporter_node,
     research_team_node,
-    researcher_node,
-    coder_node,
     human_feedback_node,
     background_investigation_node,
 )
@@ -26,8 +24,6 @@ def _build_base_graph():
     builder.add_node("planner", planner_node)
     builder.add_node("reporter", reporter_node)
     builder.add_node("research_team", research_team_node)
-    builder.add_node("researcher", researcher_node)
-    builder.add_node("coder", coder_node)
     builder.add_node("human_feedback", human_feedback_node)
     builder.add_edge("reporter", END)
     return builder
@@ -35,9 +31,8 @@ def _build_base_graph():
 
 def build_graph_with_memory():
     """Build and return the agent workflow graph with memory."""
-    # use persistent memory to save conversation history
-    # TODO: be compatible with SQLite / PostgreSQL
-    memory = MemorySaver()
+    # use the configured checkpointer to save conversation history
+    memory = build_checkpointer()
 
     # build state graph
     builder = _build_base_graph()
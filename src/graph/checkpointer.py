@@ -0,0 +1,575 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import abc
+import asyncio
+import logging
+import os
+import random
+import sqlite3
+import threading
+import time
+from collections.abc import AsyncIterator, Iterator, Sequence
+from typing import Any, Optional
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.checkpoint.serde.types import TASKS, ChannelProtocol
+
+logger = logging.getLogger(__name__)
+
+
+class CheckpointMaintenanceMixin(abc.ABC):
+    """Keeps a checkpointer bounded with a background compaction thread.
+
+    Subclasses implement `compact` and `evict_idle_threads`.
+    """
+
+    max_checkpoints_per_thread: int = 0
+    thread_ttl_seconds: int = 0
+    _maintenance_thread: Optional[threading.Thread] = None
+    _maintenance_stopped: Optional[threading.Event] = None
+
+    @abc.abstractmethod
+    def compact(self, max_checkpoints: int) -> int:
+        """Keep only the latest checkpoints of every thread, return the number deleted."""
+
+    @abc.abstractmethod
+    def evict_idle_threads(self, ttl_seconds: int) -> int:
+        """Delete the threads idle for longer than the TTL, return the number deleted."""
+
+    def run_maintenance(self) -> None:
+        """Run one compaction and eviction pass with the configured limits."""
+        try:
+            if self.thread_ttl_seconds > 0:
+                if evicted := self.evict_idle_threads(self.thread_ttl_seconds):
+                    logger.info(f"Evicted {evicted} idle checkpoint threads")
+            if self.max_checkpoints_per_thread > 0:
+                if deleted := self.compact(self.max_checkpoints_per_thread):
+                    logger.info(f"Compacted {deleted} old checkpoints")
+        except Exception as e:
+            logger.error(f"Checkpoint maintenance failed: {e}")
+
+    def start_maintenance(self, interval_seconds: float) -> None:
+        """Start running the maintenance pass periodically in a daemon thread."""
+        if self._maintenance_thread is not None:
+            return
+        if self.thread_ttl_seconds <= 0 and self.max_checkpoints_per_thread <= 0:
+            return
+        self._maintenance_stopped = threading.Event()
+
+        def loop():
+            while not self._maintenance_stopped.wait(interval_seconds):
+                self.run_maintenance()
+
+        self._maintenance_thread = threading.Thread(
+            target=loop, name="checkpoint-maintenance", daemon=True
+        )
+        self._maintenance_thread.start()
+
+    def stop_maintenance(self) -> None:
+        """Stop the maintenance thread if it is running."""
+        if self._maintenance_thread is None:
+            return
+        self._maintenance_stopped.set()
+        self._maintenance_thread.join()
+        self._maintenance_thread = None
+
+    def close(self) -> None:
+        """Stop the maintenance and release what the checkpointer holds."""
+        self.stop_maintenance()
+
+
+class BoundedMemorySaver(CheckpointMaintenanceMixin, MemorySaver):
+    """In-memory checkpointer with checkpoint compaction and idle thread eviction."""
+
+    def __init__(
+        self, max_checkpoints_per_thread: int = 0, thread_ttl_seconds: int = 0
+    ):
+        super().__init__()
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self._lock = threading.RLock()
+        self._last_activity: dict[str, float] = {}
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        with self._lock:
+            self._last_activity[config["configurable"]["thread_id"]] = time.time()
+            return super().put(config, checkpoint, metadata, new_versions)
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        with self._lock:
+            self._last_activity[config["configurable"]["thread_id"]] = time.time()
+            return super().put_writes(config, writes, task_id, task_path)
+
+    def get_tuple(self, config):
+        with self._lock:
+            return super().get_tuple(config)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        with self._lock:
+            return iter(
+                [*super().list(config, filter=filter, before=before, limit=limit)]
+            )
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock:
+            self._last_activity.pop(thread_id, None)
+            super().delete_thread(thread_id)
+
+    def evict_idle_threads(self, ttl_seconds: int) -> int:
+        deadline = time.time() - ttl_seconds
+        with self._lock:
+            idle_threads = [
+                thread_id
+                for thread_id, last_activity in self._last_activity.items()
+                if last_activity < deadline
+            ]
+            for thread_id in idle_threads:
+                self.delete_thread(thread_id)
+        return len(idle_threads)
+
+    def compact(self, max_checkpoints: int) -> int:
+        # The parent of the latest checkpoint holds its pending sends
+        max_checkpoints = max(max_checkpoints, 2)
+        deleted = 0
+        with self._lock:
+            for thread_id, namespaces in self.storage.items():
+                for checkpoint_ns, checkpoints in namespaces.items():
+                    if len(checkpoints) <= max_checkpoints:
+                        continue
+                    checkpoint_ids = sorted(checkpoints.keys(), reverse=True)
+                    for checkpoint_id in checkpoint_ids[max_checkpoints:]:
+                        del checkpoints[checkpoint_id]
+                        self.writes.pop((thread_id, checkpoint_ns, checkpoint_id), None)
+                        deleted += 1
+                    # Drop the channel values no retained checkpoint refers to
+                    referenced = set()
+                    for checkpoint, _, _ in checkpoints.values():
+                        versions = self.serde.loads_typed(checkpoint)[
+                            "channel_versions"
+                        ]
+                        referenced.update(versions.items())
+                    for key in list(self.blobs.keys()):
+                        if (
+                            key[0] == thread_id
+                            and key[1] == checkpoint_ns
+                            and (key[2], key[3]) not in referenced
+                        ):
+                            del self.blobs[key]
+        return deleted
+
+
+class SQLiteSaver(CheckpointMaintenanceMixin, BaseCheckpointSaver[str]):
+    """Checkpointer persisting checkpoints in an embedded SQLite database.
+
+    Every checkpoint row stores the full channel values, so old checkpoints can
+    be compacted away independently of the ones that are kept.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_checkpoints_per_thread: int = 0,
+        thread_ttl_seconds: int = 0,
+    ):
+        super().__init__()
+        self.path = path
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self.thread_ttl_seconds = thread_ttl_seconds
+        self._lock = threading.RLock()
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                """
+                CREATE TABLE IF NOT EXISTS checkpoints (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    parent_checkpoint_id TEXT,
+                    type TEXT,
+                    checkpoint BLOB,
+                    metadata_type TEXT,
+                    metadata BLOB,
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+                );
+                CREATE TABLE IF NOT EXISTS writes (
+                    thread_id TEXT NOT NULL,
+                    checkpoint_ns TEXT NOT NULL DEFAULT '',
+                    checkpoint_id TEXT NOT NULL,
+                    task_id TEXT NOT NULL,
+                    idx INTEGER NOT NULL,
+                    channel TEXT NOT NULL,
+                    type TEXT,
+                    value BLOB,
+                    task_path TEXT NOT NULL DEFAULT '',
+                    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+                );
+                CREATE TABLE IF NOT EXISTS threads (
+                    thread_id TEXT PRIMARY KEY,
+                    updated_at REAL NOT NULL
+                );
+                """
+            )
+
+    def close(self) -> None:
+        self.stop_maintenance()
+        with self._lock:
+            self._conn.close()
+
+    def _touch_thread(self, thread_id: str) -> None:
+        self._conn.execute(
+            "INSERT OR REPLACE INTO threads (thread_id, updated_at) VALUES (?, ?)",
+            (thread_id, time.time()),
+        )
+
+    def _load_tuple(
+        self,
+        thread_id: str,
+        checkpoint_ns: str,
+        checkpoint_id: str,
+        parent_checkpoint_id: Optional[str],
+        checkpoint: tuple[str, bytes],
+        metadata: tuple[str, bytes],
+    ) -> CheckpointTuple:
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes WHERE thread_id = ? "
+            "AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        sends = []
+        if parent_checkpoint_id:
+            sends = self._conn.execute(
+                "SELECT type, value FROM writes WHERE thread_id = ? "
+                "AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self.serde.loads_typed(checkpoint),
+                "pending_sends": [
+                    self.serde.loads_typed((type_, value)) for type_, value in sends
+                ],
+            },
+            metadata=self.serde.loads_typed(metadata),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+            "metadata_type, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params: tuple = (thread_id, checkpoint_ns)
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params += (checkpoint_id,)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            checkpoint_id, parent_id, type_, checkpoint, metadata_type, metadata = row
+            return self._load_tuple(
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                parent_id,
+                (type_, checkpoint),
+                (metadata_type, metadata),
+            )
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        conditions, params = [], []
+        if config:
+            conditions.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (
+                checkpoint_ns := config["configurable"].get("checkpoint_ns")
+            ) is not None:
+                conditions.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                conditions.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            conditions.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY checkpoint_id DESC"
+
+        results = []
+        with self._lock:
+            for row in self._conn.execute(query, params).fetchall():
+                if limit is not None and len(results) >= limit:
+                    break
+                thread_id, checkpoint_ns, checkpoint_id, parent_id = row[:4]
+                metadata = self.serde.loads_typed((row[6], row[7]))
+                if filter and not all(
+                    metadata.get(key) == value for key, value in filter.items()
+                ):
+                    continue
+                results.append(
+                    self._load_tuple(
+                        thread_id,
+                        checkpoint_ns,
+                        checkpoint_id,
+                        parent_id,
+                        (row[4], row[5]),
+                        (row[6], row[7]),
+                    )
+                )
+        return iter(results)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        type_, serialized_checkpoint = self.serde.dumps_typed(c)
+        metadata_type, serialized_metadata = self.serde.dumps_typed(
+            get_checkpoint_metadata(config, metadata)
+        )
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, "
+                "checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                "metadata_type, metadata) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    serialized_checkpoint,
+                    metadata_type,
+                    serialized_metadata,
+                ),
+            )
+            self._touch_thread(thread_id)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        # Special writes have a fixed negative index and replace each other,
+        # regular writes are only stored once
+        replaced, inserted = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, serialized_value = self.serde.dumps_typed(value)
+            write_idx = WRITES_IDX_MAP.get(channel, idx)
+            (replaced if write_idx < 0 else inserted).append(
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint_id,
+                    task_id,
+                    write_idx,
+                    channel,
+                    type_,
+                    serialized_value,
+                    task_path,
+                )
+            )
+        with self._lock, self._conn:
+            for statement, rows in (
+                ("INSERT OR REPLACE", replaced),
+                ("INSERT OR IGNORE", inserted),
+            ):
+                self._conn.executemany(
+                    f"{statement} INTO writes (thread_id, checkpoint_ns, "
+                    "checkpoint_id, task_id, idx, channel, type, value, task_path) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    rows,
+                )
+            self._touch_thread(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        with self._lock, self._conn:
+            for table in ("checkpoints", "writes", "threads"):
+                self._conn.execute(
+                    f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,)
+                )
+
+    def evict_idle_threads(self, ttl_seconds: int) -> int:
+        with self._lock:
+            idle_threads = [
+                thread_id
+                for (thread_id,) in self._conn.execute(
+                    "SELECT thread_id FROM threads WHERE updated_at < ?",
+                    (time.time() - ttl_seconds,),
+                ).fetchall()
+            ]
+            for thread_id in idle_threads:
+                self.delete_thread(thread_id)
+        return len(idle_threads)
+
+    def compact(self, max_checkpoints: int) -> int:
+        # The parent of the latest checkpoint holds its pending sends
+        max_checkpoints = max(max_checkpoints, 2)
+        with self._lock, self._conn:
+            stale = self._conn.execute(
+                """
+                SELECT thread_id, checkpoint_ns, checkpoint_id FROM (
+                    SELECT thread_id, checkpoint_ns, checkpoint_id, ROW_NUMBER() OVER (
+                        PARTITION BY thread_id, checkpoint_ns
+                        ORDER BY checkpoint_id DESC
+                    ) AS position FROM checkpoints
+                ) WHERE position > ?
+                """,
+                (max_checkpoints,),
+            ).fetchall()
+            for table in ("checkpoints", "writes"):
+                self._conn.executemany(
+                    f"DELETE FROM {table} WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "AND checkpoint_id = ?",
+                    stale,
+                )
+        return len(stale)
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        results = await asyncio.to_thread(
+            self.list, config, filter=filter, before=before, limit=limit
+        )
+        for item in results:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        return await asyncio.to_thread(
+            self.put, config, checkpoint, metadata, new_versions
+        )
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        return await asyncio.to_thread(
+            self.put_writes, config, writes, task_id, task_path
+        )
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        return await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: ChannelProtocol) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+
+def build_checkpointer() -> BaseCheckpointSaver:
+    """
+    Build the checkpointer selected by the environment.
+
+    CHECKPOINTER selects the backend (`memory` or `sqlite`), CHECKPOINTER_SQLITE_PATH
+    the database file, CHECKPOINT_MAX_PER_THREAD the number of checkpoints kept per
+    thread and CHECKPOINT_THREAD_TTL_SECONDS how long idle threads are kept. Both
+    limits are disabled when set to 0.
+    """
+    backend = os.getenv("CHECKPOINTER", "memory").lower()
+    max_checkpoints = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "0"))
+    thread_ttl = int(os.getenv("CHECKPOINT_THREAD_TTL_SECONDS", "0"))
+    interval = float(os.getenv("CHECKPOINT_MAINTENANCE_INTERVAL_SECONDS", "300"))
+
+    if backend == "sqlite":
+        path = os.getenv("CHECKPOINTER_SQLITE_PATH", "checkpoints.db")
+        logger.info(f"Using SQLite checkpointer at {path}")
+        checkpointer = SQLiteSaver(path, max_checkpoints, thread_ttl)
+    elif backend == "memory":
+        checkpointer = BoundedMemorySaver(max_checkpoints, thread_ttl)
+    else:
+        raise ValueError(f"Unsupported checkpointer: {backend}")
+    checkpointer.start_maintenance(interval)
+    return checkpointer
@@ -0,0 +1,129 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import enum
+import logging
+
+from langchain_core.messages import HumanMessage, SystemMessage
+
+from src.config.agents import AGENT_LLM_MAP
+from src.llms.llm import get_llm_by_type
+from src.prompts.planner_model import Step
+from src.prompts.template import get_prompt_template
+
+logger = logging.getLogger(__name__)
+
+TRUNCATION_MARKER = "\n\n[... truncated ...]"
+
+
+class FindingsPolicy(enum.Enum):
+    """How the findings of prior steps are fit into the budget of a step's prompt."""
+
+    FULL = "full"  # Include every finding as is, without any budget
+    TRUNCATE = "truncate"  # Share the budget fairly, truncating the longest findings
+    RECENT = "recent"  # Keep the most recent findings whole, drop the older ones
+    SUMMARY = "summary"  # Use the summaries cached on the steps, then truncate
+
+
+def get_findings_policy(value: str) -> FindingsPolicy:
+    """Parse a findings policy, falling back to truncation for unknown values."""
+    try:
+        return FindingsPolicy(value)
+    except ValueError:
+        logger.warning(f"Unknown findings policy '{value}', using truncate")
+        return FindingsPolicy.TRUNCATE
+
+
+def _truncate(text: str, max_chars: int) -> str:
+    if len(text) <= max_chars:
+        return text
+    return text[: max(max_chars - len(TRUNCATION_MARKER), 0)] + TRUNCATION_MARKER
+
+
+def _fit_fair_share(findings: list[str], budget_chars: int) -> list[str]:
+    """Truncate the longest findings so that all of them fit in the budget.
+
+    Findings shorter than their fair share are kept whole, and what they leave
+    unused is shared between the longer ones.
+    """
+    allowances = [0] * len(findings)
+    remaining_budget = budget_chars
+    remaining = sorted(range(len(findings)), key=lambda i: len(findings[i]))
+    while remaining:
+        share = remaining_budget // len(remaining)
+        index = remaining.pop(0)
+        allowances[index] = min(len(findings[index]), share)
+        remaining_budget -= allowances[index]
+    return [_truncate(finding, allowances[i]) for i, finding in enumerate(findings)]
+
+
+def _fit_recent(findings: list[str], budget_chars: int) -> list[str | None]:
+    """Keep the most recent findings that fit in the budget, `None` for dropped ones."""
+    fitted: list[str | None] = [None] * len(findings)
+    remaining_budget = budget_chars
+    for i in reversed(range(len(findings))):
+        if len(findings[i]) > remaining_budget:
+            if i == len(findings) - 1:
+                fitted[i] = _truncate(findings[i], remaining_budget)
+            break
+        fitted[i] = findings[i]
+        remaining_budget -= len(findings[i])
+    return fitted
+
+
+def build_findings_context(
+    steps: list[Step], policy: FindingsPolicy, budget_chars: int
+) -> str:
+    """
+    Format the findings of completed steps for a step's prompt within a budget.
+
+    Args:
+        steps: The completed steps whose findings are relevant, in plan order
+        policy: How to fit the findings into the budget
+        budget_chars: The maximum number of characters of findings
+
+    Returns:
+        The formatted findings section, empty if there are no findings
+    """
+    if not steps:
+        return ""
+
+    findings = [step.execution_res for step in steps]
+    if policy == FindingsPolicy.SUMMARY:
+        findings = [step.execution_summary or step.execution_res for step in steps]
+
+    if policy == FindingsPolicy.FULL or sum(map(len, findings)) <= budget_chars:
+        fitted = findings
+    elif policy == FindingsPolicy.RECENT:
+        fitted = _fit_recent(findings, budget_chars)
+    else:
+        fitted = _fit_fair_share(findings, budget_chars)
+
+    logger.info(
+        f"Findings context with policy '{policy.value}': {len(findings)} findings, "
+        f"{sum(map(len, findings))} -> {sum(len(f) for f in fitted if f)} chars"
+    )
+
+    context = "# Existing Research Findings\n\n"
+    if omitted := fitted.count(None):
+        context += f"({omitted} earlier findings omitted to fit the context budget)\n\n"
+    for i, (step, finding) in enumerate(zip(steps, fitted)):
+        if finding is None:
+            continue
+        context += f"## Existing Finding {i+1}: {step.title}\n\n"
+        context += f"<finding>\n{finding}\n</finding>\n\n"
+    return context
+
+
+async def summarize_finding(step: Step, finding: str) -> str:
+    """Summarize a step's finding so that later steps can use it in less space."""
+    # The summary is internal to the step, so its tokens are kept out of the
+    # `messages` stream, where they would show as the output of the agent
+    llm = get_llm_by_type(AGENT_LLM_MAP["summarizer"])
+    response = await llm.with_config(tags=["nostream"]).ainvoke(
+        [
+            SystemMessage(content=get_prompt_template("finding_summarizer")),
+            HumanMessage(content=f"# {step.title}\n\n{finding}"),
+        ]
+    )
+    return response.content
@@ -1,32 +1,51 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import json
 import logging
 import os
+import threading
+from collections import OrderedDict
+from contextlib import AsyncExitStack
 from typing import Annotated, Literal
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import tool
+from langchain_core.runnables.config import var_child_runnable_config
+from langchain_core.tools import BaseTool, tool
+from pydantic import ValidationError
+from langgraph.constants import CONFIG_KEY_CHECKPOINTER
 from langgraph.types import Command, interrupt
-from langchain_mcp_adapters.client import MultiServerMCPClient
+from langchain_mcp_adapters.tools import convert_mcp_tool_to_langchain_tool
+from mcp import ClientSession
+from mcp.types import Tool as MCPTool
 
 from src.agents import create_agent
 from src.tools.search import LoggedTavilySearch
 from src.tools import (
     crawl_tool,
+    get_crawl_many_tool,
     get_web_search_tool,
     python_repl_tool,
 )
+from src.tools.mcp_pool import get_mcp_session_pool, get_mcp_tool_cache
 
-from src.config.agents import AGENT_LLM_MAP
+from src.config.agents import AGENT_LLM_MAP, LLMType
 from src.config.configuration import Configuration
+from src.llms.cascade import is_final_attempt, run_cascade
 from src.llms.llm import get_llm_by_type
-from src.prompts.planner_model import Plan, StepType
-from src.prompts.template import apply_prompt_template
-from src.utils.json_utils import repair_json_output
-
+from src.prompts.planner_model import Plan, Step, StepType
+from src.prompts.template import PromptLayout, apply_prompt_template, get_prompt_layout
+
+from .findings import (
+    FindingsPolicy,
+    build_findings_context,
+    get_findings_policy,
+    summarize_finding,
+)
+from .plan_parser import IncrementalPlanParser, parse_plan
+from .scheduler import get_context_steps, get_ready_steps, get_step_dependencies
 from .types import State
 from ..config import SELECTED_SEARCH_ENGINE, SearchEngine
 
@@ -44,41 +63,55 @@ def handoff_to_planner(
     return
 
 
-def background_investigation_node(
+async def _investigate_background(query: str, configurable: Configuration) -> str:
+    """Search the web for the user query, giving up after the configured timeout."""
+    timeout = float(configurable.background_investigation_timeout)
+    background_investigation_results = None
+    try:
+        if SELECTED_SEARCH_ENGINE == SearchEngine.TAVILY:
+            searched_content = await asyncio.wait_for(
+                LoggedTavilySearch(max_results=configurable.max_search_results).ainvoke(
+                    {"query": query}
+                ),
+                timeout,
+            )
+            if isinstance(searched_content, list):
+                background_investigation_results = [
+                    {"title": elem["title"], "content": elem["content"]}
+                    for elem in searched_content
+                ]
+            else:
+                logger.error(
+                    f"Tavily search returned malformed response: {searched_content}"
+                )
+        else:
+            background_investigation_results = await asyncio.wait_for(
+                get_web_search_tool(configurable.max_search_results).ainvoke(query),
+                timeout,
+            )
+    except asyncio.TimeoutError:
+        # Plan without the background investigation rather than waiting for it
+        logger.warning(f"Background investigation timed out after {timeout}s")
+    return json.dumps(background_investigation_results, ensure_ascii=False)
+
+
+async def background_investigation_node(
     state: State, config: RunnableConfig
 ) -> Command[Literal["planner"]]:
     logger.info("background investigation node is running.")
     configurable = Configuration.from_runnable_config(config)
     query = state["messages"][-1].content
-    if SELECTED_SEARCH_ENGINE == SearchEngine.TAVILY:
-        searched_content = LoggedTavilySearch(
-            max_results=configurable.max_search_results
-        ).invoke({"query": query})
-        background_investigation_results = None
-        if isinstance(searched_content, list):
-            background_investigation_results = [
-                {"title": elem["title"], "content": elem["content"]}
-                for elem in searched_content
-            ]
-        else:
-            logger.error(
-                f"Tavily search returned malformed response: {searched_content}"
-            )
-    else:
-        background_investigation_results = get_web_search_tool(
-            configurable.max_search_results
-        ).invoke(query)
     return Command(
         update={
-            "background_investigation_results": json.dumps(
-                background_investigation_results, ensure_ascii=False
+            "background_investigation_results": await _investigate_background(
+                query, configurable
             )
         },
         goto="planner",
     )
 
 
-def planner_node(
+async def planner_node(
     state: State, config: RunnableConfig
 ) -> Command[Literal["human_feedback", "reporter"]]:
     """Planner node that generate the full plan."""
@@ -103,60 +136,170 @@ def planner_node(
             }
         ]
 
-    if AGENT_LLM_MAP["planner"] == "basic":
-        llm = get_llm_by_type(AGENT_LLM_MAP["planner"]).with_structured_output(
-            Plan,
-            method="json_mode",
-        )
-    else:
-        llm = get_llm_by_type(AGENT_LLM_MAP["planner"])
-
     # if the plan iterations is greater than the max plan iterations, return the reporter node
     if plan_iterations >= configurable.max_plan_iterations:
         return Command(goto="reporter")
 
-    full_response = ""
-    if AGENT_LLM_MAP["planner"] == "basic":
-        response = llm.invoke(messages)
-        full_response = response.model_dump_json(indent=4, exclude_none=True)
-    else:
-        response = llm.stream(messages)
-        for chunk in response:
+    # Steps of an auto accepted plan without dependencies start while it is streamed,
+    # once complete, and only from the plan of a model that is not escalated from
+    early_steps: dict[int, tuple[Step, asyncio.Task]] = {}
+    early_steps_limit = max(int(configurable.max_concurrent_steps), 1)
+
+    async def stream_plan(llm_type: LLMType, llm_config: RunnableConfig) -> str:
+        llm = get_llm_by_type(llm_type)
+        if llm_type in ("basic", "fast"):
+            # Stream the plan in JSON mode, so its steps can be parsed as they complete
+            llm = llm.bind(response_format={"type": "json_object"})
+        start_early_steps = state.get("auto_accepted_plan") and is_final_attempt(
+            llm_config
+        )
+        parser = IncrementalPlanParser()
+        full_response = ""
+        async for chunk in llm.with_config(llm_config).astream(messages):
             full_response += chunk.content
+            if not parser.feed(chunk.content) or not start_early_steps:
+                continue
+            if parser.fields.get("has_enough_context") is not False:
+                continue
+            partial_plan = parser.get_partial_plan()
+            dependencies = get_step_dependencies(partial_plan, partial=True)
+            for index, step in enumerate(partial_plan.steps):
+                if len(early_steps) >= early_steps_limit:
+                    break
+                if index in early_steps or dependencies[index]:
+                    continue
+                logger.info(f"Starting plan step {index} before the plan is complete")
+                step_state = {
+                    **state,
+                    "current_plan": partial_plan,
+                    "current_step_index": index,
+                    "locale": partial_plan.locale,
+                }
+                early_steps[index] = (
+                    step,
+                    asyncio.create_task(
+                        _run_step(step_state, config, _STEP_TYPE_AGENTS[step.step_type])
+                    ),
+                )
+        return full_response
+
+    try:
+        full_response = await run_cascade(
+            "planner",
+            stream_plan,
+            _is_valid_plan,
+            lambda plan: AIMessage(content=plan, name="planner"),
+        )
+    except BaseException:
+        await _cancel_early_steps(early_steps)
+        raise
     logger.debug(f"Current state messages: {state['messages']}")
     logger.info(f"Planner response: {full_response}")
 
     try:
-        curr_plan = json.loads(repair_json_output(full_response))
-    except json.JSONDecodeError:
-        logger.warning("Planner response is not a valid JSON")
+        curr_plan = parse_plan(full_response)
+    except ValidationError as e:
+        logger.warning(f"Planner response is not a valid plan: {e}")
+        await _cancel_early_steps(early_steps)
         if plan_iterations > 0:
-            return Command(goto="reporter")
+            return Command(update={"step_results": None}, goto="reporter")
         else:
-            return Command(goto="__end__")
-    if curr_plan.get("has_enough_context"):
+            return Command(update={"step_results": None}, goto="__end__")
+    if curr_plan.has_enough_context:
         logger.info("Planner response has enough context.")
-        new_plan = Plan.model_validate(curr_plan)
+        await _cancel_early_steps(early_steps)
         return Command(
             update={
                 "messages": [AIMessage(content=full_response, name="planner")],
-                "current_plan": new_plan,
+                "current_plan": curr_plan,
+                "step_results": None,
             },
             goto="reporter",
         )
+
+    step_messages, step_results = await _collect_early_steps(early_steps, curr_plan)
     return Command(
         update={
-            "messages": [AIMessage(content=full_response, name="planner")],
-            "current_plan": full_response,
+            "messages": [
+                AIMessage(content=full_response, name="planner"),
+                *step_messages,
+            ],
+            "current_plan": curr_plan,
+            "step_results": step_results,
         },
         goto="human_feedback",
     )
 
 
+async def _run_step(
+    state: State, config: RunnableConfig, agent_name: str
+) -> Command[Literal["research_team"]]:
+    """Execute a plan step with its agent, inside the node that started it."""
+    # Label the messages streamed by the step with its agent instead of the node,
+    # and keep its agent out of the node's checkpoints, which other steps share
+    child_config = var_child_runnable_config.get() or {}
+    var_child_runnable_config.set(
+        {
+            **child_config,
+            "metadata": {**child_config.get("metadata", {}), "agent_name": agent_name},
+            "configurable": {
+                **child_config.get("configurable", {}),
+                CONFIG_KEY_CHECKPOINTER: None,
+            },
+        }
+    )
+    node = researcher_node if agent_name == "researcher" else coder_node
+    return await node(state, config)
+
+
+def _is_valid_plan(content: str) -> bool:
+    try:
+        parse_plan(content)
+    except ValidationError:
+        return False
+    return True
+
+
+async def _cancel_early_steps(early_steps: dict[int, tuple[Step, asyncio.Task]]):
+    await _cancel_tasks([task for _, task in early_steps.values()])
+
+
+def _is_same_step(step: Step, other: Step) -> bool:
+    """Whether two steps give the same instructions, so one's result fits the other."""
+    fields = {
+        "id",
+        "title",
+        "description",
+        "step_type",
+        "need_web_search",
+        "depends_on",
+    }
+    return step.model_dump(include=fields) == other.model_dump(include=fields)
+
+
+async def _collect_early_steps(
+    early_steps: dict[int, tuple[Step, asyncio.Task]], plan: Plan
+) -> tuple[list, list[dict]]:
+    """Wait for the early steps, keeping the results of those still in the final plan."""
+    step_messages, step_results = [], []
+    for index, (step, task) in early_steps.items():
+        try:
+            result = await task
+        except Exception as e:
+            logger.error(f"Early execution of step '{step.title}' failed: {e}")
+            continue
+        if index >= len(plan.steps) or not _is_same_step(plan.steps[index], step):
+            logger.warning(f"Discarding early result of step '{step.title}'")
+            continue
+        step_messages += result.update["messages"]
+        step_results += result.update["step_results"]
+    return step_messages, step_results
+
+
 def human_feedback_node(
     state,
 ) -> Command[Literal["planner", "research_team", "reporter", "__end__"]]:
-    current_plan = state.get("current_plan", "")
+    current_plan = state.get("current_plan")
     # check if the plan is auto accepted
     auto_accepted_plan = state.get("auto_accepted_plan", False)
     if not auto_accepted_plan:
@@ -169,6 +312,7 @@ def human_feedback_node(
                     "messages": [
                         HumanMessage(content=feedback, name="feedback"),
                     ],
+                    "step_results": None,
                 },
                 goto="planner",
             )
@@ -179,77 +323,98 @@ def human_feedback_node(
 
     # if the plan is accepted, run the following node
     plan_iterations = state["plan_iterations"] if state.get("plan_iterations", 0) else 0
-    goto = "research_team"
-    try:
-        current_plan = repair_json_output(current_plan)
-        # increment the plan iterations
-        plan_iterations += 1
-        # parse the plan
-        new_plan = json.loads(current_plan)
-        if new_plan["has_enough_context"]:
-            goto = "reporter"
-    except json.JSONDecodeError:
-        logger.warning("Planner response is not a valid JSON")
+    if not isinstance(current_plan, Plan):
+        logger.warning("No valid plan to execute")
         if plan_iterations > 0:
             return Command(goto="reporter")
         else:
             return Command(goto="__end__")
 
+    # increment the plan iterations
+    plan_iterations += 1
+    goto = "research_team"
+    if current_plan.has_enough_context:
+        goto = "reporter"
+
     return Command(
         update={
-            "current_plan": Plan.model_validate(new_plan),
+            "current_plan": current_plan,
             "plan_iterations": plan_iterations,
-            "locale": new_plan["locale"],
+            "locale": current_plan.locale,
         },
         goto=goto,
     )
 
 
-def coordinator_node(
-    state: State,
+async def coordinator_node(
+    state: State, config: RunnableConfig
 ) -> Command[Literal["planner", "background_investigator", "__end__"]]:
     """Coordinator node that communicate with customers."""
     logger.info("Coordinator talking.")
-    messages = apply_prompt_template("coordinator", state)
-    response = (
-        get_llm_by_type(AGENT_LLM_MAP["coordinator"])
-        .bind_tools([handoff_to_planner])
-        .invoke(messages)
-    )
-    logger.debug(f"Current state messages: {state['messages']}")
+    configurable = Configuration.from_runnable_config(config)
+    messages = apply_prompt_template("coordinator", state, configurable)
 
-    goto = "__end__"
-    locale = state.get("locale", "en-US")  # Default locale if not specified
+    # In speculative mode, the background investigation of the user message runs
+    # while the coordinator decides whether to hand off, and is cancelled otherwise
+    investigation = None
+    if state.get("enable_background_investigation") and state.get(
+        "enable_speculative_investigation"
+    ):
+        investigation = asyncio.create_task(
+            _investigate_background(state["messages"][-1].content, configurable)
+        )
 
-    if len(response.tool_calls) > 0:
-        goto = "planner"
-        if state.get("enable_background_investigation"):
-            # if the search_before_planning is True, add the web search tool to the planner agent
-            goto = "background_investigator"
-        try:
-            for tool_call in response.tool_calls:
-                if tool_call.get("name", "") != "handoff_to_planner":
-                    continue
-                if tool_locale := tool_call.get("args", {}).get("locale"):
-                    locale = tool_locale
-                    break
-        except Exception as e:
-            logger.error(f"Error processing tool calls: {e}")
-    else:
-        logger.warning(
-            "Coordinator response contains no tool calls. Terminating workflow execution."
+    try:
+        # Answers without a handoff escalate to the next model of a cascade
+        response = await run_cascade(
+            "coordinator",
+            lambda llm_type, llm_config: get_llm_by_type(llm_type)
+            .bind_tools([handoff_to_planner])
+            .with_config(llm_config)
+            .ainvoke(messages),
+            lambda response: len(response.tool_calls) > 0,
         )
-        logger.debug(f"Coordinator response: {response}")
+        logger.debug(f"Current state messages: {state['messages']}")
+
+        update = {}
+        goto = "__end__"
+        locale = state.get("locale", "en-US")  # Default locale if not specified
+
+        if len(response.tool_calls) > 0:
+            goto = "planner"
+            if investigation:
+                update["background_investigation_results"] = await investigation
+            elif state.get("enable_background_investigation"):
+                # if the search_before_planning is True, add the web search tool to the planner agent
+                goto = "background_investigator"
+            try:
+                for tool_call in response.tool_calls:
+                    if tool_call.get("name", "") != "handoff_to_planner":
+                        continue
+                    if tool_locale := tool_call.get("args", {}).get("locale"):
+                        locale = tool_locale
+                        break
+            except Exception as e:
+                logger.error(f"Error processing tool calls: {e}")
+        else:
+            logger.warning(
+                "Coordinator response contains no tool calls. Terminating workflow execution."
+            )
+            logger.debug(f"Coordinator response: {response}")
+    finally:
+        if investigation and not investigation.done():
+            investigation.cancel()
 
     return Command(
-        update={"locale": locale},
+        update={"locale": locale, **update},
         goto=goto,
     )
 
 
-def reporter_node(state: State):
+async def reporter_node(state: State, config: RunnableConfig):
     """Reporter node that write a final report."""
     logger.info("Reporter write final report")
+    configurable = Configuration.from_runnable_config(config)
     current_plan = state.get("current_plan")
     input_ = {
         "messages": [
@@ -259,7 +424,7 @@ def reporter_node(state: State):
         ],
         "locale": state.get("locale", "en-US"),
     }
-    invoke_messages = apply_prompt_template("reporter", input_)
+    invoke_messages = apply_prompt_template("reporter", input_, configurable)
     observations = state.get("observations", [])
 
     # Add a reminder about the new report format, citation style, and table usage
@@ -278,81 +443,161 @@ def reporter_node(state: State):
             )
         )
     logger.debug(f"Current invoke messages: {invoke_messages}")
-    response = get_llm_by_type(AGENT_LLM_MAP["reporter"]).invoke(invoke_messages)
-    response_content = response.content
+    # Stream the report so its tokens reach the `messages` stream as they are
+    # generated, and assemble the final report from the chunks
+    response_content = ""
+    async for chunk in get_llm_by_type(AGENT_LLM_MAP["reporter"]).astream(
+        invoke_messages
+    ):
+        response_content += chunk.content
     logger.info(f"reporter response: {response_content}")
 
     return {"final_report": response_content}
 
 
-def research_team_node(
-    state: State,
-) -> Command[Literal["planner", "researcher", "coder"]]:
-    """Research team node that collaborates on tasks."""
+async def research_team_node(
+    state: State, config: RunnableConfig
+) -> Command[Literal["planner"]]:
+    """Research team node that executes the plan steps as their dependencies complete."""
     logger.info("Research team is collaborating on tasks.")
+    configurable = Configuration.from_runnable_config(config)
     current_plan = state.get("current_plan")
     if not current_plan or not current_plan.steps:
         return Command(goto="planner")
-    if all(step.execution_res for step in current_plan.steps):
-        return Command(goto="planner")
-    for step in current_plan.steps:
-        if not step.execution_res:
-            break
-    if step.step_type and step.step_type == StepType.RESEARCH:
-        return Command(goto="researcher")
-    if step.step_type and step.step_type == StepType.PROCESSING:
-        return Command(goto="coder")
-    return Command(goto="planner")
+
+    # Steps executed early by the planner come back as step results
+    step_results = list(state.get("step_results") or [])
+    for result in step_results:
+        _merge_step_result(current_plan, result)
+    # Record the findings policy the steps of this run are executed with
+    findings_policy = get_findings_policy(configurable.findings_policy).value
+
+    # Each step starts as soon as the steps it depends on are done, the critical
+    # path going first whenever more steps are ready than the concurrency limit
+    limit = max(int(configurable.max_concurrent_steps), 1)
+    running: dict[asyncio.Task, int] = {}
+    step_messages: dict[int, list] = {}
+    try:
+        while True:
+            for index in get_ready_steps(
+                current_plan, limit - len(running), running.values()
+            ):
+                logger.info(f"Starting plan step {index}")
+                step_state = {
+                    **state,
+                    "current_plan": current_plan,
+                    "current_step_index": index,
+                }
+                agent_name = _STEP_TYPE_AGENTS[current_plan.steps[index].step_type]
+                task = asyncio.create_task(_run_step(step_state, config, agent_name))
+                running[task] = index
+            if not running:
+                break
+            done, _ = await asyncio.wait(running, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                index = running.pop(task)
+                result = task.result()
+                step_messages[index] = result.update.get("messages", [])
+                for step_result in result.update.get("step_results", []):
+                    _merge_step_result(current_plan, step_result)
+                    step_results.append(step_result)
+    finally:
+        await _cancel_tasks(running)
+
+    # Findings are merged back in plan order, whatever order the steps ended in
+    observations = state.get("observations", []) + [
+        result["execution_res"]
+        for result in sorted(step_results, key=lambda r: r["step_index"])
+    ]
+    return Command(
+        update={
+            "messages": [
+                message
+                for index in sorted(step_messages)
+                for message in step_messages[index]
+            ],
+            "current_plan": current_plan,
+            "observations": observations,
+            "step_results": None,
+            "findings_policy": findings_policy,
+        },
+        goto="planner",
+    )
+
+
+def _merge_step_result(plan: Plan, result: dict) -> None:
+    step = plan.steps[result["step_index"]]
+    step.execution_res = result["execution_res"]
+    step.execution_summary = result.get("execution_summary")
+
+
+async def _cancel_tasks(tasks) -> None:
+    """Cancel tasks and wait for them to end, so that none is left running."""
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+
+
+_STEP_TYPE_AGENTS = {
+    StepType.RESEARCH: "researcher",
+    StepType.PROCESSING: "coder",
+}
 
 
 async def _execute_agent_step(
-    state: State, agent, agent_name: str
+    state: State, configurable: Configuration, agent, agent_name: str
 ) -> Command[Literal["research_team"]]:
     """Helper function to execute a step using the specified agent."""
     current_plan = state.get("current_plan")
-    observations = state.get("observations", [])
 
-    # Find the first unexecuted step
-    current_step = None
-    completed_steps = []
-    for step in current_plan.steps:
-        if not step.execution_res:
-            current_step = step
-            break
-        else:
-            completed_steps.append(step)
+    # Use the step dispatched by the research team, or the first unexecuted one
+    step_index = state.get("current_step_index")
+    if step_index is None:
+        step_index = next(
+            (i for i, step in enumerate(current_plan.steps) if not step.execution_res),
+            None,
+        )
 
-    if not current_step:
+    if step_index is None:
         logger.warning("No unexecuted step found")
         return Command(goto="research_team")
 
-    logger.info(f"Executing step: {current_step.title}")
+    current_step = current_plan.steps[step_index]
+    completed_steps = get_context_steps(current_plan, step_index)
 
-    # Format completed steps information
-    completed_steps_info = ""
-    if completed_steps:
-        completed_steps_info = "# Existing Research Findings\n\n"
-        for i, step in enumerate(completed_steps):
-            completed_steps_info += f"## Existing Finding {i+1}: {step.title}\n\n"
-            completed_steps_info += f"<finding>\n{step.execution_res}\n</finding>\n\n"
+    logger.info(f"Executing step: {current_step.title}")
 
-    # Prepare the input for the agent with completed steps info
-    agent_input = {
-        "messages": [
-            HumanMessage(
-                content=f"{completed_steps_info}# Current Task\n\n## Title\n\n{current_step.title}\n\n## Description\n\n{current_step.description}\n\n## Locale\n\n{state.get('locale', 'en-US')}"
-            )
-        ]
-    }
+    # Format completed steps information within the findings budget
+    findings_policy = get_findings_policy(configurable.findings_policy)
+    completed_steps_info = build_findings_context(
+        completed_steps, findings_policy, int(configurable.findings_budget_chars)
+    )
 
+    task_info = f"# Current Task\n\n## Title\n\n{current_step.title}\n\n## Description\n\n{current_step.description}\n\n## Locale\n\n{state.get('locale', 'en-US')}"
     # Add citation reminder for researcher agent
-    if agent_name == "researcher":
-        agent_input["messages"].append(
+    citation_reminder = (
+        [
             HumanMessage(
                 content="IMPORTANT: DO NOT include inline citations in the text. Instead, track all sources and include a References section at the end using link reference format. Include an empty line between each citation for better readability. Use this format for each reference:\n- [Source Title](URL)\n\n- [Another Source](URL)",
                 name="system",
             )
-        )
+        ]
+        if agent_name == "researcher"
+        else []
+    )
+
+    # Prepare the input for the agent with completed steps info
+    if get_prompt_layout(configurable) == PromptLayout.PREFIX_CACHE:
+        # The static reminder comes first and the changing findings last
+        agent_input = {
+            "messages": citation_reminder
+            + [HumanMessage(content=f"{task_info}\n\n{completed_steps_info}")]
+        }
+    else:
+        agent_input = {
+            "messages": [HumanMessage(content=f"{completed_steps_info}{task_info}")]
+            + citation_reminder
+        }
 
     # Invoke the agent
     default_recursion_limit = 25
@@ -385,9 +630,16 @@ async def _execute_agent_step(
     response_content = result["messages"][-1].content
     logger.debug(f"{agent_name.capitalize()} full response: {response_content}")
 
-    # Update the step with the execution result
-    current_step.execution_res = response_content
+    # The research team merges the execution result back into the plan
     logger.info(f"Step '{current_step.title}' execution completed by {agent_name}")
+    step_result = {"step_index": step_index, "execution_res": response_content}
+    if findings_policy == FindingsPolicy.SUMMARY:
+        try:
+            step_result["execution_summary"] = await summarize_finding(
+                current_step, response_content
+            )
+        except Exception as e:
+            logger.error(f"Failed to summarize step '{current_step.title}': {e}")
 
     return Command(
         update={
@@ -397,12 +649,45 @@ async def _execute_agent_step(
                     name=agent_name,
                 )
             ],
-            "observations": observations + [response_content],
+            "step_results": [step_result],
         },
         goto="research_team",
     )
 
 
+# Converted MCP tools of the pooled sessions, kept stable so that agents can be reused
+_mcp_tools: OrderedDict[tuple, BaseTool] = OrderedDict()
+_mcp_tools_lock = threading.Lock()
+_MCP_TOOLS_CACHE_SIZE = 256
+
+
+def _get_mcp_tool(session: ClientSession, server_name: str, mcp_tool: MCPTool):
+    """Get the LangChain tool calling an MCP tool through a session."""
+    # The cached tool references the session, so its id cannot be reused meanwhile
+    key = (id(session), server_name, mcp_tool.model_dump_json())
+    with _mcp_tools_lock:
+        if key in _mcp_tools:
+            _mcp_tools.move_to_end(key)
+            return _mcp_tools[key]
+    tool = convert_mcp_tool_to_langchain_tool(session, mcp_tool)
+    tool.description = f"Powered by '{server_name}'.\n{tool.description}"
+    with _mcp_tools_lock:
+        _mcp_tools[key] = tool
+        while len(_mcp_tools) > _MCP_TOOLS_CACHE_SIZE:
+            _mcp_tools.popitem(last=False)
+    return tool
+
+
+def _evict_mcp_tools(session: ClientSession):
+    """Forget the tools of a session closed by the pool."""
+    with _mcp_tools_lock:
+        for key in [key for key in _mcp_tools if key[0] == id(session)]:
+            del _mcp_tools[key]
+
+
+get_mcp_session_pool().add_close_listener(_evict_mcp_tools)
+
+
 async def _setup_and_execute_agent_step(
     state: State,
     config: RunnableConfig,
@@ -446,20 +731,21 @@ async def _setup_and_execute_agent_step(
 
     # Create and execute agent with MCP tools if available
     if mcp_servers:
-        async with MultiServerMCPClient(mcp_servers) as client:
+        pool = get_mcp_session_pool()
+        tool_cache = get_mcp_tool_cache()
+        async with AsyncExitStack() as stack:
             loaded_tools = default_tools[:]
-            for tool in client.get_tools():
-                if tool.name in enabled_tools:
-                    tool.description = (
-                        f"Powered by '{enabled_tools[tool.name]}'.\n{tool.description}"
-                    )
-                    loaded_tools.append(tool)
+            for server_name, server_config in mcp_servers.items():
+                session = await stack.enter_async_context(pool.session(server_config))
+                for tool in await tool_cache.get_tools(server_config):
+                    if enabled_tools.get(tool.name) == server_name:
+                        loaded_tools.append(_get_mcp_tool(session, server_name, tool))
             agent = create_agent(agent_type, agent_type, loaded_tools, agent_type)
-            return await _execute_agent_step(state, agent, agent_type)
+            return await _execute_agent_step(state, configurable, agent, agent_type)
     else:
         # Use default tools if no MCP servers are configured
         agent = create_agent(agent_type, agent_type, default_tools, agent_type)
-        return await _execute_agent_step(state, agent, agent_type)
+        return await _execute_agent_step(state, configurable, agent, agent_type)
 
 
 async def researcher_node(
@@ -472,7 +758,11 @@ async def researcher_node(
         state,
         config,
         "researcher",
-        [get_web_search_tool(configurable.max_search_results), crawl_tool],
+        [
+            get_web_search_tool(configurable.max_search_results),
+            crawl_tool,
+            get_crawl_many_tool(int(configurable.max_concurrent_crawls)),
+        ],
     )
 
 
@@ -0,0 +1,147 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+import logging
+from typing import Any
+
+from pydantic import ValidationError
+
+from src.prompts.planner_model import Plan, Step
+from src.utils.json_utils import repair_json_output
+
+logger = logging.getLogger(__name__)
+
+
+def parse_plan(content: str) -> Plan:
+    """
+    Parse a planner response into a plan, repairing the JSON only if needed.
+
+    Well-formed responses are parsed and validated in a single pass, and only
+    responses that are not valid JSON, like those wrapped in code fences, go
+    through the slower repair.
+
+    Args:
+        content: The planner response
+
+    Returns:
+        The validated plan
+
+    Raises:
+        ValidationError: If the response is not a valid plan, even once repaired
+    """
+    try:
+        return Plan.model_validate_json(content)
+    except ValidationError as e:
+        if any(error["type"] != "json_invalid" for error in e.errors()):
+            raise
+    return Plan.model_validate_json(repair_json_output(content))
+
+
+class IncrementalPlanParser:
+    """Parse the steps of a plan while the planner is still streaming it.
+
+    The parser scans the streamed JSON once, character by character, tracking
+    strings and nesting. Every object in the top-level `steps` array is parsed
+    into a `Step` as soon as it is closed, and the primitive top-level fields
+    such as `has_enough_context` as soon as their value ends. Anything it cannot
+    parse is left to the parsing of the complete response.
+    """
+
+    def __init__(self):
+        self.fields: dict[str, Any] = {}
+        self.steps: list[Step] = []
+        self._buffer = ""
+        self._position = 0
+        self._stack: list[str] = []
+        self._in_string = False
+        self._escaped = False
+        self._string_start = 0
+        self._last_string = None
+        self._key = None
+        self._value_start = None
+        self._steps_depth = None
+        self._step_start = None
+
+    def feed(self, content: str) -> list[Step]:
+        """
+        Add streamed content to the plan.
+
+        Args:
+            content: The next chunk of the planner response
+
+        Returns:
+            The steps completed by this chunk, in plan order
+        """
+        self._buffer += content
+        completed = []
+        for i in range(self._position, len(self._buffer)):
+            char = self._buffer[i]
+            if self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                    self._last_string = self._buffer[self._string_start : i]
+                continue
+
+            if char == '"':
+                self._in_string = True
+                self._string_start = i + 1
+            elif char == ":" and len(self._stack) == 1:
+                self._key = self._last_string
+                self._value_start = i + 1
+            elif char in "{[":
+                if char == "[" and len(self._stack) == 1 and self._key == "steps":
+                    self._steps_depth = len(self._stack) + 1
+                elif char == "{" and len(self._stack) == self._steps_depth:
+                    self._step_start = i
+                self._stack.append(char)
+            elif char in "}]":
+                if not self._stack:
+                    continue
+                if len(self._stack) == 1:
+                    self._end_field(i)
+                self._stack.pop()
+                if char == "}" and len(self._stack) == self._steps_depth:
+                    if step := self._parse_step(self._buffer[self._step_start : i + 1]):
+                        completed.append(step)
+            elif char == "," and len(self._stack) == 1:
+                self._end_field(i)
+        self._position = len(self._buffer)
+        return completed
+
+    def _end_field(self, end: int):
+        if self._value_start is None:
+            return
+        value = self._buffer[self._value_start : end].strip()
+        self._value_start = None
+        if not value or value[0] in "{[":
+            return
+        try:
+            self.fields[self._key] = json.loads(value)
+        except json.JSONDecodeError:
+            logger.debug(f"Could not parse plan field '{self._key}': {value}")
+
+    def _parse_step(self, content: str) -> Step | None:
+        try:
+            step = Step.model_validate_json(content)
+        except ValidationError as e:
+            # Stop reporting steps, since their indexes would no longer match the plan
+            logger.debug(f"Could not parse streamed plan step: {e}")
+            self._steps_depth = None
+            return None
+        self.steps.append(step)
+        return step
+
+    def get_partial_plan(self) -> Plan:
+        """Build a plan of the fields and steps parsed so far."""
+        return Plan(
+            locale=self.fields.get("locale", "en-US"),
+            has_enough_context=bool(self.fields.get("has_enough_context", False)),
+            thought=str(self.fields.get("thought", "")),
+            title=str(self.fields.get("title", "")),
+            steps=[step.model_copy() for step in self.steps],
+        )
@@ -0,0 +1,68 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Compare the parsing of plans with the repair and validation round trips it replaced.
+
+Run with:
+
+    python -m src.graph.plan_parser_benchmark
+"""
+
+import json
+import timeit
+
+import json_repair
+
+from src.prompts.planner_model import Plan, Step
+
+from .plan_parser import parse_plan
+
+
+def _repair(content: str) -> str:
+    # What repair_json_output did for every response before its fast path
+    return json.dumps(json_repair.loads(content), ensure_ascii=False)
+
+
+def _parse_plan_with_round_trips(content: str) -> Plan:
+    # The planner repaired and loaded the response, then stored it as a string
+    # that the human feedback node repaired, loaded and validated again
+    json.loads(_repair(content))
+    return Plan.model_validate(json.loads(_repair(content)))
+
+
+def _build_plan_content(num_steps: int) -> str:
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="Benchmark the parsing of plans. " * 20,
+        title="Benchmark",
+        steps=[
+            Step(
+                need_web_search=True,
+                title=f"Step {i}",
+                description="Collect data about the benchmark. " * 10,
+                step_type="research",
+            )
+            for i in range(num_steps)
+        ],
+    ).model_dump_json(indent=4, exclude_none=True)
+
+
+def main():
+    for num_steps in (3, 30, 300):
+        content = _build_plan_content(num_steps)
+        number = max(3000 // num_steps, 5)
+        before = timeit.timeit(
+            lambda: _parse_plan_with_round_trips(content), number=number
+        )
+        after = timeit.timeit(lambda: parse_plan(content), number=number)
+        print(
+            f"{num_steps:>4} steps, {len(content):>8} chars: "
+            f"{before / number * 1000:8.3f} ms -> {after / number * 1000:8.3f} ms "
+            f"({before / after:.0f}x)"
+        )
+
+
+if __name__ == "__main__":
+    main()
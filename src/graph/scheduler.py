@@ -0,0 +1,142 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import logging
+from typing import Collection
+
+from src.prompts.planner_model import Plan, Step, StepType
+
+logger = logging.getLogger(__name__)
+
+
+def has_explicit_dependencies(plan: Plan) -> bool:
+    """Whether the planner declared step ids and dependencies for the plan."""
+    return any(step.id or step.depends_on for step in plan.steps)
+
+
+def get_step_dependencies(plan: Plan, partial: bool = False) -> list[set[int]]:
+    """
+    Resolve the dependencies of every step in the plan to step indexes.
+
+    Plans with explicit `id`/`depends_on` fields are used as declared. For plans
+    without them, research steps only wait for the latest processing step before
+    them, and processing steps wait for every step before them.
+
+    Args:
+        plan: The plan to resolve
+        partial: Whether the plan is still being streamed, so that a dependency
+            on an unknown id may be on a step yet to come. It then resolves to
+            the index of the next step instead of being ignored as invalid.
+
+    Returns:
+        The set of step indexes each step depends on, in plan order
+    """
+    dependencies = []
+    if has_explicit_dependencies(plan):
+        step_indexes = {step.id: i for i, step in enumerate(plan.steps) if step.id}
+        for i, step in enumerate(plan.steps):
+            step_dependencies = set()
+            for step_id in step.depends_on:
+                index = step_indexes.get(step_id)
+                if index is None and partial:
+                    step_dependencies.add(len(plan.steps))
+                    continue
+                if index is None or index == i:
+                    if not partial:
+                        logger.warning(
+                            f"Ignoring invalid dependency '{step_id}' of step '{step.title}'"
+                        )
+                    continue
+                step_dependencies.add(index)
+            dependencies.append(step_dependencies)
+        return dependencies
+
+    last_processing_step = None
+    for i, step in enumerate(plan.steps):
+        if step.step_type == StepType.PROCESSING:
+            dependencies.append(set(range(i)))
+            last_processing_step = i
+        elif last_processing_step is not None:
+            dependencies.append({last_processing_step})
+        else:
+            dependencies.append(set())
+    return dependencies
+
+
+def _get_critical_path_lengths(dependencies: list[set[int]]) -> list[int]:
+    """Length of the longest chain of dependent steps starting at each step."""
+    dependents = [[] for _ in dependencies]
+    for i, step_dependencies in enumerate(dependencies):
+        for dependency in step_dependencies:
+            dependents[dependency].append(i)
+
+    lengths: dict[int, int] = {}
+
+    def visit(index: int, visiting: set[int]) -> int:
+        if index in lengths:
+            return lengths[index]
+        if index in visiting:
+            # Dependency cycle, it is broken by the fallback in `get_ready_steps`
+            return 0
+        visiting.add(index)
+        length = 1 + max(
+            (visit(dependent, visiting) for dependent in dependents[index]), default=0
+        )
+        visiting.discard(index)
+        lengths[index] = length
+        return length
+
+    return [visit(i, set()) for i in range(len(dependencies))]
+
+
+def get_ready_steps(plan: Plan, limit: int, running: Collection[int] = ()) -> list[int]:
+    """
+    Pick the unexecuted steps whose dependencies are all done.
+
+    Steps heading the longest chain of dependent steps come first, so the
+    critical path of the plan is never held back by the concurrency limit.
+
+    Args:
+        plan: The plan to schedule
+        limit: The maximum number of steps to return
+        running: The steps being executed, which are not picked again
+
+    Returns:
+        The indexes of the steps to execute next
+    """
+    if limit <= 0:
+        return []
+    dependencies = get_step_dependencies(plan)
+    pending = [
+        i
+        for i, step in enumerate(plan.steps)
+        if not step.execution_res and i not in running
+    ]
+    ready = [
+        i
+        for i in pending
+        if all(plan.steps[dependency].execution_res for dependency in dependencies[i])
+    ]
+    if not ready and pending and not running:
+        logger.warning(
+            "No plan step has its dependencies satisfied, falling back to plan order"
+        )
+        ready = pending[:1]
+
+    critical_path_lengths = _get_critical_path_lengths(dependencies)
+    ready.sort(key=lambda i: (-critical_path_lengths[i], i))
+    return ready[:limit]
+
+
+def get_context_steps(plan: Plan, index: int) -> list[Step]:
+    """
+    Get the executed steps whose findings are relevant to the given step.
+
+    With explicit dependencies only the steps it depends on are relevant,
+    otherwise every executed step before it is.
+    """
+    if has_explicit_dependencies(plan):
+        candidates = sorted(get_step_dependencies(plan)[index])
+    else:
+        candidates = range(index)
+    return [plan.steps[i] for i in candidates if plan.steps[i].execution_res]
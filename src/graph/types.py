@@ -9,6 +9,13 @@ from langgraph.graph import MessagesState
 from src.prompts.planner_model import Plan
 
 
+def merge_step_results(left: list[dict] | None, right: list[dict] | None) -> list[dict]:
+    """Accumulate results of concurrently executed steps, `None` resets the list."""
+    if right is None:
+        return []
+    return (left or []) + right
+
+
 class State(MessagesState):
     """State for the agent system, extends MessagesState with next field."""
 
@@ -16,8 +23,11 @@ class State(MessagesState):
     locale: str = "en-US"
     observations: list[str] = []
     plan_iterations: int = 0
-    current_plan: Plan | str = None
+    current_plan: Plan = None
     final_report: str = ""
     auto_accepted_plan: bool = False
     enable_background_investigation: bool = True
+    enable_speculative_investigation: bool = False
     background_investigation_results: str = None
+    step_results: Annotated[list[dict], merge_step_results] = []
+    findings_policy: str = None
@@ -0,0 +1,157 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import hashlib
+import json
+import logging
+import os
+import re
+import threading
+import time
+from typing import Any, Optional
+
+from langchain_core.messages import BaseMessage
+
+from src.utils.lru_table import LRUTable
+
+logger = logging.getLogger(__name__)
+
+# Time of day of the CURRENT_TIME header of the prompts, like "12:34:56 +0800"
+_CURRENT_TIME_OF_DAY = re.compile(
+    r"^(CURRENT_TIME: \w{3} \w{3} \d{2} \d{4}) \d{2}:\d{2}:\d{2}.*$", re.MULTILINE
+)
+
+
+def normalize_messages(messages: list[BaseMessage]) -> list[dict[str, Any]]:
+    """Reduce messages to what the model sees, dropping ids and metadata.
+
+    Message and tool call ids are generated for every run, so keeping them
+    would keep identical conversations from sharing cached responses. For the
+    same reason, the current time of system prompts is reduced to the date, so
+    that responses are shared within a day whatever the prompt layout.
+    """
+    normalized = []
+    for message in messages:
+        content = message.content
+        if message.type == "system" and isinstance(content, str):
+            content = _CURRENT_TIME_OF_DAY.sub(r"\1", content)
+        item = {"type": message.type, "content": content}
+        if message.name:
+            item["name"] = message.name
+        if tool_calls := getattr(message, "tool_calls", None):
+            item["tool_calls"] = [
+                {"name": tool_call["name"], "args": tool_call["args"]}
+                for tool_call in tool_calls
+            ]
+        normalized.append(item)
+    return normalized
+
+
+def get_cache_key(llm_string: str, messages: list[BaseMessage]) -> str:
+    """Hash the model configuration, bound tools and messages of a request."""
+    payload = json.dumps(
+        [llm_string, normalize_messages(messages)],
+        sort_keys=True,
+        ensure_ascii=False,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class LLMResponseCache:
+    """Cache of model responses in an embedded SQLite database.
+
+    A response is stored as the list of chunks it was generated as, so that
+    streamed requests can replay it. Entries expire after the TTL, and the least
+    recently used ones are evicted to stay within the entry and size limits.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 10000,
+        max_bytes: int = 256 * 1024 * 1024,
+        ttl_seconds: int = 7 * 24 * 3600,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._table = LRUTable(path, "responses")
+
+    def close(self) -> None:
+        self._table.close()
+
+    def lookup(self, key: str) -> Optional[list[dict[str, Any]]]:
+        """Get the chunks of a cached response, counting the hit or miss."""
+        now = time.time()
+        with self._table.transaction():
+            row = self._table.get(key, "value, created_at")
+            if row and self.ttl_seconds > 0 and row[1] < now - self.ttl_seconds:
+                self._table.delete(key)
+                row = None
+            if row is None:
+                self.misses += 1
+                return None
+            self._table.set(key, accessed_at=now)
+            self.hits += 1
+        return json.loads(row[0])
+
+    def update(self, key: str, chunks: list[dict[str, Any]]) -> None:
+        """Store the chunks of a response, then evict entries over the limits."""
+        value = json.dumps(chunks, ensure_ascii=False)
+        size = len(value.encode())
+        if self.max_bytes > 0 and size > self.max_bytes:
+            logger.debug(f"Not caching a response of {size} bytes")
+            return
+        now = time.time()
+        with self._table.transaction():
+            if self.ttl_seconds > 0:
+                self._table.delete_created_before(now - self.ttl_seconds)
+            self._table.put(key, value, now)
+            self._table.evict(self.max_entries, self.max_bytes)
+
+    def clear(self) -> None:
+        self._table.clear()
+
+    def stats(self) -> dict[str, Any]:
+        """Get the hit and miss counters, along with the size of the cache."""
+        entries, size = self._table.size()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+            "entries": entries,
+            "bytes": size,
+        }
+
+
+_response_cache: Optional[LLMResponseCache] = None
+_response_cache_lock = threading.Lock()
+
+
+def get_llm_response_cache() -> Optional[LLMResponseCache]:
+    """Get the response cache configured by the environment, if enabled.
+
+    The cache is opt-in: set LLM_RESPONSE_CACHE=sqlite to enable it.
+    """
+    global _response_cache
+    if os.getenv("LLM_RESPONSE_CACHE", "").lower() != "sqlite":
+        return None
+    with _response_cache_lock:
+        if _response_cache is None:
+            _response_cache = LLMResponseCache(
+                os.getenv("LLM_RESPONSE_CACHE_PATH", "llm_cache.db"),
+                max_entries=int(os.getenv("LLM_RESPONSE_CACHE_MAX_ENTRIES", "10000")),
+                max_bytes=int(
+                    os.getenv("LLM_RESPONSE_CACHE_MAX_BYTES", str(256 * 1024 * 1024))
+                ),
+                ttl_seconds=int(
+                    os.getenv("LLM_RESPONSE_CACHE_TTL_SECONDS", str(7 * 24 * 3600))
+                ),
+            )
+            logger.info(f"Caching LLM responses in {_response_cache.path}")
+        return _response_cache
@@ -0,0 +1,143 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import logging
+import threading
+from collections import Counter
+from typing import Any, Awaitable, Callable, TypeVar
+
+from langchain_core.callbacks import AsyncCallbackManager
+from langchain_core.messages import AIMessage, BaseMessage
+from langchain_core.outputs import ChatGeneration, LLMResult
+from langchain_core.runnables import RunnableConfig, ensure_config
+
+from src.config.agents import AGENT_LLM_CASCADE, AGENT_LLM_MAP, LLMType
+from src.llms.llm import _to_chunk
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def get_llm_chain(role: str) -> list[LLMType]:
+    """Get the models a role tries in order, its mapped model unless it cascades."""
+    return AGENT_LLM_CASCADE.get(role) or [AGENT_LLM_MAP[role]]
+
+
+class CascadeStats:
+    """Count which model of a cascade answered the calls of a role."""
+
+    def __init__(self):
+        self.calls = 0
+        self.escalated_calls = 0
+        self.answered_by: Counter[str] = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, llm_type: LLMType, escalated: bool) -> None:
+        with self._lock:
+            self.calls += 1
+            self.escalated_calls += escalated
+            self.answered_by[llm_type] += 1
+
+    def stats(self) -> dict[str, Any]:
+        with self._lock:
+            return {
+                "calls": self.calls,
+                "escalated_calls": self.escalated_calls,
+                "escalation_rate": (
+                    self.escalated_calls / self.calls if self.calls else 0.0
+                ),
+                "answered_by": dict(self.answered_by),
+            }
+
+
+_stats: dict[str, CascadeStats] = {}
+_stats_lock = threading.Lock()
+
+
+def _get_stats(role: str) -> CascadeStats:
+    with _stats_lock:
+        return _stats.setdefault(role, CascadeStats())
+
+
+def get_cascade_stats() -> dict[str, dict[str, Any]]:
+    with _stats_lock:
+        return {role: stats.stats() for role, stats in _stats.items()}
+
+
+def _to_message(result: Any) -> BaseMessage:
+    return result if isinstance(result, BaseMessage) else AIMessage(content=str(result))
+
+
+async def _emit(role: str, message: BaseMessage) -> None:
+    """Report an answer to the callbacks of the run, as if its model streamed it.
+
+    Only the answers a cascade keeps should reach the `messages` stream of the
+    graph, so the models that may be escalated from answer without streaming.
+    """
+    config = ensure_config()
+    manager = AsyncCallbackManager.configure(
+        config.get("callbacks"),
+        inheritable_tags=config.get("tags"),
+        inheritable_metadata=config.get("metadata"),
+    )
+    for run_manager in await manager.on_chat_model_start(
+        {"name": role}, [[]], name=f"{role}_cascade"
+    ):
+        generation = ChatGeneration(message=message)
+        chunk = _to_chunk(generation)
+        await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+        await run_manager.on_llm_end(LLMResult(generations=[[generation]]))
+
+
+def is_final_attempt(config: RunnableConfig) -> bool:
+    """Whether an attempt is of the last model of its cascade, never escalated from."""
+    return "nostream" not in config.get("tags", [])
+
+
+async def run_cascade(
+    role: str,
+    attempt: Callable[[LLMType, RunnableConfig], Awaitable[T]],
+    validate: Callable[[T], bool],
+    to_message: Callable[[T], BaseMessage] = _to_message,
+) -> T:
+    """
+    Answer with the models of a role in order, until one answers validly.
+
+    The answer of the last model is returned even if it is not valid, so that
+    the role handles it as it would without a cascade. Errors of the other
+    models escalate to the next one as invalid answers do. The last model
+    streams its answer, while the others are kept out of the `messages` stream
+    and their answer is reported once it is valid.
+
+    Args:
+        role: The agent role, such as the coordinator or the planner
+        attempt: Answer with a model type, called with the config of the model
+        validate: Whether an answer is good enough to stop the cascade
+        to_message: Get the message of an answer that is not a message itself
+
+    Returns:
+        The first valid answer, or the answer of the last model
+    """
+    chain = get_llm_chain(role)
+    for level, llm_type in enumerate(chain):
+        if level == len(chain) - 1:
+            result = await attempt(llm_type, RunnableConfig())
+        else:
+            try:
+                result = await attempt(llm_type, RunnableConfig(tags=["nostream"]))
+            except Exception as e:
+                logger.warning(
+                    f"{role} failed with {llm_type} ({e}), escalating to {chain[level + 1]}"
+                )
+                continue
+            if not validate(result):
+                logger.info(
+                    f"{role} answer of {llm_type} is not valid, "
+                    f"escalating to {chain[level + 1]}"
+                )
+                continue
+            await _emit(role, to_message(result))
+        if len(chain) > 1:
+            _get_stats(role).record(llm_type, level > 0)
+        return result
@@ -0,0 +1,192 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Iterator, Optional
+
+DEFAULT_TENANT = "default"
+
+
+def get_tenant(metadata: Optional[dict[str, Any]]) -> str:
+    """Get who an LLM call is made for, from the metadata of its run."""
+    metadata = metadata or {}
+    return str(metadata.get("tenant_id") or metadata.get("thread_id") or DEFAULT_TENANT)
+
+
+class _Waiter:
+    def __init__(self, notify: Callable[[], None]):
+        self.notify = notify
+        self.granted = False
+
+
+class ConcurrencyGovernor:
+    """Limit the LLM calls in flight, queueing the others fairly across tenants.
+
+    When every slot is taken, calls wait in a queue per tenant, and freed slots
+    go to the tenants in turn, so a thread issuing many calls at once cannot
+    starve the others. Both sync and async calls share the same slots, since
+    some graphs call models from worker threads.
+    """
+
+    def __init__(self, max_in_flight: int, wait_samples: int = 1000):
+        if max_in_flight < 1:
+            raise ValueError("max_in_flight must be at least 1")
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+        self.calls = 0
+        self.queued_calls = 0
+        self.wait_seconds_total = 0.0
+        self.wait_seconds_max = 0.0
+        self._waits: deque[float] = deque(maxlen=wait_samples)
+        self._queues: OrderedDict[str, deque[_Waiter]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _try_acquire(self, tenant: str, waiter: _Waiter) -> bool:
+        with self._lock:
+            if self.in_flight < self.max_in_flight and not self._queues:
+                self.in_flight += 1
+                return True
+            self._queues.setdefault(tenant, deque()).append(waiter)
+            return False
+
+    def _cancel(self, tenant: str, waiter: _Waiter) -> None:
+        with self._lock:
+            if not waiter.granted:
+                queue = self._queues[tenant]
+                queue.remove(waiter)
+                if not queue:
+                    del self._queues[tenant]
+                return
+        # The slot was handed over while the call was given up, so pass it on
+        self.release()
+
+    def release(self) -> None:
+        """Free a slot, handing it to the next tenant in turn if any is waiting."""
+        with self._lock:
+            if not self._queues:
+                self.in_flight -= 1
+                return
+            tenant, queue = next(iter(self._queues.items()))
+            waiter = queue.popleft()
+            del self._queues[tenant]
+            if queue:
+                # Move the tenant to the back of the rotation
+                self._queues[tenant] = queue
+            waiter.granted = True
+        waiter.notify()
+
+    def _record_wait(self, wait: float) -> None:
+        with self._lock:
+            self.calls += 1
+            self._waits.append(wait)
+            if wait > 0:
+                self.queued_calls += 1
+                self.wait_seconds_total += wait
+                self.wait_seconds_max = max(self.wait_seconds_max, wait)
+
+    async def acquire(self, tenant: str = DEFAULT_TENANT) -> float:
+        """Wait for a slot, returning how long the call was queued."""
+        start = time.monotonic()
+        loop = asyncio.get_running_loop()
+        event = asyncio.Event()
+        waiter = _Waiter(lambda: loop.call_soon_threadsafe(event.set))
+        wait = 0.0
+        if not self._try_acquire(tenant, waiter):
+            try:
+                await event.wait()
+            except BaseException:
+                self._cancel(tenant, waiter)
+                raise
+            wait = time.monotonic() - start
+        self._record_wait(wait)
+        return wait
+
+    def acquire_sync(self, tenant: str = DEFAULT_TENANT) -> float:
+        """Block until a slot is free, returning how long the call was queued.
+
+        Raises:
+            RuntimeError: If called from a thread running an event loop, which
+                could never hand back the slots of its own async calls
+        """
+        try:
+            asyncio.get_running_loop()
+        except RuntimeError:
+            pass
+        else:
+            raise RuntimeError(
+                "Sync LLM calls cannot wait for a slot in a thread running an "
+                "event loop, call the model asynchronously or from a worker thread"
+            )
+        start = time.monotonic()
+        event = threading.Event()
+        waiter = _Waiter(event.set)
+        wait = 0.0
+        if not self._try_acquire(tenant, waiter):
+            try:
+                event.wait()
+            except BaseException:
+                self._cancel(tenant, waiter)
+                raise
+            wait = time.monotonic() - start
+        self._record_wait(wait)
+        return wait
+
+    @asynccontextmanager
+    async def slot(self, tenant: str = DEFAULT_TENANT) -> AsyncIterator[float]:
+        wait = await self.acquire(tenant)
+        try:
+            yield wait
+        finally:
+            self.release()
+
+    @contextmanager
+    def slot_sync(self, tenant: str = DEFAULT_TENANT) -> Iterator[float]:
+        wait = self.acquire_sync(tenant)
+        try:
+            yield wait
+        finally:
+            self.release()
+
+    def stats(self) -> dict[str, Any]:
+        """Get the load of the governor and the queue wait times of its calls."""
+        with self._lock:
+            waits = sorted(self._waits)
+            queued = sum(len(queue) for queue in self._queues.values())
+            return {
+                "max_in_flight": self.max_in_flight,
+                "in_flight": self.in_flight,
+                "queued": queued,
+                "calls": self.calls,
+                "queued_calls": self.queued_calls,
+                "wait_seconds_total": self.wait_seconds_total,
+                "wait_seconds_max": self.wait_seconds_max,
+                "wait_seconds_p50": waits[len(waits) // 2] if waits else 0.0,
+                "wait_seconds_p95": waits[int(len(waits) * 0.95)] if waits else 0.0,
+            }
+
+
+# Governors of the model types that limit their calls in flight
+_governors: dict[str, ConcurrencyGovernor] = {}
+_governors_lock = threading.Lock()
+
+
+def get_concurrency_governor(
+    name: str, max_in_flight: int
+) -> Optional[ConcurrencyGovernor]:
+    """Get the governor of a model type, or None if its calls are not limited."""
+    if max_in_flight <= 0:
+        return None
+    with _governors_lock:
+        governor = _governors.get(name)
+        if governor is None or governor.max_in_flight != max_in_flight:
+            governor = _governors[name] = ConcurrencyGovernor(max_in_flight)
+        return governor
+
+
+def get_governor_stats() -> dict[str, dict[str, Any]]:
+    with _governors_lock:
+        return {name: governor.stats() for name, governor in _governors.items()}
@@ -0,0 +1,166 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import logging
+import threading
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class HedgingPolicy:
+    """When to send a duplicate of a slow LLM request, and how many to allow.
+
+    The deadline of a request is the tracked percentile of the latency of the
+    recent ones of the same kind, never below a minimum delay, and only once
+    enough of them were observed. Duplicates are paid from a budget refilled by
+    `max_ratio` for every request, so at most that share of requests is sent
+    twice, with bursts up to `burst` duplicates.
+    """
+
+    def __init__(
+        self,
+        percentile: float = 0.9,
+        min_delay_seconds: float = 0.5,
+        min_samples: int = 20,
+        max_ratio: float = 0.1,
+        burst: float = 5.0,
+        samples: int = 200,
+    ):
+        self.percentile = percentile
+        self.min_delay_seconds = min_delay_seconds
+        self.min_samples = min_samples
+        self.max_ratio = max_ratio
+        self.burst = burst
+        self.requests = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self._budget = burst
+        self._samples = samples
+        self._latencies: dict[str, deque[float]] = {}
+        self._lock = threading.Lock()
+
+    def get_delay(self, kind: str) -> Optional[float]:
+        """Get how long to wait before hedging a request, if it can be hedged yet."""
+        with self._lock:
+            latencies = sorted(self._latencies.get(kind, ()))
+        if len(latencies) < self.min_samples:
+            return None
+        index = min(int(len(latencies) * self.percentile), len(latencies) - 1)
+        return max(latencies[index] if latencies else 0.0, self.min_delay_seconds)
+
+    def record(self, kind: str, latency: float) -> None:
+        with self._lock:
+            latencies = self._latencies.setdefault(kind, deque(maxlen=self._samples))
+            latencies.append(latency)
+
+    def start_request(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self._budget = min(self._budget + self.max_ratio, self.burst)
+
+    def try_hedge(self) -> bool:
+        """Take a duplicate request from the budget, if there is any left."""
+        with self._lock:
+            if self._budget < 1:
+                return False
+            self._budget -= 1
+            self.hedges += 1
+            return True
+
+    def stats(self) -> dict[str, Any]:
+        return {
+            "requests": self.requests,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "hedge_rate": self.hedges / self.requests if self.requests else 0.0,
+            "delays": {kind: self.get_delay(kind) for kind in list(self._latencies)},
+        }
+
+    async def run(
+        self,
+        kind: str,
+        attempt: Callable[[], Awaitable[T]],
+        discard: Optional[Callable[[T], None]] = None,
+    ) -> T:
+        """
+        Run an attempt, starting a duplicate if it is still running at the deadline.
+
+        The first attempt to succeed wins and the other one is cancelled. An
+        error only fails the request once no other attempt is left running.
+
+        Args:
+            kind: The kind of request, whose latency the deadline is based on
+            attempt: Start an attempt of the request
+            discard: Release the result of an attempt that completed but lost
+
+        Returns:
+            The result of the winning attempt
+        """
+        self.start_request()
+        tasks = [asyncio.create_task(attempt())]
+        # The latency of a request is the one of its winning attempt alone
+        started = [time.monotonic()]
+        winner = None
+        try:
+            delay = self.get_delay(kind)
+            if delay is not None:
+                done, _ = await asyncio.wait(tasks, timeout=delay)
+                if not done and self.try_hedge():
+                    logger.debug(f"Hedging a {kind} request slower than {delay:.2f}s")
+                    tasks.append(asyncio.create_task(attempt()))
+                    started.append(time.monotonic())
+            pending = set(tasks)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                winner = next(
+                    (task for task in tasks if task in done and not task.exception()),
+                    None,
+                )
+            if winner is None:
+                raise tasks[0].exception()
+            self.record(kind, time.monotonic() - started[tasks.index(winner)])
+            if winner is not tasks[0]:
+                with self._lock:
+                    self.hedge_wins += 1
+            return winner.result()
+        finally:
+            for task in tasks:
+                if task is winner:
+                    continue
+                if not task.done():
+                    task.cancel()
+                elif discard and not task.cancelled() and not task.exception():
+                    discard(task.result())
+
+
+# Hedging policies of the model types that hedge their requests
+_policies: dict[str, HedgingPolicy] = {}
+_policies_lock = threading.Lock()
+
+
+def get_hedging_policy(name: str, options: Any) -> Optional[HedgingPolicy]:
+    """Get the hedging policy of a model type, or None if it does not hedge.
+
+    Args:
+        name: The model type
+        options: `True` for the default policy, or the arguments of the policy
+    """
+    if not options:
+        return None
+    policy = HedgingPolicy(**(options if isinstance(options, dict) else {}))
+    with _policies_lock:
+        _policies[name] = policy
+    return policy
+
+
+def get_hedging_stats() -> dict[str, dict[str, Any]]:
+    with _policies_lock:
+        return {name: policy.stats() for name, policy in _policies.items()}
@@ -0,0 +1,50 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import importlib.util
+import os
+import threading
+from typing import Optional
+from urllib.parse import urlsplit
+
+import httpx
+
+from src.utils.http_client import HTTPClientRegistry
+
+DEFAULT_BASE_URL = "https://api.openai.com/v1"
+
+
+def _get_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "100")),
+        max_keepalive_connections=int(
+            os.getenv("LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS", "20")
+        ),
+        keepalive_expiry=float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS", "60")),
+    )
+
+
+def _use_http2() -> bool:
+    # HTTP/2 needs the optional h2 package, so fall back to HTTP/1.1 without it
+    if os.getenv("LLM_HTTP2", "true").lower() not in ("true", "1", "yes"):
+        return False
+    return importlib.util.find_spec("h2") is not None
+
+
+def get_host_key(base_url: Optional[str]) -> str:
+    """Get the origin of a base URL, which clients are shared by."""
+    parts = urlsplit(base_url or DEFAULT_BASE_URL)
+    return f"{parts.scheme}://{parts.netloc}".lower()
+
+
+_registry: Optional[HTTPClientRegistry] = None
+_registry_lock = threading.Lock()
+
+
+def get_http_client_registry() -> HTTPClientRegistry:
+    """Get the registry of the HTTP clients of the models, keyed by host."""
+    global _registry
+    with _registry_lock:
+        if _registry is None:
+            _registry = HTTPClientRegistry(_get_limits(), http2=_use_http2())
+        return _registry
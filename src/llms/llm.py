@@ -1,30 +1,575 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import functools
+import json
+import logging
+import operator
+import time
 from pathlib import Path
-from typing import Any, Dict
+from typing import Any, AsyncIterator, Dict, Iterator, Optional
 
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.messages import (
+    AIMessageChunk,
+    BaseMessage,
+    message_chunk_to_message,
+    message_to_dict,
+    messages_from_dict,
+)
+from langchain_core.messages.tool import tool_call_chunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
 from langchain_openai import ChatOpenAI
+from pydantic import PrivateAttr
 
 from src.config import load_yaml_config
 from src.config.agents import LLMType
+from src.llms.cache import LLMResponseCache, get_cache_key, get_llm_response_cache
+from src.llms.hedging import HedgingPolicy, get_hedging_policy
+from src.llms.governor import ConcurrencyGovernor, get_concurrency_governor, get_tenant
+from src.llms.http_client import get_host_key, get_http_client_registry
+from src.llms.router import (
+    Endpoint,
+    EndpointRouter,
+    RoutingStrategy,
+    is_failover_error,
+)
+
+logger = logging.getLogger(__name__)
+
+# Closing streams of the hedged attempts that lost
+_discard_tasks: set[asyncio.Task] = set()
+
+
+def _dump_chunk(chunk: ChatGenerationChunk) -> dict[str, Any]:
+    # Ids are left out, so that replayed messages get the id of their own run
+    message = chunk.message.model_copy(update={"id": None})
+    return {
+        "message": message_to_dict(message),
+        "generation_info": chunk.generation_info,
+    }
+
+
+def _load_chunk(data: dict[str, Any]) -> ChatGenerationChunk:
+    return ChatGenerationChunk(
+        message=messages_from_dict([data["message"]])[0],
+        generation_info=data["generation_info"],
+    )
+
+
+def _to_chunk(generation: ChatGeneration) -> ChatGenerationChunk:
+    message = generation.message
+    return ChatGenerationChunk(
+        message=AIMessageChunk(
+            content=message.content,
+            additional_kwargs=message.additional_kwargs,
+            response_metadata=message.response_metadata,
+            usage_metadata=getattr(message, "usage_metadata", None),
+            tool_call_chunks=[
+                tool_call_chunk(
+                    name=tool_call["name"],
+                    args=json.dumps(tool_call["args"], ensure_ascii=False),
+                    id=tool_call["id"],
+                    index=index,
+                )
+                for index, tool_call in enumerate(getattr(message, "tool_calls", []))
+            ],
+        ),
+        generation_info=generation.generation_info,
+    )
+
+
+class RoutedChatOpenAI(ChatOpenAI):
+    """ChatOpenAI sending each request to one of several endpoints of the model.
+
+    Without a router, requests go to the endpoint the model is configured with.
+    Requests failing because of their endpoint are retried on the other ones,
+    streams only until their first chunk was received.
+    """
+
+    _router: Optional[EndpointRouter] = PrivateAttr(default=None)
+
+    def __init__(self, router: Optional[EndpointRouter] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._router = router
+
+    def _fail_over(
+        self, endpoint: Endpoint, error: Exception, tried: tuple[Endpoint, ...]
+    ) -> None:
+        """Record the failure of an endpoint, raising it if no other can be tried."""
+        if not is_failover_error(error):
+            raise error
+        self._router.record_failure(endpoint, error)
+        if len(tried) == len(self._router.endpoints):
+            raise error
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self._router is None:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        tried = ()
+        while endpoint := self._router.select(tried):
+            tried += (endpoint,)
+            start = time.monotonic()
+            try:
+                with self._router.track(endpoint):
+                    result = endpoint.llm._generate(
+                        messages, stop, run_manager, **kwargs
+                    )
+            except Exception as e:
+                self._fail_over(endpoint, e, tried)
+                continue
+            self._router.record_success(endpoint, time.monotonic() - start)
+            return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self._router is None:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        tried = ()
+        while endpoint := self._router.select(tried):
+            tried += (endpoint,)
+            start = time.monotonic()
+            try:
+                with self._router.track(endpoint):
+                    result = await endpoint.llm._agenerate(
+                        messages, stop, run_manager, **kwargs
+                    )
+            except Exception as e:
+                self._fail_over(endpoint, e, tried)
+                continue
+            self._router.record_success(endpoint, time.monotonic() - start)
+            return result
+
+    # The latency of streams is measured until their first chunk, as their total
+    # duration depends on the length of the response rather than the endpoint
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self._router is None:
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+            return
+        tried = ()
+        while endpoint := self._router.select(tried):
+            tried += (endpoint,)
+            start = time.monotonic()
+            started = False
+            try:
+                with self._router.track(endpoint):
+                    for chunk in endpoint.llm._stream(
+                        messages, stop, run_manager, **kwargs
+                    ):
+                        if not started:
+                            started = True
+                            self._router.record_success(
+                                endpoint, time.monotonic() - start
+                            )
+                        yield chunk
+            except Exception as e:
+                if started:
+                    if is_failover_error(e):
+                        self._router.record_failure(endpoint, e)
+                    raise
+                self._fail_over(endpoint, e, tried)
+                continue
+            return
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._router is None:
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+        tried = ()
+        while endpoint := self._router.select(tried):
+            tried += (endpoint,)
+            start = time.monotonic()
+            started = False
+            try:
+                with self._router.track(endpoint):
+                    async for chunk in endpoint.llm._astream(
+                        messages, stop, run_manager, **kwargs
+                    ):
+                        if not started:
+                            started = True
+                            self._router.record_success(
+                                endpoint, time.monotonic() - start
+                            )
+                        yield chunk
+            except Exception as e:
+                if started:
+                    if is_failover_error(e):
+                        self._router.record_failure(endpoint, e)
+                    raise
+                self._fail_over(endpoint, e, tried)
+                continue
+            return
+
+
+class GovernedChatOpenAI(RoutedChatOpenAI):
+    """ChatOpenAI waiting for a slot of its governor before calling the model.
+
+    Calls are queued per tenant, the thread of the conversation unless the run
+    metadata names a `tenant_id`, and streams hold their slot until they end.
+    Hedged duplicates of a call wait for a slot of their own.
+    """
+
+    _governor: Optional[ConcurrencyGovernor] = PrivateAttr(default=None)
+
+    def __init__(self, governor: Optional[ConcurrencyGovernor] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._governor = governor
+
+    def _log_wait(self, wait: float, tenant: str) -> None:
+        if wait > 0.01:
+            logger.debug(f"LLM call of {tenant} waited {wait:.2f}s for a slot")
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Streaming models generate through _stream, which takes the slot itself
+        if self._governor is None or self.streaming:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        tenant = get_tenant(run_manager and run_manager.metadata)
+        with self._governor.slot_sync(tenant) as wait:
+            self._log_wait(wait, tenant)
+            return super()._generate(messages, stop, run_manager, **kwargs)
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self._governor is None or self.streaming:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        tenant = get_tenant(run_manager and run_manager.metadata)
+        async with self._governor.slot(tenant) as wait:
+            self._log_wait(wait, tenant)
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self._governor is None:
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+            return
+        tenant = get_tenant(run_manager and run_manager.metadata)
+        with self._governor.slot_sync(tenant) as wait:
+            self._log_wait(wait, tenant)
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._governor is None:
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+        tenant = get_tenant(run_manager and run_manager.metadata)
+        async with self._governor.slot(tenant) as wait:
+            self._log_wait(wait, tenant)
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+
+
+class HedgedChatOpenAI(GovernedChatOpenAI):
+    """ChatOpenAI sending a duplicate of async requests that are slower than usual.
+
+    A stream is hedged when its first chunk is late and a request when its
+    response is. With several endpoints, the duplicate usually goes to another
+    one, as the router avoids the endpoint busy with the original request.
+    Sync calls run in worker threads that cannot be cancelled, so they are
+    never hedged.
+    """
+
+    _hedging: Optional[HedgingPolicy] = PrivateAttr(default=None)
+
+    def __init__(self, hedging: Optional[HedgingPolicy] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._hedging = hedging
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Streaming models generate through _astream, which is hedged itself
+        if self._hedging is None or self.streaming:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        agenerate = super()._agenerate
+        return await self._hedging.run(
+            "generate", lambda: agenerate(messages, stop, run_manager, **kwargs)
+        )
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._hedging is None:
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+        astream = super()._astream
+
+        # Tokens are reported here for the winning stream only, so attempts get
+        # a run manager without handlers, which still names the tenant
+        attempt_manager = run_manager and AsyncCallbackManagerForLLMRun(
+            run_id=run_manager.run_id,
+            handlers=[],
+            inheritable_handlers=[],
+            metadata=run_manager.metadata,
+        )
+
+        async def start_stream():
+            stream = astream(messages, stop, attempt_manager, **kwargs)
+            try:
+                return stream, await anext(stream, None)
+            except BaseException:
+                await stream.aclose()
+                raise
+
+        def discard_stream(result):
+            # The task is referenced until done, or it could be collected early
+            task = asyncio.create_task(result[0].aclose())
+            _discard_tasks.add(task)
+            task.add_done_callback(_discard_tasks.discard)
+
+        stream, chunk = await self._hedging.run("stream", start_stream, discard_stream)
+        try:
+            while chunk is not None:
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+                chunk = await anext(stream, None)
+        finally:
+            await stream.aclose()
+
+
+class CachedChatOpenAI(HedgedChatOpenAI):
+    """ChatOpenAI answering repeated requests from a response cache.
+
+    Requests are keyed by the model configuration, the bound tools and other
+    call options, and the normalized messages. Cached responses are replayed
+    chunk by chunk to streaming callers, so their tokens still reach the UI.
+    Without a cache, requests go straight to the model endpoints.
+    """
+
+    _response_cache: Optional[LLMResponseCache] = PrivateAttr(default=None)
+
+    def __init__(self, response_cache: Optional[LLMResponseCache] = None, **kwargs):
+        super().__init__(**kwargs)
+        self._response_cache = response_cache
+
+    def _get_response_key(
+        self, messages: list[BaseMessage], stop: Optional[list[str]], **kwargs
+    ) -> str:
+        return get_cache_key(self._get_llm_string(stop=stop, **kwargs), messages)
+
+    @staticmethod
+    def _to_result(chunks: list[dict[str, Any]]) -> ChatResult:
+        merged = functools.reduce(operator.add, map(_load_chunk, chunks))
+        return ChatResult(
+            generations=[
+                ChatGeneration(
+                    message=message_chunk_to_message(merged.message),
+                    generation_info=merged.generation_info,
+                )
+            ]
+        )
+
+    def _generate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        # Streaming models generate through _stream, which is cached itself
+        if self._response_cache is None or self.streaming:
+            return super()._generate(messages, stop, run_manager, **kwargs)
+        key = self._get_response_key(messages, stop, **kwargs)
+        if chunks := self._response_cache.lookup(key):
+            return self._to_result(chunks)
+        result = super()._generate(messages, stop, run_manager, **kwargs)
+        if len(result.generations) == 1:
+            self._response_cache.update(
+                key, [_dump_chunk(_to_chunk(result.generations[0]))]
+            )
+        return result
+
+    async def _agenerate(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        if self._response_cache is None or self.streaming:
+            return await super()._agenerate(messages, stop, run_manager, **kwargs)
+        key = self._get_response_key(messages, stop, **kwargs)
+        if chunks := await asyncio.to_thread(self._response_cache.lookup, key):
+            return self._to_result(chunks)
+        result = await super()._agenerate(messages, stop, run_manager, **kwargs)
+        if len(result.generations) == 1:
+            await asyncio.to_thread(
+                self._response_cache.update,
+                key,
+                [_dump_chunk(_to_chunk(result.generations[0]))],
+            )
+        return result
+
+    def _stream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        if self._response_cache is None:
+            yield from super()._stream(messages, stop, run_manager, **kwargs)
+            return
+        key = self._get_response_key(messages, stop, **kwargs)
+        if chunks := self._response_cache.lookup(key):
+            for data in chunks:
+                chunk = _load_chunk(data)
+                if run_manager:
+                    run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            return
+        chunks = []
+        for chunk in super()._stream(messages, stop, run_manager, **kwargs):
+            chunks.append(_dump_chunk(chunk))
+            yield chunk
+        # Only complete responses are cached, not the ones the caller stopped reading
+        if chunks:
+            self._response_cache.update(key, chunks)
+
+    async def _astream(
+        self,
+        messages: list[BaseMessage],
+        stop: Optional[list[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        if self._response_cache is None:
+            async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+                yield chunk
+            return
+        key = self._get_response_key(messages, stop, **kwargs)
+        if chunks := await asyncio.to_thread(self._response_cache.lookup, key):
+            for data in chunks:
+                chunk = _load_chunk(data)
+                if run_manager:
+                    await run_manager.on_llm_new_token(chunk.text, chunk=chunk)
+                yield chunk
+            return
+        chunks = []
+        async for chunk in super()._astream(messages, stop, run_manager, **kwargs):
+            chunks.append(_dump_chunk(chunk))
+            yield chunk
+        if chunks:
+            await asyncio.to_thread(self._response_cache.update, key, chunks)
+
 
 # Cache for LLM instances
 _llm_cache: dict[LLMType, ChatOpenAI] = {}
 
 
+def _with_http_clients(llm_conf: Dict[str, Any]) -> Dict[str, Any]:
+    # Share connections with every other client of the same host
+    key = get_host_key(llm_conf.get("base_url") or llm_conf.get("openai_api_base"))
+    registry = get_http_client_registry()
+    return {
+        "http_client": registry.get_client(key),
+        "http_async_client": registry.get_async_client(key),
+        **llm_conf,
+    }
+
+
+def _create_endpoint(
+    llm_conf: Dict[str, Any], endpoint_conf: Dict[str, Any]
+) -> Endpoint:
+    endpoint_conf = dict(endpoint_conf)
+    weight = float(endpoint_conf.pop("weight", 1))
+    # Fail over to another endpoint rather than retrying the failing one
+    llm_conf = {"max_retries": 0, **llm_conf, **endpoint_conf}
+    return Endpoint(ChatOpenAI(**_with_http_clients(llm_conf)), weight)
+
+
 def _create_llm_use_conf(llm_type: LLMType, conf: Dict[str, Any]) -> ChatOpenAI:
     llm_type_map = {
         "reasoning": conf.get("REASONING_MODEL"),
         "basic": conf.get("BASIC_MODEL"),
         "vision": conf.get("VISION_MODEL"),
+        "fast": conf.get("FAST_MODEL"),
     }
     llm_conf = llm_type_map.get(llm_type)
     if not llm_conf:
         raise ValueError(f"Unknown LLM type: {llm_type}")
     if not isinstance(llm_conf, dict):
         raise ValueError(f"Invalid LLM Conf: {llm_type}")
-    return ChatOpenAI(**llm_conf)
+    llm_conf = dict(llm_conf)
+    endpoints = llm_conf.pop("endpoints", None)
+    strategy = RoutingStrategy(llm_conf.pop("routing", "least_outstanding"))
+    max_in_flight = int(llm_conf.pop("max_in_flight", 0))
+    hedging = llm_conf.pop("hedging", None)
+    router = None
+    if endpoints:
+        router = EndpointRouter(
+            [_create_endpoint(llm_conf, endpoint_conf) for endpoint_conf in endpoints],
+            strategy,
+        )
+        llm_conf.setdefault("api_key", endpoints[0].get("api_key"))
+    return CachedChatOpenAI(
+        response_cache=get_llm_response_cache(),
+        governor=get_concurrency_governor(llm_type, max_in_flight),
+        hedging=get_hedging_policy(llm_type, hedging),
+        router=router,
+        **_with_http_clients(llm_conf),
+    )
 
 
 def get_llm_by_type(
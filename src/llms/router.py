@@ -0,0 +1,156 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import enum
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+import openai
+from langchain_openai import ChatOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class RoutingStrategy(enum.Enum):
+    """How the router picks among the healthy endpoints of a model."""
+
+    LEAST_OUTSTANDING = "least_outstanding"  # Fewest in-flight requests per weight
+    LATENCY = "latency"  # Lowest latency average, scaled by in-flight requests
+
+
+def is_failover_error(error: BaseException) -> bool:
+    """Whether an error is caused by the endpoint, so another one may succeed."""
+    if isinstance(
+        error,
+        (openai.RateLimitError, openai.APIConnectionError, openai.InternalServerError),
+    ):
+        return True
+    return isinstance(error, openai.APIStatusError) and error.status_code >= 500
+
+
+def _get_retry_after(error: BaseException) -> Optional[float]:
+    response = getattr(error, "response", None)
+    if response is None:
+        return None
+    try:
+        return float(response.headers.get("retry-after"))
+    except (TypeError, ValueError):
+        return None
+
+
+class Endpoint:
+    """An inference endpoint of a model, with its load and health."""
+
+    def __init__(self, llm: ChatOpenAI, weight: float = 1.0):
+        self.llm = llm
+        self.weight = weight
+        self.outstanding = 0
+        self.latency_ewma: Optional[float] = None
+        self.failures = 0
+        self.failing_until = 0.0
+
+    @property
+    def name(self) -> str:
+        return str(self.llm.openai_api_base or "default")
+
+    def is_healthy(self, now: float) -> bool:
+        return now >= self.failing_until
+
+
+class EndpointRouter:
+    """Balance the requests of a model across its endpoints, failing over on errors.
+
+    Endpoints that fail with rate limiting, connection or server errors are
+    avoided for a cooldown that doubles with every consecutive failure, or for
+    as long as their `Retry-After` header asks. When every endpoint is cooling
+    down, the one that recovers first is used anyway.
+    """
+
+    def __init__(
+        self,
+        endpoints: list[Endpoint],
+        strategy: RoutingStrategy = RoutingStrategy.LEAST_OUTSTANDING,
+        ewma_alpha: float = 0.3,
+        base_cooldown_seconds: float = 5.0,
+        max_cooldown_seconds: float = 60.0,
+    ):
+        if not endpoints:
+            raise ValueError("A router needs at least one endpoint")
+        self.endpoints = endpoints
+        self.strategy = strategy
+        self.ewma_alpha = ewma_alpha
+        self.base_cooldown_seconds = base_cooldown_seconds
+        self.max_cooldown_seconds = max_cooldown_seconds
+        self._lock = threading.Lock()
+
+    def _score(self, endpoint: Endpoint) -> tuple:
+        load = (endpoint.outstanding + 1) / endpoint.weight
+        # Endpoints without latency samples yet are tried first
+        latency = endpoint.latency_ewma or 0.0
+        if self.strategy == RoutingStrategy.LATENCY:
+            return (latency * load, load)
+        return (load, latency)
+
+    def select(self, exclude: tuple[Endpoint, ...] = ()) -> Optional[Endpoint]:
+        """Pick the endpoint for the next attempt, if any is left to try."""
+        now = time.monotonic()
+        with self._lock:
+            candidates = [e for e in self.endpoints if e not in exclude]
+            if not candidates:
+                return None
+            healthy = [e for e in candidates if e.is_healthy(now)]
+            if healthy:
+                return min(healthy, key=self._score)
+            return min(candidates, key=lambda e: e.failing_until)
+
+    @contextmanager
+    def track(self, endpoint: Endpoint) -> Iterator[None]:
+        """Count a request as outstanding on an endpoint while it runs."""
+        with self._lock:
+            endpoint.outstanding += 1
+        try:
+            yield
+        finally:
+            with self._lock:
+                endpoint.outstanding -= 1
+
+    def record_success(self, endpoint: Endpoint, latency: float) -> None:
+        with self._lock:
+            endpoint.failures = 0
+            endpoint.failing_until = 0.0
+            if endpoint.latency_ewma is None:
+                endpoint.latency_ewma = latency
+            else:
+                endpoint.latency_ewma += self.ewma_alpha * (
+                    latency - endpoint.latency_ewma
+                )
+
+    def record_failure(self, endpoint: Endpoint, error: BaseException) -> None:
+        with self._lock:
+            endpoint.failures += 1
+            cooldown = _get_retry_after(error) or min(
+                self.base_cooldown_seconds * 2 ** (endpoint.failures - 1),
+                self.max_cooldown_seconds,
+            )
+            endpoint.failing_until = time.monotonic() + cooldown
+        logger.warning(
+            f"LLM endpoint {endpoint.name} failed ({type(error).__name__}: {error}), "
+            f"avoiding it for {cooldown:.1f}s"
+        )
+
+    def stats(self) -> list[dict[str, Any]]:
+        now = time.monotonic()
+        with self._lock:
+            return [
+                {
+                    "endpoint": endpoint.name,
+                    "weight": endpoint.weight,
+                    "outstanding": endpoint.outstanding,
+                    "latency_ewma": endpoint.latency_ewma,
+                    "healthy": endpoint.is_healthy(now),
+                }
+                for endpoint in self.endpoints
+            ]
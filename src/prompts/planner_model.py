@@ -13,6 +13,13 @@ class StepType(str, Enum):
 
 
 class Step(BaseModel):
+    id: Optional[str] = Field(
+        default=None, description="Unique identifier of the step, e.g. 'step-1'"
+    )
+    depends_on: List[str] = Field(
+        default_factory=list,
+        description="Ids of the steps whose findings this step needs",
+    )
     need_web_search: bool = Field(
         ..., description="Must be explicitly set for each step"
     )
@@ -22,6 +29,9 @@ class Step(BaseModel):
     execution_res: Optional[str] = Field(
         default=None, description="The Step execution result"
     )
+    execution_summary: Optional[str] = Field(
+        default=None, description="The condensed Step execution result"
+    )
 
 
 class Plan(BaseModel):
@@ -47,13 +57,25 @@ class Plan(BaseModel):
                     "title": "AI Market Research Plan",
                     "steps": [
                         {
+                            "id": "step-1",
+                            "depends_on": [],
                             "need_web_search": True,
                             "title": "Current AI Market Analysis",
                             "description": (
                                 "Collect data on market size, growth rates, major players, and investment trends in AI sector."
                             ),
                             "step_type": "research",
-                        }
+                        },
+                        {
+                            "id": "step-2",
+                            "depends_on": ["step-1"],
+                            "need_web_search": False,
+                            "title": "AI Market Growth Projection",
+                            "description": (
+                                "Calculate the compound annual growth rate of the AI market from the collected data."
+                            ),
+                            "step_type": "processing",
+                        },
                     ],
                 }
             ]
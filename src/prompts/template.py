@@ -3,24 +3,127 @@
 
 import os
 import dataclasses
+import enum
+import functools
+import hashlib
+import logging
+import re
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime
-from jinja2 import Environment, FileSystemLoader, select_autoescape
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    meta,
+    select_autoescape,
+)
+from langchain_core.runnables.config import var_child_runnable_config
 from langgraph.prebuilt.chat_agent_executor import AgentState
 from src.config.configuration import Configuration
 
-# Initialize Jinja2 environment
+logger = logging.getLogger(__name__)
+
+# Initialize Jinja2 environment, with compiled templates cached on disk for cold starts
 env = Environment(
     loader=FileSystemLoader(os.path.dirname(__file__)),
     autoescape=select_autoescape(),
     trim_blocks=True,
     lstrip_blocks=True,
+    bytecode_cache=FileSystemBytecodeCache(
+        os.getenv("PROMPT_BYTECODE_CACHE_DIR") or None
+    ),
 )
 
 
+@functools.lru_cache(maxsize=None)
+def _load_template(prompt_name: str) -> tuple[Template, frozenset[str]]:
+    """Compile a prompt template once, along with the variables it references."""
+    source, _, _ = env.loader.get_source(env, f"{prompt_name}.md")
+    variables = frozenset(meta.find_undeclared_variables(env.parse(source)))
+    return env.get_template(f"{prompt_name}.md"), variables
+
+
+# Environment for the parts of templates split apart by the prefix cache layout
+_fragment_env = env.overlay(autoescape=False)
+
+# Front matter of a template, holding volatile values like the current time
+_FRONT_MATTER = re.compile(r"\A---\n(.*?)\n---\n", re.DOTALL)
+
+
+class PromptLayout(enum.Enum):
+    """How the volatile parts of a prompt are placed."""
+
+    DEFAULT = "default"  # As written in the templates
+    PREFIX_CACHE = "prefix_cache"  # Static content first, for provider prefix caching
+
+
+def get_prompt_layout(configurable: Configuration = None) -> PromptLayout:
+    """Get the prompt layout of a configuration, falling back to the default one."""
+    value = getattr(configurable, "prompt_layout", None) or PromptLayout.DEFAULT.value
+    try:
+        return PromptLayout(value)
+    except ValueError:
+        logger.warning(f"Unknown prompt layout '{value}', using default")
+        return PromptLayout.DEFAULT
+
+
+@functools.lru_cache(maxsize=None)
+def _load_split_template(prompt_name: str) -> tuple[Template, Template | None]:
+    """Split a prompt template into its static body and its volatile front matter."""
+    source, _, _ = env.loader.get_source(env, f"{prompt_name}.md")
+    if not (match := _FRONT_MATTER.match(source)):
+        return _load_template(prompt_name)[0], None
+    return (
+        _fragment_env.from_string(source[match.end() :].lstrip("\n")),
+        _fragment_env.from_string(f"---\n{match.group(1)}\n---\n"),
+    )
+
+
+def _get_current_time(granularity_seconds: int = 0) -> str:
+    """Format the current time, rounded down to the granularity if any."""
+    now = time.time()
+    if granularity_seconds > 0:
+        now -= now % granularity_seconds
+    return datetime.fromtimestamp(now).strftime("%a %b %d %Y %H:%M:%S %z")
+
+
+# Hash of the latest static prefix of each prompt of each thread, to report its
+# stability within a conversation
+_prefix_hashes: OrderedDict[tuple[str, str], str] = OrderedDict()
+_prefix_hashes_lock = threading.Lock()
+_PREFIX_HASHES_SIZE = 1024
+
+
+def _report_prefix_stability(prompt_name: str, prefix: str):
+    config = var_child_runnable_config.get() or {}
+    thread_id = str(config.get("configurable", {}).get("thread_id", ""))
+    prefix_hash = hashlib.sha256(prefix.encode()).hexdigest()[:12]
+    # Prompts are rendered from agent threads and asyncio tasks at the same time
+    with _prefix_hashes_lock:
+        previous_hash = _prefix_hashes.pop((thread_id, prompt_name), None)
+        _prefix_hashes[(thread_id, prompt_name)] = prefix_hash
+        while len(_prefix_hashes) > _PREFIX_HASHES_SIZE:
+            _prefix_hashes.popitem(last=False)
+    logger.debug(
+        f"Prompt '{prompt_name}' static prefix {prefix_hash} ({len(prefix)} chars) "
+        f"is {'stable' if previous_hash in (None, prefix_hash) else 'changed'}"
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _render_static_template(prompt_name: str) -> str:
+    return _load_template(prompt_name)[0].render()
+
+
 def get_prompt_template(prompt_name: str) -> str:
     """
     Load and return a prompt template using Jinja2.
 
+    The rendered template is cached, since it is rendered without variables.
+
     Args:
         prompt_name: Name of the prompt template file (without .md extension)
 
@@ -28,8 +131,7 @@ def get_prompt_template(prompt_name: str) -> str:
         The template string with proper variable substitution syntax
     """
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        return template.render()
+        return _render_static_template(prompt_name)
     except Exception as e:
         raise ValueError(f"Error loading template {prompt_name}: {e}")
 
@@ -40,6 +142,9 @@ def apply_prompt_template(
     """
     Apply template variables to a prompt template and return formatted messages.
 
+    Only the variables the template references are looked up, and templates
+    without any are rendered once.
+
     Args:
         prompt_name: Name of the prompt template to use
         state: Current agent state containing variables to substitute
@@ -47,19 +152,42 @@ def apply_prompt_template(
     Returns:
         List of messages with the system prompt as the first message
     """
-    # Convert state to dict for template rendering
-    state_vars = {
-        "CURRENT_TIME": datetime.now().strftime("%a %b %d %Y %H:%M:%S %z"),
-        **state,
-    }
-
-    # Add configurable variables
-    if configurable:
-        state_vars.update(dataclasses.asdict(configurable))
-
     try:
-        template = env.get_template(f"{prompt_name}.md")
-        system_prompt = template.render(**state_vars)
+        template, variables = _load_template(prompt_name)
+        layout = get_prompt_layout(configurable)
+        if not variables:
+            system_prompt = _render_static_template(prompt_name)
+        else:
+            # Configurable variables take precedence over state variables
+            configurable_vars = (
+                {f.name for f in dataclasses.fields(configurable)}
+                if configurable
+                else set()
+            )
+            template_vars = {}
+            for name in variables:
+                if name in configurable_vars:
+                    template_vars[name] = getattr(configurable, name)
+                elif name in state:
+                    template_vars[name] = state[name]
+                elif name == "CURRENT_TIME":
+                    template_vars[name] = _get_current_time(
+                        int(configurable.prompt_time_granularity)
+                        if layout == PromptLayout.PREFIX_CACHE
+                        else 0
+                    )
+
+            if layout == PromptLayout.PREFIX_CACHE:
+                # Keep the static body first and move the front matter to the end
+                body, front_matter = _load_split_template(prompt_name)
+                prefix = body.render(**template_vars)
+                system_prompt = prefix
+                if front_matter:
+                    system_prompt += "\n\n" + front_matter.render(**template_vars)
+                if logger.isEnabledFor(logging.DEBUG):
+                    _report_prefix_stability(prompt_name, prefix)
+            else:
+                system_prompt = template.render(**template_vars)
         return [{"role": "system", "content": system_prompt}] + state["messages"]
     except Exception as e:
         raise ValueError(f"Error applying template {prompt_name}: {e}")
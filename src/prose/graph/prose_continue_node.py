@@ -13,10 +13,10 @@ from src.prose.graph.state import ProseState
 logger = logging.getLogger(__name__)
 
 
-def prose_continue_node(state: ProseState):
+async def prose_continue_node(state: ProseState):
     logger.info("Generating prose continue content...")
     model = get_llm_by_type(AGENT_LLM_MAP["prose_writer"])
-    prose_content = model.invoke(
+    prose_content = await model.ainvoke(
         [
             SystemMessage(content=get_prompt_template("prose/prose_continue")),
             HumanMessage(content=state["content"]),
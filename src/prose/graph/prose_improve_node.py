@@ -13,10 +13,10 @@ from src.prompts.template import get_prompt_template
 logger = logging.getLogger(__name__)
 
 
-def prose_improve_node(state: ProseState):
+async def prose_improve_node(state: ProseState):
     logger.info("Generating prose improve content...")
     model = get_llm_by_type(AGENT_LLM_MAP["prose_writer"])
-    prose_content = model.invoke(
+    prose_content = await model.ainvoke(
         [
             SystemMessage(content=get_prompt_template("prose/prose_improver")),
             HumanMessage(content=f"The existing text is: {state['content']}"),
@@ -1,10 +1,12 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
 import base64
 import json
 import logging
 import os
+from contextlib import asynccontextmanager
 from typing import List, cast
 from uuid import uuid4
 
@@ -14,7 +16,16 @@ from fastapi.responses import Response, StreamingResponse
 from langchain_core.messages import AIMessageChunk, ToolMessage, BaseMessage
 from langgraph.types import Command
 
+from src.crawler.cache import get_crawl_cache
+from src.crawler.http_client import close_http_clients as close_crawler_http_clients
+from src.crawler.strategies import get_crawl_strategy_stats
 from src.graph.builder import build_graph_with_memory
+from src.graph.checkpointer import CheckpointMaintenanceMixin
+from src.llms.cache import get_llm_response_cache
+from src.llms.cascade import get_cascade_stats
+from src.llms.governor import get_governor_stats
+from src.llms.hedging import get_hedging_stats
+from src.llms.http_client import get_http_client_registry
 from src.podcast.graph.builder import build_graph as build_podcast_graph
 from src.ppt.graph.builder import build_graph as build_ppt_graph
 from src.prose.graph.builder import build_graph as build_prose_graph
@@ -29,13 +40,29 @@ from src.server.chat_request import (
 from src.server.mcp_request import MCPServerMetadataRequest, MCPServerMetadataResponse
 from src.server.mcp_utils import load_mcp_tools
 from src.tools import VolcengineTTS
+from src.tools.mcp_pool import get_mcp_session_pool
 
 logger = logging.getLogger(__name__)
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    # Stop the MCP servers kept running across requests
+    await get_mcp_session_pool().close_all()
+    # Close the connections kept alive to the model endpoints and crawled sites
+    await get_http_client_registry().close_all()
+    await close_crawler_http_clients()
+    # Stop the checkpoint maintenance and close the checkpoint database
+    if isinstance(graph.checkpointer, CheckpointMaintenanceMixin):
+        await asyncio.to_thread(graph.checkpointer.close)
+
+
 app = FastAPI(
     title="DeerFlow API",
     description="API for Deer",
     version="0.1.0",
+    lifespan=lifespan,
 )
 
 # Add CORS middleware
@@ -62,10 +89,12 @@ async def chat_stream(request: ChatRequest):
             request.max_plan_iterations,
             request.max_step_num,
             request.max_search_results,
+            request.max_concurrent_steps,
             request.auto_accepted_plan,
             request.interrupt_feedback,
             request.mcp_settings,
             request.enable_background_investigation,
+            request.enable_speculative_investigation,
         ),
         media_type="text/event-stream",
     )
@@ -77,10 +106,12 @@ async def _astream_workflow_generator(
     max_plan_iterations: int,
     max_step_num: int,
     max_search_results: int,
+    max_concurrent_steps: int,
     auto_accepted_plan: bool,
     interrupt_feedback: str,
     mcp_settings: dict,
     enable_background_investigation,
+    enable_speculative_investigation,
 ):
     input_ = {
         "messages": messages,
@@ -90,6 +121,7 @@ async def _astream_workflow_generator(
         "observations": [],
         "auto_accepted_plan": auto_accepted_plan,
         "enable_background_investigation": enable_background_investigation,
+        "enable_speculative_investigation": enable_speculative_investigation,
     }
     if not auto_accepted_plan and interrupt_feedback:
         resume_msg = f"[{interrupt_feedback}]"
@@ -104,6 +136,7 @@ async def _astream_workflow_generator(
             "max_plan_iterations": max_plan_iterations,
             "max_step_num": max_step_num,
             "max_search_results": max_search_results,
+            "max_concurrent_steps": max_concurrent_steps,
             "mcp_settings": mcp_settings,
         },
         stream_mode=["messages", "updates"],
@@ -131,7 +164,8 @@ async def _astream_workflow_generator(
         )
         event_stream_message: dict[str, any] = {
             "thread_id": thread_id,
-            "agent": agent[0].split(":")[0],
+            # Steps started early by the planner label their messages with their agent
+            "agent": message_metadata.get("agent_name") or agent[0].split(":")[0],
             "id": message_chunk.id,
             "role": "assistant",
             "content": message_chunk.content,
@@ -232,7 +266,10 @@ async def generate_podcast(request: GeneratePodcastRequest):
         report_content = request.content
         print(report_content)
         workflow = build_podcast_graph()
-        final_state = workflow.invoke({"input": report_content})
+        # The graph calls models synchronously, which must not block the loop
+        final_state = await asyncio.to_thread(
+            workflow.invoke, {"input": report_content}
+        )
         audio_bytes = final_state["output"]
         return Response(content=audio_bytes, media_type="audio/mp3")
     except Exception as e:
@@ -246,7 +283,9 @@ async def generate_ppt(request: GeneratePPTRequest):
         report_content = request.content
         print(report_content)
         workflow = build_ppt_graph()
-        final_state = workflow.invoke({"input": report_content})
+        final_state = await asyncio.to_thread(
+            workflow.invoke, {"input": report_content}
+        )
         generated_file_path = final_state["generated_file_path"]
         with open(generated_file_path, "rb") as f:
             ppt_bytes = f.read()
@@ -301,6 +340,7 @@ async def mcp_server_metadata(request: MCPServerMetadataRequest):
             url=request.url,
             env=request.env,
             timeout_seconds=timeout,
+            refresh=request.refresh,
         )
 
         # Create the response with tools
@@ -319,3 +359,45 @@ async def mcp_server_metadata(request: MCPServerMetadataRequest):
             logger.exception(f"Error in MCP server metadata endpoint: {str(e)}")
             raise HTTPException(status_code=500, detail=str(e))
         raise
+
+
+@app.get("/api/llm/cache/stats")
+async def llm_cache_stats():
+    """Get the hit rate and size of the LLM response cache."""
+    response_cache = get_llm_response_cache()
+    if response_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **response_cache.stats()}
+
+
+@app.get("/api/crawler/cache/stats")
+async def crawler_cache_stats():
+    """Get the hit rate and size of the crawl cache."""
+    crawl_cache = get_crawl_cache()
+    if crawl_cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **crawl_cache.stats()}
+
+
+@app.get("/api/crawler/strategy/stats")
+async def crawler_strategy_stats():
+    """Get which strategy served the crawls, and why the others fell back."""
+    return get_crawl_strategy_stats()
+
+
+@app.get("/api/llm/governor/stats")
+async def llm_governor_stats():
+    """Get the calls in flight and queue wait times of each model type."""
+    return get_governor_stats()
+
+
+@app.get("/api/llm/hedging/stats")
+async def llm_hedging_stats():
+    """Get the hedged requests and hedging deadlines of each model type."""
+    return get_hedging_stats()
+
+
+@app.get("/api/llm/cascade/stats")
+async def llm_cascade_stats():
+    """Get how often each role answering in cascade escalated to a bigger model."""
+    return get_cascade_stats()
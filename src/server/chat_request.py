@@ -41,6 +41,9 @@ class ChatRequest(BaseModel):
     max_search_results: Optional[int] = Field(
         3, description="The maximum number of search results"
     )
+    max_concurrent_steps: Optional[int] = Field(
+        1, description="The maximum number of plan steps executed concurrently"
+    )
     auto_accepted_plan: Optional[bool] = Field(
         False, description="Whether to automatically accept the plan"
     )
@@ -53,6 +56,10 @@ class ChatRequest(BaseModel):
     enable_background_investigation: Optional[bool] = Field(
         True, description="Whether to get background investigation before plan"
     )
+    enable_speculative_investigation: Optional[bool] = Field(
+        False,
+        description="Whether to start the background investigation while the coordinator runs",
+    )
 
 
 class TTSRequest(BaseModel):
@@ -25,6 +25,9 @@ class MCPServerMetadataRequest(BaseModel):
     timeout_seconds: Optional[int] = Field(
         None, description="Optional custom timeout in seconds for the operation"
     )
+    refresh: bool = Field(
+        False, description="Whether to list the tools again instead of using the cache"
+    )
 
 
 class MCPServerMetadataResponse(BaseModel):
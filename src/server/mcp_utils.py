@@ -2,26 +2,25 @@
 # SPDX-License-Identifier: MIT
 
 import logging
-from datetime import timedelta
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Dict, List, Optional
 
 from fastapi import HTTPException
-from mcp import ClientSession, StdioServerParameters
-from mcp.client.stdio import stdio_client
-from mcp.client.sse import sse_client
+
+from src.tools.mcp_pool import get_mcp_tool_cache
 
 logger = logging.getLogger(__name__)
 
 
-async def _get_tools_from_client_session(
-    client_context_manager: Any, timeout_seconds: int = 10
+async def _get_tools_from_cache(
+    server_config: Dict[str, Any], timeout_seconds: int = 10, refresh: bool = False
 ) -> List:
     """
-    Helper function to get tools from a client session.
+    Helper function to get the cached tools of an MCP server.
 
     Args:
-        client_context_manager: A context manager that returns (read, write) functions
-        timeout_seconds: Timeout in seconds for the read operation
+        server_config: The connection settings of the MCP server
+        timeout_seconds: Timeout in seconds to open the session and list the tools
+        refresh: Whether to list the tools again even if they are cached
 
     Returns:
         List of available tools from the MCP server
@@ -29,15 +28,9 @@ async def _get_tools_from_client_session(
     Raises:
         Exception: If there's an error during the process
     """
-    async with client_context_manager as (read, write):
-        async with ClientSession(
-            read, write, read_timeout_seconds=timedelta(seconds=timeout_seconds)
-        ) as session:
-            # Initialize the connection
-            await session.initialize()
-            # List available tools
-            listed_tools = await session.list_tools()
-            return listed_tools.tools
+    return await get_mcp_tool_cache().get_tools(
+        server_config, refresh=refresh, timeout_seconds=timeout_seconds
+    )
 
 
 async def load_mcp_tools(
@@ -47,6 +40,7 @@ async def load_mcp_tools(
     url: Optional[str] = None,
     env: Optional[Dict[str, str]] = None,
     timeout_seconds: int = 60,  # Longer default timeout for first-time executions
+    refresh: bool = False,
 ) -> List:
     """
     Load tools from an MCP server.
@@ -58,6 +52,7 @@ async def load_mcp_tools(
         url: The URL of the SSE server (for sse type)
         env: Environment variables
         timeout_seconds: Timeout in seconds (default: 60 for first-time executions)
+        refresh: Whether to list the tools again even if they are cached
 
     Returns:
         List of available tools from the MCP server
@@ -72,15 +67,14 @@ async def load_mcp_tools(
                     status_code=400, detail="Command is required for stdio type"
                 )
 
-            server_params = StdioServerParameters(
-                command=command,  # Executable
-                args=args,  # Optional command line arguments
-                env=env,  # Optional environment variables
-            )
+            server_config = {
+                "transport": "stdio",
+                "command": command,  # Executable
+                "args": args,  # Optional command line arguments
+                "env": env,  # Optional environment variables
+            }
 
-            return await _get_tools_from_client_session(
-                stdio_client(server_params), timeout_seconds
-            )
+            return await _get_tools_from_cache(server_config, timeout_seconds, refresh)
 
         elif server_type == "sse":
             if not url:
@@ -88,8 +82,8 @@ async def load_mcp_tools(
                     status_code=400, detail="URL is required for sse type"
                 )
 
-            return await _get_tools_from_client_session(
-                sse_client(url=url), timeout_seconds
+            return await _get_tools_from_cache(
+                {"transport": "sse", "url": url}, timeout_seconds, refresh
             )
 
         else:
@@ -1,20 +1,21 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import functools
 import logging
-from typing import Annotated
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, Union
 
-from langchain_core.tools import tool
+from langchain_core.tools import StructuredTool
 from .decorators import log_io
 
-from src.crawler import Crawler
+from src.crawler import Article, Crawler
 
 logger = logging.getLogger(__name__)
 
 
-@tool
-@log_io
-def crawl_tool(
+@log_io(name="crawl_tool")
+def crawl(
     url: Annotated[str, "The url to crawl."],
 ) -> str:
     """Use this to crawl a url and get a readable content in markdown format."""
@@ -26,3 +27,65 @@ def crawl_tool(
         error_msg = f"Failed to crawl. Error: {repr(e)}"
         logger.error(error_msg)
         return error_msg
+
+
+@log_io(name="crawl_tool")
+async def acrawl(
+    url: Annotated[str, "The url to crawl."],
+) -> str:
+    """Use this to crawl a url and get a readable content in markdown format."""
+    try:
+        article = await Crawler().acrawl(url)
+        return {"url": url, "crawled_content": article.to_markdown()[:1000]}
+    except Exception as e:
+        error_msg = f"Failed to crawl. Error: {repr(e)}"
+        logger.error(error_msg)
+        return error_msg
+
+
+# Async agents crawl without blocking the event loop, sync callers still can
+crawl_tool = StructuredTool.from_function(
+    func=crawl, coroutine=acrawl, name="crawl_tool"
+)
+
+
+def _to_crawl_result(url: str, result: Union[Article, BaseException]) -> dict:
+    if isinstance(result, BaseException):
+        error_msg = f"Failed to crawl. Error: {repr(result)}"
+        logger.error(f"{error_msg} ({url})")
+        return {"url": url, "error": error_msg}
+    return {"url": url, "crawled_content": result.to_markdown()[:1000]}
+
+
+# Get the tool crawling several urls at once. The agent cache tells tools apart
+# by identity, so each concurrency gets one tool rather than a new one per step
+@functools.lru_cache(maxsize=None)
+def get_crawl_many_tool(max_concurrency: int) -> StructuredTool:
+    max_concurrency = max(max_concurrency, 1)
+
+    def crawl_one(url: str) -> Union[Article, BaseException]:
+        try:
+            return Crawler().crawl(url)
+        except Exception as e:
+            return e
+
+    @log_io(name="crawl_many_tool")
+    def crawl_many(
+        urls: Annotated[list[str], "The urls to crawl."],
+    ) -> list[dict]:
+        """Use this to crawl several urls at once and get a readable content of each in markdown format."""
+        with ThreadPoolExecutor(max_workers=max_concurrency) as executor:
+            results = list(executor.map(crawl_one, urls))
+        return [_to_crawl_result(url, result) for url, result in zip(urls, results)]
+
+    @log_io(name="crawl_many_tool")
+    async def acrawl_many(
+        urls: Annotated[list[str], "The urls to crawl."],
+    ) -> list[dict]:
+        """Use this to crawl several urls at once and get a readable content of each in markdown format."""
+        results = await Crawler().acrawl_many(urls, max_concurrency)
+        return [_to_crawl_result(url, result) for url, result in zip(urls, results)]
+
+    return StructuredTool.from_function(
+        func=crawl_many, coroutine=acrawl_many, name="crawl_many_tool"
+    )
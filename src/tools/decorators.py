@@ -1,40 +1,61 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import inspect
 import logging
 import functools
-from typing import Any, Callable, Type, TypeVar
+from typing import Any, Callable, Optional, Type, TypeVar
 
 logger = logging.getLogger(__name__)
 
 T = TypeVar("T")
 
 
-def log_io(func: Callable) -> Callable:
+def log_io(func: Optional[Callable] = None, *, name: Optional[str] = None) -> Callable:
     """
     A decorator that logs the input parameters and output of a tool function.
 
+    Coroutine functions are wrapped in a coroutine function.
+
     Args:
         func: The tool function to be decorated
+        name: The tool name to log, the function name by default
 
     Returns:
-        The wrapped function with input/output logging
+        The wrapped function with input/output logging, or a decorator when
+        only the name is given
     """
+    if func is None:
+        return functools.partial(log_io, name=name)
+    name = name or func.__name__
 
-    @functools.wraps(func)
-    def wrapper(*args: Any, **kwargs: Any) -> Any:
-        # Log input parameters
-        func_name = func.__name__
+    def log_input(*args: Any, **kwargs: Any):
         params = ", ".join(
             [*(str(arg) for arg in args), *(f"{k}={v}" for k, v in kwargs.items())]
         )
-        logger.info(f"Tool {func_name} called with parameters: {params}")
+        logger.info(f"Tool {name} called with parameters: {params}")
+
+    if inspect.iscoroutinefunction(func):
+
+        @functools.wraps(func)
+        async def async_wrapper(*args: Any, **kwargs: Any) -> Any:
+            log_input(*args, **kwargs)
+            result = await func(*args, **kwargs)
+            logger.info(f"Tool {name} returned: {result}")
+            return result
+
+        return async_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        # Log input parameters
+        log_input(*args, **kwargs)
 
         # Execute the function
         result = func(*args, **kwargs)
 
         # Log the output
-        logger.info(f"Tool {func_name} returned: {result}")
+        logger.info(f"Tool {name} returned: {result}")
 
         return result
 
@@ -61,6 +82,15 @@ class LoggedToolMixin:
         )
         return result
 
+    async def _arun(self, *args: Any, **kwargs: Any) -> Any:
+        """Override _arun method to add logging."""
+        self._log_operation("_arun", *args, **kwargs)
+        result = await super()._arun(*args, **kwargs)
+        logger.debug(
+            f"Tool {self.__class__.__name__.replace('Logged', '')} returned: {result}"
+        )
+        return result
+
 
 def create_logged_tool(base_tool_class: Type[T]) -> Type[T]:
     """
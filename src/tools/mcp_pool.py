@@ -0,0 +1,484 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from datetime import timedelta
+from typing import AsyncIterator, Callable, Optional
+
+from mcp import ClientSession, StdioServerParameters, types
+from mcp.client.sse import sse_client
+from mcp.client.stdio import stdio_client
+
+logger = logging.getLogger(__name__)
+
+_CONNECTION_KEYS = ("transport", "command", "args", "url", "env")
+
+
+def normalize_server_config(server_config: dict) -> dict:
+    """Keep only the connection settings of an MCP server config, without empty values."""
+    normalized = {
+        key: server_config[key]
+        for key in _CONNECTION_KEYS
+        if server_config.get(key) not in (None, "", [], {})
+    }
+    normalized.setdefault("transport", "stdio")
+    return normalized
+
+
+def get_server_key(server_config: dict) -> str:
+    """Get the key identifying the connection to an MCP server."""
+    return json.dumps(normalize_server_config(server_config), sort_keys=True)
+
+
+def _open_transport(server_config: dict):
+    transport = server_config["transport"]
+    if transport == "stdio":
+        if not server_config.get("command"):
+            raise ValueError("Command is required for stdio type")
+        # Executables like `uvx` or `npx` need PATH to be found
+        env = dict(server_config.get("env") or {})
+        env.setdefault("PATH", os.environ.get("PATH", ""))
+        return stdio_client(
+            StdioServerParameters(
+                command=server_config["command"],
+                args=server_config.get("args", []),
+                env=env,
+            )
+        )
+    if transport == "sse":
+        if not server_config.get("url"):
+            raise ValueError("URL is required for sse type")
+        return sse_client(url=server_config["url"])
+    raise ValueError(f"Unsupported server type: {transport}")
+
+
+class _PooledSession:
+    """An MCP client session kept open by a task that owns its transport.
+
+    The transport and the session are entered and exited by the same task, as
+    anyio requires, so the session can be shared by the tasks of later steps.
+    """
+
+    def __init__(
+        self,
+        key: str,
+        server_config: dict,
+        read_timeout_seconds: Optional[float],
+        on_closed: Optional[Callable[[ClientSession], None]] = None,
+    ):
+        self.key = key
+        self.server_config = server_config
+        self.read_timeout_seconds = read_timeout_seconds
+        self.on_closed = on_closed
+        self.loop = asyncio.get_running_loop()
+        self.session: Optional[ClientSession] = None
+        self.leases = 0
+        self.last_used = time.monotonic()
+        self.last_checked = time.monotonic()
+        self._ready = self.loop.create_future()
+        self._close_event = asyncio.Event()
+        self._task = self.loop.create_task(self._run())
+
+    @property
+    def closed(self) -> bool:
+        return self._task.done() or self.loop.is_closed()
+
+    async def _run(self):
+        read_timeout = (
+            timedelta(seconds=self.read_timeout_seconds)
+            if self.read_timeout_seconds
+            else None
+        )
+        try:
+            async with _open_transport(self.server_config) as (read, write):
+                async with ClientSession(
+                    read, write, read_timeout_seconds=read_timeout
+                ) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set_result(session)
+                    await self._close_event.wait()
+        except BaseException as e:
+            if not self._ready.done():
+                self._ready.set_exception(e)
+            elif isinstance(e, Exception):
+                logger.warning(f"MCP session {self.key} failed: {e}")
+            if not isinstance(e, (Exception, asyncio.CancelledError)):
+                raise
+        finally:
+            if self.session is not None and self.on_closed:
+                self.on_closed(self.session)
+            self.session = None
+            logger.debug(f"Closed MCP session {self.key}")
+
+    async def wait_ready(self, timeout_seconds: Optional[float]) -> ClientSession:
+        return await asyncio.wait_for(asyncio.shield(self._ready), timeout_seconds)
+
+    async def ping(self, timeout_seconds: float) -> bool:
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout_seconds)
+        except Exception as e:
+            logger.warning(f"MCP session {self.key} failed its health check: {e}")
+            return False
+        self.last_checked = time.monotonic()
+        return True
+
+    def close(self):
+        """Ask the owner task to close the session, from any thread or event loop."""
+        if self.loop.is_closed():
+            return
+        try:
+            self.loop.call_soon_threadsafe(self._close_event.set)
+        except RuntimeError:
+            # The event loop was closed in the meantime
+            pass
+
+    async def wait_closed(self):
+        if not self._ready.done():
+            self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """A process-wide pool of long-lived MCP client sessions.
+
+    Sessions are keyed by the normalized server config, so every step that uses
+    the same server shares one session instead of spawning a new server process
+    and initializing it again. Sessions idle for longer than `idle_timeout_seconds`
+    are closed by a reaper task every `reap_interval_seconds`, sessions idle for
+    longer than `health_check_interval_seconds` are pinged before reuse, and the
+    least recently used idle sessions are closed when more than `max_sessions`
+    are open.
+    """
+
+    def __init__(
+        self,
+        max_sessions: int = 8,
+        idle_timeout_seconds: float = 300,
+        health_check_interval_seconds: float = 30,
+        health_check_timeout_seconds: float = 5,
+        reap_interval_seconds: float = 60,
+    ):
+        self.max_sessions = max_sessions
+        self.idle_timeout_seconds = idle_timeout_seconds
+        self.health_check_interval_seconds = health_check_interval_seconds
+        self.health_check_timeout_seconds = health_check_timeout_seconds
+        self.reap_interval_seconds = reap_interval_seconds
+        self._entries: OrderedDict[str, _PooledSession] = OrderedDict()
+        self._close_listeners: list[Callable[[ClientSession], None]] = []
+        self._reaper: Optional[asyncio.Task] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _pop_stale_entries(self, loop: asyncio.AbstractEventLoop, limit: int) -> list:
+        """Remove the idle, dead and foreign-loop entries, which must then be closed.
+
+        The least recently used idle entries are also removed until at most
+        `limit` entries are left.
+        """
+        now = time.monotonic()
+        stale = [
+            entry
+            for entry in self._entries.values()
+            if entry.closed
+            or (entry.leases == 0 and entry.loop is not loop)
+            or (
+                entry.leases == 0
+                and self.idle_timeout_seconds
+                and now - entry.last_used > self.idle_timeout_seconds
+            )
+        ]
+        idle = [entry for entry in self._entries.values() if entry.leases == 0]
+        for entry in idle:
+            if len(self._entries) - len(stale) <= limit:
+                break
+            if entry not in stale:
+                stale.append(entry)
+        for entry in stale:
+            del self._entries[entry.key]
+        return stale
+
+    def add_close_listener(self, listener: Callable[[ClientSession], None]):
+        """Call a listener with every session the pool closes, from its event loop."""
+        self._close_listeners.append(listener)
+
+    def _notify_closed(self, session: ClientSession):
+        for listener in self._close_listeners:
+            try:
+                listener(session)
+            except Exception as e:
+                logger.error(f"MCP session close listener failed: {e}")
+
+    def reap(self) -> int:
+        """Close the idle and dead sessions, return the number closed."""
+        with self._lock:
+            stale = self._pop_stale_entries(
+                asyncio.get_running_loop(), self.max_sessions
+            )
+        for entry in stale:
+            entry.close()
+        return len(stale)
+
+    async def _reap_periodically(self):
+        while True:
+            await asyncio.sleep(self.reap_interval_seconds)
+            if reaped := self.reap():
+                logger.info(f"Closed {reaped} idle MCP sessions")
+
+    def _start_reaper(self, loop: asyncio.AbstractEventLoop):
+        """Start the reaper in the event loop of the sessions, if not running there."""
+        if self.reap_interval_seconds <= 0:
+            return
+        if self._reaper and not self._reaper.done() and self._reaper.get_loop() is loop:
+            return
+        self._reaper = loop.create_task(self._reap_periodically())
+
+    def _discard(self, entry: _PooledSession):
+        with self._lock:
+            if self._entries.get(entry.key) is entry:
+                del self._entries[entry.key]
+        entry.close()
+
+    async def _acquire(
+        self,
+        server_config: dict,
+        connect_timeout_seconds: Optional[float],
+        read_timeout_seconds: Optional[float],
+    ) -> _PooledSession:
+        server_config = normalize_server_config(server_config)
+        key = get_server_key(server_config)
+        loop = asyncio.get_running_loop()
+
+        for _ in range(2):
+            with self._lock:
+                self._start_reaper(loop)
+                limit = self.max_sessions - (key not in self._entries)
+                stale = self._pop_stale_entries(loop, limit)
+                entry = self._entries.get(key)
+                if entry is None or entry.loop is not loop:
+                    logger.info(f"Opening MCP session {key}")
+                    entry = _PooledSession(
+                        key, server_config, read_timeout_seconds, self._notify_closed
+                    )
+                    self._entries[key] = entry
+                    if len(self._entries) > self.max_sessions:
+                        logger.warning(
+                            f"{len(self._entries)} MCP sessions are in use, "
+                            f"more than the limit of {self.max_sessions}"
+                        )
+                self._entries.move_to_end(key)
+                entry.leases += 1
+            for stale_entry in stale:
+                stale_entry.close()
+
+            try:
+                await entry.wait_ready(connect_timeout_seconds)
+            except BaseException:
+                self._discard(entry)
+                self._release(entry)
+                raise
+
+            if (
+                time.monotonic() - entry.last_checked
+                > self.health_check_interval_seconds
+                and not await entry.ping(self.health_check_timeout_seconds)
+            ):
+                self._discard(entry)
+                self._release(entry)
+                continue
+            return entry
+
+        raise RuntimeError(f"Could not open a healthy MCP session {key}")
+
+    def _release(self, entry: _PooledSession):
+        with self._lock:
+            entry.leases -= 1
+            entry.last_used = time.monotonic()
+            # Entries replaced while leased are closed by their last lease
+            orphaned = entry.leases == 0 and self._entries.get(entry.key) is not entry
+        if orphaned:
+            entry.close()
+
+    @asynccontextmanager
+    async def session(
+        self,
+        server_config: dict,
+        connect_timeout_seconds: Optional[float] = 60,
+        read_timeout_seconds: Optional[float] = None,
+    ) -> AsyncIterator[ClientSession]:
+        """
+        Lease the pooled session of an MCP server, opening it if needed.
+
+        The session stays open after the context exits, and is only closed by
+        the pool once idle, unhealthy or evicted.
+
+        Args:
+            server_config: The server config, with `transport` and `command`, `args`
+                and `env` for stdio servers or `url` for sse servers
+            connect_timeout_seconds: Timeout to start and initialize a new session
+            read_timeout_seconds: Timeout of the requests of a new session
+
+        Yields:
+            The initialized client session
+        """
+        entry = await self._acquire(
+            server_config, connect_timeout_seconds, read_timeout_seconds
+        )
+        try:
+            yield entry.session
+        finally:
+            self._release(entry)
+
+    async def close_all(self):
+        """Close every session, waiting for those owned by the current event loop."""
+        with self._lock:
+            entries = list(self._entries.values())
+            self._entries.clear()
+            reaper, self._reaper = self._reaper, None
+        loop = asyncio.get_running_loop()
+        if reaper and not reaper.done():
+            if reaper.get_loop() is loop:
+                reaper.cancel()
+                await asyncio.gather(reaper, return_exceptions=True)
+            elif not reaper.get_loop().is_closed():
+                try:
+                    reaper.get_loop().call_soon_threadsafe(reaper.cancel)
+                except RuntimeError:
+                    # The event loop was closed in the meantime
+                    pass
+        for entry in entries:
+            entry.close()
+        await asyncio.gather(
+            *(entry.wait_closed() for entry in entries if entry.loop is loop)
+        )
+
+
+class MCPToolCache:
+    """A cache of the tools listed by MCP servers, keyed by the server config.
+
+    Listings expire after `ttl_seconds`, and concurrent requests for the same
+    server share a single listing instead of each listing the tools again.
+    """
+
+    def __init__(self, pool: MCPSessionPool, ttl_seconds: float = 300):
+        self.pool = pool
+        self.ttl_seconds = ttl_seconds
+        self._entries: dict[str, tuple[float, list[types.Tool]]] = {}
+        self._loading: dict[str, asyncio.Task] = {}
+        self._lock = threading.Lock()
+
+    async def _load(
+        self, key: str, server_config: dict, timeout_seconds: Optional[float]
+    ) -> list[types.Tool]:
+        async with self.pool.session(
+            server_config, connect_timeout_seconds=timeout_seconds
+        ) as session:
+            listed_tools = await asyncio.wait_for(session.list_tools(), timeout_seconds)
+        with self._lock:
+            # Listings invalidated while loading are not cached
+            if self._loading.get(key) is asyncio.current_task():
+                del self._loading[key]
+                self._entries[key] = (time.monotonic(), listed_tools.tools)
+        return listed_tools.tools
+
+    async def get_tools(
+        self,
+        server_config: dict,
+        refresh: bool = False,
+        timeout_seconds: Optional[float] = 60,
+    ) -> list[types.Tool]:
+        """
+        Get the tools of an MCP server, listing them only if not cached.
+
+        Args:
+            server_config: The server config, as accepted by `MCPSessionPool.session`
+            refresh: Whether to list the tools again even if they are cached
+            timeout_seconds: Timeout to open the session and list the tools
+
+        Returns:
+            The tools listed by the server
+        """
+        key = get_server_key(server_config)
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            if refresh:
+                self._entries.pop(key, None)
+            cached = self._entries.get(key)
+            if cached and time.monotonic() - cached[0] < self.ttl_seconds:
+                return cached[1]
+            task = self._loading.get(key)
+            if task is None or task.done() or task.get_loop() is not loop:
+                task = loop.create_task(self._load(key, server_config, timeout_seconds))
+                self._loading[key] = task
+        # Shielded so that a caller giving up does not cancel the shared listing
+        return await asyncio.wait_for(asyncio.shield(task), timeout_seconds)
+
+    def invalidate(self, server_config: Optional[dict] = None):
+        """Forget the cached tools of a server, or of every server if none is given."""
+        with self._lock:
+            if server_config is None:
+                self._entries.clear()
+                self._loading.clear()
+            else:
+                key = get_server_key(server_config)
+                self._entries.pop(key, None)
+                self._loading.pop(key, None)
+
+
+_pool: Optional[MCPSessionPool] = None
+_pool_lock = threading.RLock()
+
+
+def get_mcp_session_pool() -> MCPSessionPool:
+    """
+    Get the process-wide MCP session pool, configured by the environment.
+
+    MCP_POOL_MAX_SESSIONS limits the number of open sessions,
+    MCP_POOL_IDLE_TIMEOUT_SECONDS closes sessions idle for longer (0 keeps them
+    open) and MCP_POOL_HEALTH_CHECK_INTERVAL_SECONDS is how long a session can be
+    idle before it is pinged on reuse.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = MCPSessionPool(
+                max_sessions=int(os.getenv("MCP_POOL_MAX_SESSIONS", "8")),
+                idle_timeout_seconds=float(
+                    os.getenv("MCP_POOL_IDLE_TIMEOUT_SECONDS", "300")
+                ),
+                health_check_interval_seconds=float(
+                    os.getenv("MCP_POOL_HEALTH_CHECK_INTERVAL_SECONDS", "30")
+                ),
+                reap_interval_seconds=float(
+                    os.getenv("MCP_POOL_REAP_INTERVAL_SECONDS", "60")
+                ),
+            )
+        return _pool
+
+
+_tool_cache: Optional[MCPToolCache] = None
+
+
+def get_mcp_tool_cache() -> MCPToolCache:
+    """
+    Get the process-wide cache of MCP tool listings.
+
+    MCP_TOOLS_CACHE_TTL_SECONDS is how long listings are cached.
+    """
+    global _tool_cache
+    with _pool_lock:
+        if _tool_cache is None:
+            _tool_cache = MCPToolCache(
+                pool=get_mcp_session_pool(),
+                ttl_seconds=float(os.getenv("MCP_TOOLS_CACHE_TTL_SECONDS", "300")),
+            )
+        return _tool_cache
@@ -0,0 +1,112 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import logging
+import threading
+import weakref
+from typing import Callable, Optional
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+class _LoopBoundAsyncClient(httpx.AsyncClient):
+    """Async client sending its requests with the client of the running event loop.
+
+    Callers can be created once and keep their async client, while async
+    connections belong to the event loop they were opened in, and a process
+    can run several loops one after the other.
+    """
+
+    def __init__(self, registry: "HTTPClientRegistry", key: str):
+        super().__init__()
+        self._registry = registry
+        self._key = key
+
+    async def send(self, request: httpx.Request, **kwargs) -> httpx.Response:
+        client = self._registry.get_loop_client(self._key)
+        return await client.send(request, **kwargs)
+
+
+class HTTPClientRegistry:
+    """Registry of HTTP clients shared by everything using the same key.
+
+    Each key gets one sync client, and one async client per event loop, so
+    connections, TLS sessions and HTTP/2 streams are reused across callers.
+    The connection limits apply to every key separately, and the other client
+    settings, like timeouts, are given as keyword arguments. Custom transports
+    are given as factories taking the limits and http2 flag, since every client
+    needs a connection pool of its own.
+    """
+
+    def __init__(
+        self,
+        limits: Optional[httpx.Limits] = None,
+        http2: bool = False,
+        transport: Optional[Callable[..., httpx.BaseTransport]] = None,
+        async_transport: Optional[Callable[..., httpx.AsyncBaseTransport]] = None,
+        **kwargs,
+    ):
+        self.limits = limits or httpx.Limits()
+        self.http2 = http2
+        self.transport = transport
+        self.async_transport = async_transport
+        self.client_kwargs = kwargs
+        self._clients: dict[str, httpx.Client] = {}
+        self._async_clients: dict[str, _LoopBoundAsyncClient] = {}
+        self._loop_clients: weakref.WeakKeyDictionary = weakref.WeakKeyDictionary()
+        self._lock = threading.Lock()
+
+    def _create_client(self) -> httpx.Client:
+        kwargs = dict(self.client_kwargs)
+        if self.transport:
+            kwargs["transport"] = self.transport(limits=self.limits, http2=self.http2)
+        return httpx.Client(limits=self.limits, http2=self.http2, **kwargs)
+
+    def _create_async_client(self) -> httpx.AsyncClient:
+        kwargs = dict(self.client_kwargs)
+        if self.async_transport:
+            kwargs["transport"] = self.async_transport(
+                limits=self.limits, http2=self.http2
+            )
+        return httpx.AsyncClient(limits=self.limits, http2=self.http2, **kwargs)
+
+    def get_client(self, key: str) -> httpx.Client:
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None or client.is_closed:
+                client = self._clients[key] = self._create_client()
+            return client
+
+    def get_async_client(self, key: str) -> httpx.AsyncClient:
+        """Get the async client of a key, which works in any event loop."""
+        with self._lock:
+            if key not in self._async_clients:
+                self._async_clients[key] = _LoopBoundAsyncClient(self, key)
+            return self._async_clients[key]
+
+    def get_loop_client(self, key: str) -> httpx.AsyncClient:
+        """Get the async client of a key for the running event loop."""
+        loop = asyncio.get_running_loop()
+        with self._lock:
+            clients = self._loop_clients.setdefault(loop, {})
+            client = clients.get(key)
+            if client is None or client.is_closed:
+                client = clients[key] = self._create_async_client()
+            return client
+
+    async def close_all(self) -> None:
+        """Close the sync clients and the async clients of the running event loop."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+            loop_clients = self._loop_clients.pop(asyncio.get_running_loop(), {})
+            async_clients = list(loop_clients.values())
+        for client in clients:
+            client.close()
+        for client in async_clients:
+            await client.aclose()
+        if clients or async_clients:
+            logger.info(f"Closed {len(clients) + len(async_clients)} HTTP clients")
@@ -19,6 +19,13 @@ def repair_json_output(content: str) -> str:
         str: Repaired JSON string, or original content if not JSON
     """
     content = content.strip()
+    if content.startswith(("{", "[")):
+        # Fast path for content that is already valid JSON
+        try:
+            json.loads(content)
+            return content
+        except json.JSONDecodeError:
+            pass
     if content.startswith(("{", "[")) or "```json" in content or "```ts" in content:
         try:
             # If content is wrapped in ```json code block, extract the JSON part
@@ -0,0 +1,145 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import contextlib
+import os
+import sqlite3
+import threading
+from typing import Any, Iterator, Optional
+
+
+class LRUTable:
+    """Table of serialized values in an embedded SQLite database.
+
+    Rows are keyed by a string and hold the value along with its size, the
+    extra columns of the caller and the times they were created and last
+    accessed at, so that the least recently used rows can be evicted to stay
+    within an entry and size limit.
+
+    The connection is shared across threads, so every statement runs under a
+    lock, and `transaction` groups statements into one atomic unit.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        table: str,
+        extra_columns: tuple[str, ...] = (),
+    ):
+        self.path = path
+        self.table = table
+        self._lock = threading.RLock()
+        self._depth = 0
+        if os.path.dirname(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        columns = "".join(f"{column} TEXT, " for column in extra_columns)
+        with self.transaction():
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.executescript(
+                f"""
+                CREATE TABLE IF NOT EXISTS {table} (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    {columns}
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS {table}_accessed_at
+                    ON {table} (accessed_at);
+                """
+            )
+
+    @contextlib.contextmanager
+    def transaction(self) -> Iterator[None]:
+        """Hold the lock and commit once the outermost transaction ends."""
+        with self._lock:
+            self._depth += 1
+            try:
+                if self._depth > 1:
+                    yield
+                else:
+                    with self._conn:
+                        yield
+            finally:
+                self._depth -= 1
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+    def get(self, key: str, columns: str) -> Optional[tuple]:
+        """Get some columns of a row, without counting it as accessed."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT {columns} FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+
+    def put(self, key: str, value: str, now: float, **columns: Any) -> None:
+        names = ["key", "value", "size", *columns, "created_at", "accessed_at"]
+        params = [key, value, len(value.encode()), *columns.values(), now, now]
+        with self.transaction():
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} ({', '.join(names)}) "
+                f"VALUES ({', '.join('?' * len(names))})",
+                params,
+            )
+
+    def evict(self, max_entries: int = 0, max_bytes: int = 0) -> None:
+        """Evict the least recently used rows over the limits, 0 disabling one."""
+        with self.transaction():
+            if max_entries > 0:
+                self._conn.execute(
+                    f"""
+                    DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM {self.table}
+                        ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+                    )
+                    """,
+                    (max_entries,),
+                )
+            if max_bytes > 0:
+                self._conn.execute(
+                    f"""
+                    DELETE FROM {self.table} WHERE key IN (
+                        SELECT key FROM (
+                            SELECT key, SUM(size) OVER (
+                                ORDER BY accessed_at DESC, key
+                            ) AS total FROM {self.table}
+                        ) WHERE total > ?
+                    )
+                    """,
+                    (max_bytes,),
+                )
+
+    def set(self, key: str, **columns: Any) -> None:
+        assignments = ", ".join(f"{name} = ?" for name in columns)
+        with self.transaction():
+            self._conn.execute(
+                f"UPDATE {self.table} SET {assignments} WHERE key = ?",
+                (*columns.values(), key),
+            )
+
+    def delete(self, key: str) -> None:
+        with self.transaction():
+            self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+    def delete_created_before(self, time: float, unless: Optional[str] = None) -> None:
+        """Delete the rows created before a time, except those matching a condition."""
+        query = f"DELETE FROM {self.table} WHERE created_at < ?"
+        if unless:
+            query += f" AND NOT ({unless})"
+        with self.transaction():
+            self._conn.execute(query, (time,))
+
+    def clear(self) -> None:
+        with self.transaction():
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def size(self) -> tuple[int, int]:
+        """Get the number of rows and the total size of their values."""
+        with self._lock:
+            return self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self.table}"
+            ).fetchone()
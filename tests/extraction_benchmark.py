@@ -0,0 +1,160 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+"""
+Compare the quality and speed of the extraction engines over saved pages.
+
+Every `<name>.html` page of the fixtures directory is extracted by each engine.
+The quality of an article is the token F1 of its text against the reference
+text of the page in `<name>.txt`, and against the article of the readabilipy
+engine when it can run. Run with:
+
+    python -m tests.extraction_benchmark [fixtures_dir] [--repeat N]
+"""
+
+import argparse
+import re
+import shutil
+import subprocess
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Optional
+
+from src.crawler.article import Article
+from src.crawler.readability_extractor import ExtractionEngine, ReadabilityExtractor
+
+DEFAULT_FIXTURES_DIR = Path(__file__).resolve().parent / "fixtures" / "html"
+
+_TAG_PATTERN = re.compile(r"<[^>]+>")
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def get_tokens(text: str) -> Counter[str]:
+    return Counter(_TOKEN_PATTERN.findall(text.lower()))
+
+
+def get_article_text(article: Article) -> str:
+    return f"{article.title or ''}\n{_TAG_PATTERN.sub(' ', article.html_content or '')}"
+
+
+def get_token_f1(text: str, reference: str) -> float:
+    """Score how much of a reference text was extracted, and nothing else."""
+    tokens, reference_tokens = get_tokens(text), get_tokens(reference)
+    overlap = sum((tokens & reference_tokens).values())
+    if not overlap:
+        return 0.0
+    precision = overlap / sum(tokens.values())
+    recall = overlap / sum(reference_tokens.values())
+    return 2 * precision * recall / (precision + recall)
+
+
+def get_unavailable_reason(engine: ExtractionEngine) -> Optional[str]:
+    """Tell why an engine cannot run here, or None if it can."""
+    if engine is not ExtractionEngine.READABILIPY:
+        return None
+    # Without its Node.js dependencies, readabilipy would try to install them
+    # with npm on the first page, so they are checked without running it
+    if shutil.which("node") is None:
+        return "node is not installed"
+    import readabilipy
+
+    javascript_dir = Path(readabilipy.__file__).parent / "javascript"
+    if not (javascript_dir / "node_modules").exists():
+        return f"run `npm install` in {javascript_dir}"
+    try:
+        subprocess.run(["node", "-v"], check=True, capture_output=True, timeout=10)
+    except (OSError, subprocess.SubprocessError) as e:
+        return f"node does not run ({e})"
+    return None
+
+
+def compare_extractors(
+    fixtures_dir: Path = DEFAULT_FIXTURES_DIR,
+    engines: Optional[list[ExtractionEngine]] = None,
+    repeat: int = 3,
+) -> dict[str, Any]:
+    """
+    Extract every saved page with each engine, timing and scoring the articles.
+
+    Args:
+        fixtures_dir: The directory of the saved pages and their reference texts
+        engines: The engines to compare, all of them by default
+        repeat: How many times each page is extracted, the best time is kept
+
+    Returns:
+        The unavailable engines with the reason, and for each page the time in
+        milliseconds and the scores of the article of every available engine
+    """
+    engines = engines or list(ExtractionEngine)
+    unavailable = {
+        engine.value: reason
+        for engine in engines
+        if (reason := get_unavailable_reason(engine))
+    }
+    available = [engine for engine in engines if engine.value not in unavailable]
+    pages = []
+    for path in sorted(Path(fixtures_dir).glob("*.html")):
+        html = path.read_text(encoding="utf-8")
+        reference_path = path.with_suffix(".txt")
+        reference = (
+            reference_path.read_text(encoding="utf-8")
+            if reference_path.exists()
+            else None
+        )
+        texts, results = {}, {}
+        for engine in available:
+            extractor = ReadabilityExtractor(engine.value)
+            timings = []
+            for _ in range(max(repeat, 1)):
+                start = time.perf_counter()
+                article = extractor.extract_article(html)
+                timings.append(time.perf_counter() - start)
+            texts[engine] = get_article_text(article)
+            results[engine.value] = {
+                "ms": min(timings) * 1000,
+                "f1": get_token_f1(texts[engine], reference) if reference else None,
+            }
+        if baseline := texts.get(ExtractionEngine.READABILIPY):
+            for engine, text in texts.items():
+                results[engine.value]["agreement"] = get_token_f1(text, baseline)
+        pages.append({"page": path.stem, "engines": results})
+    return {"unavailable": unavailable, "pages": pages}
+
+
+def _format_score(value: Optional[float]) -> str:
+    return "-" if value is None else f"{value:.3f}"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("fixtures_dir", nargs="?", default=DEFAULT_FIXTURES_DIR)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument(
+        "--engines",
+        default=",".join(engine.value for engine in ExtractionEngine),
+        help="Comma separated engines to compare",
+    )
+    args = parser.parse_args()
+    engines = [ExtractionEngine(name.strip()) for name in args.engines.split(",")]
+    report = compare_extractors(Path(args.fixtures_dir), engines, args.repeat)
+
+    for engine, reason in report["unavailable"].items():
+        print(f"Skipping {engine}: {reason}")
+    print(f"{'page':<24}{'engine':<14}{'ms':>10}{'f1':>8}{'agreement':>11}")
+    totals: dict[str, list[float]] = {}
+    for page in report["pages"]:
+        for engine, result in page["engines"].items():
+            totals.setdefault(engine, []).append(result["ms"])
+            print(
+                f"{page['page']:<24}{engine:<14}{result['ms']:>10.2f}"
+                f"{_format_score(result['f1']):>8}"
+                f"{_format_score(result.get('agreement')):>11}"
+            )
+    for engine, timings in totals.items():
+        pages_per_second = len(timings) / (sum(timings) / 1000) if sum(timings) else 0
+        print(f"{engine}: {pages_per_second:.1f} pages per second")
+
+
+if __name__ == "__main__":
+    main()
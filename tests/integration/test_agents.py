@@ -0,0 +1,69 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import MagicMock, patch
+
+import pytest
+from langchain_core.tools import tool
+
+from src.agents import agents
+
+
+@tool
+def first_tool(query: str) -> str:
+    """The first tool."""
+    return query
+
+
+@tool
+def second_tool(query: str) -> str:
+    """The second tool."""
+    return query
+
+
+@pytest.fixture(autouse=True)
+def fake_llm():
+    agents._agent_cache.clear()
+    with patch.object(agents, "get_llm_by_type", return_value=MagicMock()):
+        yield
+    agents._agent_cache.clear()
+
+
+def test_agents_are_reused_for_the_same_tools():
+    agent = agents.create_agent("researcher", "researcher", [first_tool], "researcher")
+    assert (
+        agents.create_agent("researcher", "researcher", [first_tool], "researcher")
+        is agent
+    )
+    assert (
+        agents.create_agent(
+            "researcher", "researcher", [first_tool, second_tool], "researcher"
+        )
+        is not agent
+    )
+    assert agents.create_agent("coder", "coder", [first_tool], "coder") is not agent
+
+
+def test_agents_are_rebuilt_when_a_tool_changes():
+    tool_copy = first_tool.model_copy()
+    agent = agents.create_agent("researcher", "researcher", [tool_copy], "researcher")
+    tool_copy.description = "Changed"
+    assert (
+        agents.create_agent("researcher", "researcher", [tool_copy], "researcher")
+        is not agent
+    )
+
+
+def test_least_recently_used_agents_are_evicted():
+    with patch.object(agents, "AGENT_CACHE_SIZE", 2):
+        researcher = agents.create_agent(
+            "researcher", "researcher", [first_tool], "researcher"
+        )
+        agents.create_agent("coder", "coder", [first_tool], "coder")
+        agents.create_agent("researcher", "researcher", [first_tool], "researcher")
+        agents.create_agent("coder", "coder", [second_tool], "coder")
+        assert len(agents._agent_cache) == 2
+        assert (
+            agents.create_agent("researcher", "researcher", [first_tool], "researcher")
+            is researcher
+        )
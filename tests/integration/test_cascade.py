@@ -0,0 +1,90 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessage
+from langchain_core.runnables import RunnableConfig
+from langchain_core.runnables.config import var_child_runnable_config
+
+from src.config.agents import AGENT_LLM_CASCADE, _parse_llm_cascade
+from src.llms import cascade
+
+
+@pytest.fixture(autouse=True)
+def reset_stats():
+    cascade._stats.clear()
+    yield
+    cascade._stats.clear()
+
+
+def test_cascades_are_parsed_from_the_environment():
+    assert _parse_llm_cascade("coordinator=fast, basic; planner=fast,reasoning;") == {
+        "coordinator": ["fast", "basic"],
+        "planner": ["fast", "reasoning"],
+    }
+    assert _parse_llm_cascade("") == {}
+
+
+def test_invalid_answers_and_errors_escalate():
+    async def attempt(llm_type, config):
+        if llm_type == "reasoning":
+            raise ValueError("failed")
+        return llm_type
+
+    def run(validate):
+        return asyncio.run(cascade.run_cascade("planner", attempt, validate))
+
+    with patch.dict(AGENT_LLM_CASCADE, {"planner": ["fast", "reasoning", "basic"]}):
+        assert run(lambda answer: True) == "fast"
+        assert run(lambda answer: answer == "basic") == "basic"
+        # The last model answers even when its answer is not valid
+        assert run(lambda answer: False) == "basic"
+
+    stats = cascade.get_cascade_stats()["planner"]
+    assert stats["calls"] == 3
+    assert stats["escalation_rate"] == pytest.approx(2 / 3)
+    assert stats["answered_by"] == {"fast": 1, "basic": 2}
+
+
+def test_roles_without_cascade_use_their_model():
+    async def attempt(llm_type, config):
+        return llm_type
+
+    result = asyncio.run(cascade.run_cascade("planner", attempt, lambda answer: False))
+    assert result == "basic"
+    assert cascade.get_cascade_stats() == {}
+
+
+class MessageCollector(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+def test_only_kept_answers_are_streamed():
+    async def attempt(llm_type, config):
+        configs.append((llm_type, config))
+        return AIMessage(content=f"answer of {llm_type}")
+
+    async def run(validate):
+        # Answers are reported to the callbacks of the run the cascade is part of
+        var_child_runnable_config.set(RunnableConfig(callbacks=[collector]))
+        return await cascade.run_cascade("coordinator", attempt, validate)
+
+    with patch.dict(AGENT_LLM_CASCADE, {"coordinator": ["fast", "basic"]}):
+        configs, collector = [], MessageCollector()
+        asyncio.run(run(lambda answer: True))
+        assert configs == [("fast", {"tags": ["nostream"]})]
+        assert collector.tokens == ["answer of fast"]
+
+        configs, collector = [], MessageCollector()
+        asyncio.run(run(lambda answer: False))
+        assert configs == [("fast", {"tags": ["nostream"]}), ("basic", {})]
+        # The last model streams its answer itself
+        assert collector.tokens == []
@@ -0,0 +1,95 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import operator
+from typing import Annotated, TypedDict
+
+import pytest
+from langgraph.graph import END, START, StateGraph
+from langgraph.types import Command, Send, interrupt
+
+from src.graph.checkpointer import BoundedMemorySaver, SQLiteSaver
+
+
+class _State(TypedDict):
+    items: Annotated[list[str], operator.add]
+    feedback: str
+
+
+def _build_graph(checkpointer):
+    def fan_out(state):
+        return Command(goto=[Send("worker", {"item": item}) for item in "abc"])
+
+    def worker(state):
+        return {"items": [state["item"]]}
+
+    def review(state):
+        return {"feedback": interrupt("Please review")}
+
+    builder = StateGraph(_State)
+    builder.add_node("fan_out", fan_out)
+    builder.add_node("worker", worker)
+    builder.add_node("review", review)
+    builder.add_edge(START, "fan_out")
+    builder.add_edge("worker", "review")
+    builder.add_edge("review", END)
+    return builder.compile(checkpointer=checkpointer)
+
+
+def _run_until_interrupt(graph, thread_id):
+    config = {"configurable": {"thread_id": thread_id}}
+    graph.invoke({"items": []}, config)
+    return config
+
+
+def test_sqlite_saver_resumes_interrupt_after_restart(tmp_path):
+    """Interrupted threads survive a new checkpointer on the same database"""
+    path = str(tmp_path / "checkpoints.db")
+    config = _run_until_interrupt(_build_graph(SQLiteSaver(path)), "thread-1")
+
+    graph = _build_graph(SQLiteSaver(path))
+    result = graph.invoke(Command(resume="[ACCEPTED]"), config)
+
+    assert sorted(result["items"]) == ["a", "b", "c"]
+    assert result["feedback"] == "[ACCEPTED]"
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_compaction_keeps_latest_checkpoints(tmp_path, backend):
+    """Compaction keeps the latest checkpoints and the thread stays resumable"""
+    if backend == "sqlite":
+        checkpointer = SQLiteSaver(str(tmp_path / "checkpoints.db"))
+    else:
+        checkpointer = BoundedMemorySaver()
+    graph = _build_graph(checkpointer)
+    config = _run_until_interrupt(graph, "thread-1")
+    assert len(list(checkpointer.list(config))) > 2
+
+    assert checkpointer.compact(2) > 0
+    assert len(list(checkpointer.list(config))) == 2
+
+    result = graph.invoke(Command(resume="[ACCEPTED]"), config)
+    assert sorted(result["items"]) == ["a", "b", "c"]
+
+
+@pytest.mark.parametrize("backend", ["memory", "sqlite"])
+def test_idle_threads_are_evicted(tmp_path, backend):
+    """Threads idle for longer than the TTL are deleted"""
+    if backend == "sqlite":
+        checkpointer = SQLiteSaver(str(tmp_path / "checkpoints.db"))
+    else:
+        checkpointer = BoundedMemorySaver()
+    config = _run_until_interrupt(_build_graph(checkpointer), "thread-1")
+
+    assert checkpointer.evict_idle_threads(3600) == 0
+    assert checkpointer.evict_idle_threads(-1) == 1
+    assert checkpointer.get_tuple(config) is None
+
+
+def test_close_stops_the_maintenance_thread():
+    checkpointer = BoundedMemorySaver(max_checkpoints_per_thread=2)
+    checkpointer.start_maintenance(60)
+    thread = checkpointer._maintenance_thread
+    assert thread.is_alive()
+    checkpointer.close()
+    assert not thread.is_alive()
@@ -0,0 +1,111 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import socket
+import threading
+import time
+from unittest.mock import patch
+
+import httpx
+
+from src.crawler import Article, Crawler
+from src.crawler.cache import CrawlCache, canonicalize_url
+from src.crawler.jina_client import JinaClient
+from src.crawler.readability_extractor import ReadabilityExtractor
+
+
+def test_spellings_of_a_url_share_an_entry():
+    assert (
+        canonicalize_url("HTTPS://Example.com:443?b=2&utm_source=x&a=1#intro")
+        == canonicalize_url("https://example.com/?a=1&b=2")
+        == "https://example.com/?a=1&b=2"
+    )
+    assert canonicalize_url("http://example.com:8080/a") == "http://example.com:8080/a"
+
+
+def test_content_selecting_parameters_are_kept():
+    url = "https://api.github.com/repos/owner/repo/contents/README.md"
+    assert canonicalize_url(f"{url}?ref=a") != canonicalize_url(f"{url}?ref=b")
+
+
+def test_articles_expire_and_are_evicted_by_size(tmp_path):
+    cache = CrawlCache(str(tmp_path / "crawl.db"), max_bytes=200, ttl_seconds=60)
+    assert cache.lookup("https://example.com/a") is None
+    cache.update("https://example.com/a", Article("A", "<p>" + "a" * 50 + "</p>"))
+    cached = cache.lookup("https://example.com/a#top")
+    assert cached.fresh and cached.article.title == "A"
+
+    # The least recently used article is evicted above the size limit
+    time.sleep(0.01)
+    cache.update("https://example.com/b", Article("B", "<p>" + "b" * 50 + "</p>"))
+    time.sleep(0.01)
+    assert cache.lookup("https://example.com/a") is not None
+    cache.update("https://example.com/c", Article("C", "<p>" + "c" * 50 + "</p>"))
+    assert cache.lookup("https://example.com/a") is not None
+    assert cache.lookup("https://example.com/b") is None
+
+    with patch("src.crawler.cache.time.time", return_value=time.time() + 120):
+        assert cache.lookup("https://example.com/a") is None
+    assert cache.stats()["hits"] == 3
+    assert cache.stats()["misses"] == 3
+
+
+class ThreadRecordingCache(CrawlCache):
+    """Crawl cache recording the threads it is used from."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.threads = set()
+
+    def lookup(self, url):
+        self.threads.add(threading.current_thread())
+        return super().lookup(url)
+
+    def update(self, url, *args, **kwargs):
+        self.threads.add(threading.current_thread())
+        return super().update(url, *args, **kwargs)
+
+    def renew(self, url):
+        self.threads.add(threading.current_thread())
+        return super().renew(url)
+
+
+def test_unchanged_pages_are_revalidated_instead_of_crawled(tmp_path, monkeypatch):
+    monkeypatch.setenv("CRAWLER_STRATEGIES", "jina")
+    cache = ThreadRecordingCache(
+        str(tmp_path / "crawl.db"), ttl_seconds=60, revalidate=True
+    )
+    crawls = []
+
+    async def acrawl(self, url, return_format="html"):
+        crawls.append(url)
+        return "<html></html>"
+
+    def handler(request):
+        if request.headers.get("if-none-match") == '"v1"':
+            return httpx.Response(304)
+        return httpx.Response(200, headers={"etag": '"v1"'})
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        return [(socket.AF_INET, socket.SOCK_STREAM, 6, "", ("93.184.215.14", port))]
+
+    article = Article(title="Title", html_content="<p>Content</p>")
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with (
+        patch("socket.getaddrinfo", getaddrinfo),
+        patch("src.crawler.crawler.get_crawl_cache", return_value=cache),
+        patch("src.crawler.http_client.get_async_http_client", return_value=client),
+        patch.object(JinaClient, "acrawl", acrawl),
+        patch.object(ReadabilityExtractor, "extract_article", return_value=article),
+    ):
+        asyncio.run(Crawler().acrawl("https://example.com"))
+        asyncio.run(Crawler().acrawl("https://example.com"))
+        with patch("src.crawler.cache.time.time", return_value=time.time() + 120):
+            result = asyncio.run(Crawler().acrawl("https://example.com"))
+    assert result.to_markdown() == "# Title\n\nContent"
+    assert crawls == ["https://example.com"]
+    stats = cache.stats()
+    assert (stats["hits"], stats["revalidated"], stats["misses"]) == (1, 1, 1)
+    # The database is never used from the thread running the event loop
+    assert threading.main_thread() not in cache.threads
@@ -1,8 +1,25 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import asyncio
+import json
+import socket
+from unittest.mock import patch
+
+import httpx
 import pytest
-from src.crawler import Crawler
+from src.crawler import Article, Crawler
+from src.crawler.http_client import (
+    BlockedURLError,
+    arequest_public_url,
+    check_public_url,
+    close_http_clients,
+    get_async_http_client,
+    request_public_url,
+)
+from src.crawler.jina_client import JinaClient
+from src.crawler.readability_extractor import ReadabilityExtractor
+from src.tools import crawl_tool, get_crawl_many_tool
 
 
 def test_crawler_initialization():
@@ -28,3 +45,277 @@ def test_crawler_markdown_output():
     markdown = result.to_markdown()
     assert isinstance(markdown, str)
     assert len(markdown) > 0
+
+
+def _mock_transport(statuses):
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        status = statuses.pop(0) if statuses else 200
+        return httpx.Response(status, text=f"<html>{status}</html>")
+
+    return httpx.MockTransport(handler), requests
+
+
+@pytest.fixture
+def no_backoff():
+    with patch("src.crawler.http_client.RETRY_BACKOFF_SECONDS", 0):
+        yield
+
+
+def test_requests_are_retried_on_retryable_statuses(no_backoff):
+    transport, requests = _mock_transport([503, 429])
+    client = httpx.Client(transport=transport)
+    with patch("src.crawler.http_client.get_http_client", return_value=client):
+        assert JinaClient().crawl("https://example.com") == "<html>200</html>"
+    assert len(requests) == 3
+    assert json.loads(requests[0].content) == {"url": "https://example.com"}
+
+
+def test_async_requests_give_up_after_the_retries(no_backoff):
+    async def run():
+        transport, requests = _mock_transport([503, 503, 503, 503])
+        client = httpx.AsyncClient(transport=transport)
+        with patch(
+            "src.crawler.http_client.get_async_http_client", return_value=client
+        ):
+            with pytest.raises(httpx.HTTPStatusError):
+                await JinaClient().acrawl("https://example.com")
+        return requests
+
+    assert len(asyncio.run(run())) == 3
+
+
+def test_async_clients_are_shared_per_event_loop():
+    async def get_client():
+        client = get_async_http_client()
+        assert get_async_http_client() is client
+        await close_http_clients()
+        return client
+
+    assert asyncio.run(get_client()) is not asyncio.run(get_client())
+
+
+@pytest.fixture
+def jina_only(monkeypatch):
+    monkeypatch.setenv("CRAWLER_STRATEGIES", "jina")
+
+
+def test_crawl_tool_crawls_asynchronously(jina_only, caplog):
+    async def acrawl(self, url, return_format="html"):
+        return "<html></html>"
+
+    article = Article(title="Title", html_content="<p>Content</p>")
+    with (
+        patch.object(JinaClient, "acrawl", acrawl),
+        patch.object(ReadabilityExtractor, "extract_article", return_value=article),
+    ):
+        with caplog.at_level("INFO", logger="src.tools.decorators"):
+            result = asyncio.run(crawl_tool.ainvoke({"url": "https://example.com"}))
+    assert result == {
+        "url": "https://example.com",
+        "crawled_content": "# Title\n\nContent",
+    }
+    assert "Tool crawl_tool called with parameters: url=https://example.com" in (
+        caplog.text
+    )
+
+
+def test_crawl_many_tool_crawls_concurrently_in_order(jina_only):
+    running = []
+    peak = []
+
+    async def acrawl(self, url, return_format="html"):
+        running.append(url)
+        peak.append(len(running))
+        await asyncio.sleep(0.01)
+        running.remove(url)
+        if url.endswith("fail"):
+            raise httpx.ConnectError("unreachable")
+        return "<html></html>"
+
+    urls = [f"https://example.com/{i}" for i in range(4)] + ["https://example.com/fail"]
+    article = Article(title="Title", html_content="<p>Content</p>")
+    with (
+        patch.object(JinaClient, "acrawl", acrawl),
+        patch.object(ReadabilityExtractor, "extract_article", return_value=article),
+    ):
+        results = asyncio.run(get_crawl_many_tool(2).ainvoke({"urls": urls}))
+    assert max(peak) == 2
+    assert [result["url"] for result in results] == urls
+    assert all(
+        result["crawled_content"] == "# Title\n\nContent" for result in results[:4]
+    )
+    assert "ConnectError" in results[4]["error"]
+
+
+# Addresses the hosts of the tests resolve to, instead of asking the DNS
+ADDRESSES = {
+    "example.com": "93.184.215.14",
+    "intranet.example.com": "10.0.0.5",
+    "metadata.example.com": "169.254.169.254",
+    "localhost": "::1",
+}
+
+
+def fake_getaddrinfo(host, port, *args, **kwargs):
+    address = ADDRESSES.get(host, host)
+    family = socket.AF_INET6 if ":" in address else socket.AF_INET
+    return [(family, socket.SOCK_STREAM, 6, "", (address, port or 0))]
+
+
+def crawl_with_origin(handler, url="https://example.com"):
+    """Crawl a url whose origin responds with a handler, and Jina with a page."""
+    jina_crawls = []
+
+    async def acrawl(self, url, return_format="html"):
+        jina_crawls.append(url)
+        return "<html><p>From Jina</p></html>"
+
+    def extract_article(self, html):
+        return Article(title="Title", html_content=html.removeprefix("<html>"))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    with (
+        patch("socket.getaddrinfo", fake_getaddrinfo),
+        patch("src.crawler.http_client.get_async_http_client", return_value=client),
+        patch.object(JinaClient, "acrawl", acrawl),
+        patch.object(ReadabilityExtractor, "extract_article", extract_article),
+    ):
+        return asyncio.run(Crawler().acrawl(url)), jina_crawls
+
+
+def test_static_pages_are_fetched_directly():
+    article, jina_crawls = crawl_with_origin(
+        lambda request: httpx.Response(200, html="<html><p>From origin</p></html>")
+    )
+    assert article.strategy == "direct"
+    assert article.to_markdown() == "# Title\n\nFrom origin"
+    assert jina_crawls == []
+
+
+@pytest.mark.parametrize(
+    "response",
+    [
+        httpx.Response(403, html="<html>Forbidden</html>"),
+        httpx.Response(200, html='<html><div id="root"></div></html>'),
+        httpx.Response(
+            200, content=b"%PDF", headers={"content-type": "application/pdf"}
+        ),
+    ],
+)
+def test_failed_or_rendered_pages_fall_back_to_jina(response, no_backoff):
+    article, jina_crawls = crawl_with_origin(lambda request: response)
+    assert article.strategy == "jina"
+    assert article.to_markdown() == "# Title\n\nFrom Jina"
+    assert jina_crawls == ["https://example.com"]
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "http://127.0.0.1:8000/admin",
+        "http://[::ffff:127.0.0.1]/",
+        "http://intranet.example.com/wiki",
+        "http://metadata.example.com/latest/meta-data/",
+        "http://localhost/",
+        "http://0.0.0.0/",
+        "http://224.0.0.1/",
+        "file:///etc/passwd",
+    ],
+)
+def test_urls_outside_the_internet_are_blocked(url):
+    with patch("socket.getaddrinfo", fake_getaddrinfo):
+        with pytest.raises(BlockedURLError):
+            check_public_url(url)
+        check_public_url("https://example.com/article")
+
+
+def rebinding_getaddrinfo(*addresses):
+    """Resolve hosts to the given addresses in turn, like a rebinding DNS server."""
+    addresses = list(addresses)
+
+    def getaddrinfo(host, port, *args, **kwargs):
+        return fake_getaddrinfo(addresses.pop(0), port)
+
+    return getaddrinfo
+
+
+def test_hosts_resolving_again_to_another_address_are_blocked():
+    connections = []
+
+    def create_connection(address, *args, **kwargs):
+        connections.append(address)
+        raise OSError("unreachable")
+
+    async def arequest():
+        try:
+            return await arequest_public_url("GET", "http://rebind.example.com/")
+        finally:
+            await close_http_clients()
+
+    getaddrinfo = rebinding_getaddrinfo("93.184.215.14", "127.0.0.1")
+    with (
+        patch("socket.getaddrinfo", getaddrinfo),
+        patch("socket.create_connection", create_connection),
+    ):
+        with pytest.raises(BlockedURLError):
+            request_public_url("GET", "http://rebind.example.com/")
+    getaddrinfo = rebinding_getaddrinfo("93.184.215.14", "127.0.0.1")
+    with patch("socket.getaddrinfo", getaddrinfo):
+        with pytest.raises(BlockedURLError):
+            asyncio.run(arequest())
+    assert connections == []
+
+
+def test_hosts_are_connected_to_at_the_checked_address(no_backoff):
+    connections = []
+
+    def create_connection(address, *args, **kwargs):
+        connections.append(address)
+        raise OSError("unreachable")
+
+    with (
+        patch("socket.getaddrinfo", fake_getaddrinfo),
+        patch("socket.create_connection", create_connection),
+    ):
+        with pytest.raises(httpx.ConnectError):
+            request_public_url("GET", "http://example.com/")
+    asyncio.run(close_http_clients())
+    assert connections and set(connections) == {("93.184.215.14", 80)}
+
+
+def test_urls_outside_the_internet_are_left_to_jina():
+    requests = []
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(200, html="<html><p>From origin</p></html>")
+
+    article, jina_crawls = crawl_with_origin(handler, "http://intranet.example.com")
+    assert article.strategy == "jina"
+    assert jina_crawls == ["http://intranet.example.com"]
+    assert requests == []
+
+
+def test_every_redirect_is_checked():
+    def handler(request):
+        if request.url.host == "example.com":
+            return httpx.Response(
+                302, headers={"location": "http://metadata.example.com/latest/"}
+            )
+        return httpx.Response(200, html="<html><p>Secret</p></html>")
+
+    article, jina_crawls = crawl_with_origin(handler)
+    assert article.strategy == "jina"
+    assert article.to_markdown() == "# Title\n\nFrom Jina"
+
+    def public_redirect(request):
+        if request.url.path == "/":
+            return httpx.Response(301, headers={"location": "/article"})
+        return httpx.Response(200, html="<html><p>From origin</p></html>")
+
+    article, jina_crawls = crawl_with_origin(public_redirect)
+    assert article.strategy == "direct"
+    assert article.to_markdown() == "# Title\n\nFrom origin"
@@ -0,0 +1,47 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from unittest.mock import patch
+
+from src.crawler.readability_extractor import ExtractionEngine, ReadabilityExtractor
+from tests.extraction_benchmark import DEFAULT_FIXTURES_DIR, compare_extractors
+
+
+def test_engine_is_selected_by_the_environment(monkeypatch):
+    assert ReadabilityExtractor().engine is ExtractionEngine.READABILIPY
+    monkeypatch.setenv("CRAWLER_EXTRACTION_ENGINE", "lxml")
+    extractor = ReadabilityExtractor()
+    assert extractor.engine is ExtractionEngine.LXML
+
+    article = extractor.extract_article("")
+    assert (article.title, article.html_content) == (None, "")
+
+
+def test_lxml_engine_extracts_the_content_of_saved_pages():
+    report = compare_extractors(engines=[ExtractionEngine.LXML], repeat=1)
+    assert len(report["pages"]) >= 3
+    for page in report["pages"]:
+        assert page["engines"]["lxml"]["f1"] > 0.9, page["page"]
+
+    html = (DEFAULT_FIXTURES_DIR / "blog_post.html").read_text(encoding="utf-8")
+    article = ReadabilityExtractor("lxml").extract_article(html)
+    markdown = article.to_markdown()
+    assert article.title == "Why Connection Pooling Matters for Crawlers"
+    assert "![Latency with and without pooling](/images/pooling.png)" in markdown
+    for boilerplate in ["Subscribe", "Related posts", "Great write-up", "Copyright"]:
+        assert boilerplate not in markdown
+
+
+def test_lxml_engine_extracts_pages_with_an_xml_declaration():
+    html = (DEFAULT_FIXTURES_DIR / "xhtml_page.html").read_text(encoding="utf-8")
+    assert html.startswith('<?xml version="1.0" encoding="utf-8"?>')
+    article = ReadabilityExtractor("lxml").extract_article(html)
+    assert article.title == "Revalidating Cached Pages with ETags"
+    assert "answered with a 304 status" in article.to_markdown()
+
+
+def test_comparison_skips_readabilipy_without_node():
+    with patch("tests.extraction_benchmark.shutil.which", return_value=None):
+        report = compare_extractors(repeat=1)
+    assert report["unavailable"] == {"readabilipy": "node is not installed"}
+    assert all(list(page["engines"]) == ["lxml"] for page in report["pages"])
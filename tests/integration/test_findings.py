@@ -0,0 +1,112 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from typing import TypedDict
+from unittest.mock import patch
+
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+from langgraph.graph import END, START, StateGraph
+
+from src.graph.findings import (
+    FindingsPolicy,
+    build_findings_context,
+    get_findings_policy,
+    summarize_finding,
+)
+from src.prompts.planner_model import Step
+
+
+def _make_steps(*findings):
+    return [
+        Step(
+            need_web_search=True,
+            title=f"Step {i}",
+            description=f"Description {i}",
+            step_type="research",
+            execution_res=finding,
+        )
+        for i, finding in enumerate(findings)
+    ]
+
+
+def test_findings_within_budget_are_kept_whole():
+    """Findings that fit the budget are included unchanged"""
+    context = build_findings_context(
+        _make_steps("short finding", "another finding"),
+        FindingsPolicy.TRUNCATE,
+        1000,
+    )
+    assert "<finding>\nshort finding\n</finding>" in context
+    assert "<finding>\nanother finding\n</finding>" in context
+
+
+def test_truncate_policy_shares_budget_fairly():
+    """Short findings are kept whole and long ones share the rest of the budget"""
+    steps = _make_steps("a" * 100, "b" * 5000, "c" * 5000)
+    context = build_findings_context(steps, FindingsPolicy.TRUNCATE, 2100)
+    assert "a" * 100 in context
+    assert context.count("b") <= 1000
+    assert context.count("c") <= 1000
+    assert context.count("[... truncated ...]") == 2
+
+
+def test_recent_policy_drops_older_findings():
+    """The most recent findings are kept whole and older ones are omitted"""
+    steps = _make_steps("a" * 800, "b" * 800, "c" * 800)
+    context = build_findings_context(steps, FindingsPolicy.RECENT, 2000)
+    assert "a" * 800 not in context
+    assert "b" * 800 in context
+    assert "c" * 800 in context
+    assert "(1 earlier findings omitted" in context
+
+
+def test_summary_policy_prefers_cached_summaries():
+    """Summaries cached on the steps replace the full findings"""
+    steps = _make_steps("a" * 5000)
+    steps[0].execution_summary = "summary of a"
+    context = build_findings_context(steps, FindingsPolicy.SUMMARY, 1000)
+    assert "<finding>\nsummary of a\n</finding>" in context
+
+
+def test_full_policy_ignores_budget():
+    """The full policy keeps the previous unbounded behavior"""
+    context = build_findings_context(_make_steps("a" * 5000), FindingsPolicy.FULL, 1000)
+    assert "a" * 5000 in context
+
+
+def test_unknown_policy_falls_back_to_truncate():
+    assert get_findings_policy("unknown") == FindingsPolicy.TRUNCATE
+    assert get_findings_policy("recent") == FindingsPolicy.RECENT
+
+
+def test_summaries_are_kept_out_of_the_messages_stream():
+    """The summary of a finding is not streamed as the output of the agent"""
+
+    class SummaryState(TypedDict):
+        summary: str
+
+    async def summarize(state):
+        step = _make_steps("a long finding")[0]
+        return {"summary": await summarize_finding(step, step.execution_res)}
+
+    builder = StateGraph(SummaryState)
+    builder.add_node("researcher", summarize)
+    builder.add_edge(START, "researcher")
+    builder.add_edge("researcher", END)
+    graph = builder.compile()
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="short summary")]))
+
+    async def run():
+        return [
+            event
+            async for event in graph.astream(
+                {"summary": ""}, stream_mode=["messages", "values"]
+            )
+        ]
+
+    with patch("src.graph.findings.get_llm_by_type", return_value=llm):
+        events = asyncio.run(run())
+    assert [mode for mode, _ in events if mode == "messages"] == []
+    assert events[-1] == ("values", {"summary": "short summary"})
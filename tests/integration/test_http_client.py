@@ -0,0 +1,92 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import patch
+
+import httpx
+
+from src.llms import llm
+from src.llms.http_client import get_host_key
+from src.utils.http_client import HTTPClientRegistry
+
+
+def test_host_key_is_the_origin():
+    assert get_host_key("https://API.example.com/v1") == "https://api.example.com"
+    assert get_host_key("http://localhost:8000/v1/") == "http://localhost:8000"
+    assert get_host_key(None) == "https://api.openai.com"
+
+
+def test_clients_are_shared_per_key():
+    registry = HTTPClientRegistry(timeout=5)
+    client = registry.get_client("https://api.example.com")
+    assert registry.get_client("https://api.example.com") is client
+    assert registry.get_client("https://other.example.com") is not client
+    assert client.timeout == httpx.Timeout(5)
+    async_client = registry.get_async_client("https://api.example.com")
+    assert registry.get_async_client("https://api.example.com") is async_client
+
+    async def close():
+        loop_client = registry.get_loop_client("https://api.example.com")
+        await registry.close_all()
+        return loop_client
+
+    loop_client = asyncio.run(close())
+    assert client.is_closed and loop_client.is_closed
+    assert loop_client.timeout == httpx.Timeout(5)
+    assert registry.get_client("https://api.example.com") is not client
+
+
+def test_async_clients_send_with_the_client_of_the_running_loop():
+    registry = HTTPClientRegistry()
+    async_client = registry.get_async_client("https://api.example.com")
+    sent_by = []
+
+    async def send(self, request, **kwargs):
+        sent_by.append((self, asyncio.get_running_loop()))
+        return httpx.Response(200, request=request)
+
+    async def request():
+        response = await async_client.get("https://api.example.com/v1/models")
+        await async_client.get("https://api.example.com/v1/models")
+        assert response.status_code == 200
+
+    with patch.object(httpx.AsyncClient, "send", send):
+        asyncio.run(request())
+        asyncio.run(request())
+
+    clients = [client for client, _ in sent_by]
+    assert clients[0] is clients[1] and clients[2] is clients[3]
+    assert clients[0] is not clients[2]
+    assert async_client not in clients
+    assert sent_by[0][1] is not sent_by[2][1]
+
+
+def test_models_of_the_same_host_share_clients():
+    registry = HTTPClientRegistry()
+    conf = {
+        "BASIC_MODEL": {
+            "base_url": "https://api.example.com/v1",
+            "model": "a",
+            "api_key": "test",
+        },
+        "REASONING_MODEL": {
+            "base_url": "https://api.example.com/v1",
+            "model": "b",
+            "api_key": "test",
+        },
+        "VISION_MODEL": {
+            "base_url": "https://other.example.com/v1",
+            "model": "c",
+            "api_key": "test",
+        },
+    }
+    with patch.object(llm, "get_http_client_registry", return_value=registry):
+        basic, reasoning, vision = (
+            llm._create_llm_use_conf(llm_type, conf)
+            for llm_type in ("basic", "reasoning", "vision")
+        )
+    assert basic.http_client is reasoning.http_client
+    assert basic.http_async_client is reasoning.http_async_client
+    assert basic.http_client is not vision.http_client
+    asyncio.run(registry.close_all())
@@ -0,0 +1,146 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import time
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    HumanMessage,
+    convert_to_messages,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.tools import tool
+from langchain_openai import ChatOpenAI
+
+from src.config.configuration import Configuration
+from src.llms.cache import LLMResponseCache, get_cache_key
+from src.llms.llm import CachedChatOpenAI
+from src.prompts.template import apply_prompt_template
+
+
+@tool
+def lookup(query: str) -> str:
+    """Look something up."""
+    return query
+
+
+class FakeCompletions:
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        message = AIMessage(
+            content=f"answer {self.calls}",
+            tool_calls=[{"name": "lookup", "args": {"query": "q"}, "id": "call_1"}],
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        for token in ["answer ", str(self.calls)]:
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+    async def agenerate(self, *args, **kwargs):
+        return self.generate(*args, **kwargs)
+
+    async def astream(self, *args, **kwargs):
+        for chunk in self.stream(*args, **kwargs):
+            yield chunk
+
+
+@pytest.fixture
+def completions():
+    fake = FakeCompletions()
+    with (
+        patch.object(ChatOpenAI, "_generate", fake.generate),
+        patch.object(ChatOpenAI, "_stream", fake.stream),
+        patch.object(ChatOpenAI, "_agenerate", fake.agenerate),
+        patch.object(ChatOpenAI, "_astream", fake.astream),
+    ):
+        yield fake
+
+
+@pytest.fixture
+def cache(tmp_path):
+    cache = LLMResponseCache(str(tmp_path / "llm_cache.db"))
+    yield cache
+    cache.close()
+
+
+def _llm(cache, model="gpt-4o"):
+    return CachedChatOpenAI(response_cache=cache, model=model, api_key="test")
+
+
+def test_responses_are_cached_per_model_and_messages(cache, completions):
+    llm = _llm(cache)
+    first = llm.invoke([HumanMessage("hello")])
+    assert first.content == "answer 1"
+    # Message ids are not part of the key
+    again = llm.invoke([HumanMessage("hello", id="another-id")])
+    assert again.content == "answer 1"
+    assert again.tool_calls == first.tool_calls
+    assert again.id != first.id
+    assert llm.invoke("goodbye").content == "answer 2"
+    assert _llm(cache, model="gpt-4o-mini").invoke("hello").content == "answer 3"
+    assert llm.bind_tools([lookup]).invoke("hello").content == "answer 4"
+    assert completions.calls == 4
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 4
+
+
+def test_streamed_responses_are_replayed_as_chunks(cache, completions):
+    llm = _llm(cache)
+
+    async def astream():
+        return [chunk.content async for chunk in llm.astream("hello")]
+
+    assert [chunk.content for chunk in llm.stream("hello")] == ["answer ", "1"]
+    assert asyncio.run(astream()) == ["answer ", "1"]
+    assert asyncio.run(llm.ainvoke("hello")).content == "answer 1"
+    assert completions.calls == 1
+    assert cache.stats()["hit_rate"] == 2 / 3
+
+
+def test_entries_expire_and_are_evicted(cache):
+    cache.max_entries = 2
+    for key in ("a", "b", "c"):
+        cache.update(key, [{"key": key}])
+        time.sleep(0.01)
+    assert cache.lookup("a") is None
+    assert cache.lookup("b") == [{"key": "b"}]
+    cache.update("d", [{"key": "d"}])
+    # "b" was used more recently than "c"
+    assert cache.lookup("c") is None
+    assert cache.lookup("b") is not None
+
+    cache.max_bytes = cache.stats()["bytes"]
+    cache.update("e", [{"key": "e"}])
+    assert cache.stats()["entries"] == 2
+
+    cache.ttl_seconds = 1
+    with patch("src.llms.cache.time.time", return_value=time.time() + 2):
+        assert cache.lookup("e") is None
+
+
+@pytest.mark.parametrize("prompt_layout", ["default", "prefix_cache"])
+def test_prompts_rendered_at_another_time_of_day_share_responses(prompt_layout):
+    configurable = Configuration(prompt_layout=prompt_layout)
+    state = {"messages": [HumanMessage("hello")], "locale": "en-US"}
+    keys = []
+    for hour in (9, 17):
+        now = datetime(2025, 5, 1, hour, 30, 15).timestamp()
+        with patch("src.prompts.template.time.time", return_value=now):
+            messages = apply_prompt_template("coordinator", state, configurable)
+        keys.append(get_cache_key("llm", convert_to_messages(messages)))
+    assert keys[0] == keys[1]
+
+    now = datetime(2025, 5, 2, 9, 30, 15).timestamp()
+    with patch("src.prompts.template.time.time", return_value=now):
+        messages = apply_prompt_template("coordinator", state, configurable)
+    assert get_cache_key("llm", convert_to_messages(messages)) != keys[0]
@@ -0,0 +1,134 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.messages import AIMessage
+from langchain_core.outputs import ChatGeneration, ChatResult
+from langchain_openai import ChatOpenAI
+
+from src.llms.governor import ConcurrencyGovernor, get_tenant
+from src.llms.hedging import HedgingPolicy
+from src.llms.llm import CachedChatOpenAI
+
+
+def test_tenant_comes_from_the_run_metadata():
+    assert get_tenant({"thread_id": "t1"}) == "t1"
+    assert get_tenant({"thread_id": "t1", "tenant_id": "acme"}) == "acme"
+    assert get_tenant(None) == "default"
+
+
+def test_freed_slots_go_to_tenants_in_turn():
+    async def run():
+        governor = ConcurrencyGovernor(max_in_flight=1)
+        order = []
+
+        async def call(tenant, name):
+            async with governor.slot(tenant):
+                order.append(name)
+                await asyncio.sleep(0.01)
+
+        await governor.acquire("a")
+        tasks = []
+        for tenant, name in [("a", "a2"), ("a", "a3"), ("a", "a4"), ("b", "b1")]:
+            tasks.append(asyncio.create_task(call(tenant, name)))
+            await asyncio.sleep(0)
+        assert governor.stats()["queued"] == 4
+        governor.release()
+        await asyncio.gather(*tasks)
+        assert order == ["a2", "b1", "a3", "a4"]
+        stats = governor.stats()
+        assert stats["in_flight"] == 0
+        assert stats["calls"] == 5 and stats["queued_calls"] == 4
+        assert stats["wait_seconds_max"] > 0
+
+    asyncio.run(run())
+
+
+def test_cancelled_calls_leave_the_queue():
+    async def run():
+        governor = ConcurrencyGovernor(max_in_flight=1)
+        await governor.acquire("a")
+        task = asyncio.create_task(governor.acquire("b"))
+        await asyncio.sleep(0)
+        task.cancel()
+        await asyncio.sleep(0)
+        assert governor.stats()["queued"] == 0
+        governor.release()
+        assert governor.stats()["in_flight"] == 0
+        assert await governor.acquire("c") == 0
+
+    asyncio.run(run())
+
+
+def test_model_calls_are_limited():
+    in_flight = max_in_flight = 0
+
+    async def agenerate(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        await asyncio.sleep(0.01)
+        in_flight -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("hi"))])
+
+    governor = ConcurrencyGovernor(max_in_flight=2)
+    model = CachedChatOpenAI(governor=governor, model="gpt-4o", api_key="test")
+
+    async def run():
+        await asyncio.gather(
+            *(
+                model.ainvoke("hello", {"configurable": {"thread_id": f"t{i % 3}"}})
+                for i in range(6)
+            )
+        )
+
+    with patch.object(ChatOpenAI, "_agenerate", agenerate):
+        asyncio.run(run())
+    assert max_in_flight == 2
+    assert governor.stats()["calls"] == 6
+    assert governor.stats()["queued_calls"] == 4
+
+
+def test_sync_calls_cannot_wait_in_a_thread_running_a_loop():
+    governor = ConcurrencyGovernor(max_in_flight=1)
+
+    async def run():
+        with pytest.raises(RuntimeError):
+            governor.acquire_sync()
+        # Worker threads of the loop can still wait for a slot
+        assert await asyncio.to_thread(governor.acquire_sync) == 0
+
+    asyncio.run(run())
+    assert governor.stats()["in_flight"] == 1
+
+
+def test_hedged_duplicates_wait_for_a_slot_of_their_own():
+    in_flight = max_in_flight = 0
+    delays = [0.3, 0.01]
+
+    async def agenerate(*args, **kwargs):
+        nonlocal in_flight, max_in_flight
+        in_flight += 1
+        max_in_flight = max(max_in_flight, in_flight)
+        try:
+            await asyncio.sleep(delays.pop(0))
+        finally:
+            in_flight -= 1
+        return ChatResult(generations=[ChatGeneration(message=AIMessage("hi"))])
+
+    governor = ConcurrencyGovernor(max_in_flight=2)
+    model = CachedChatOpenAI(
+        governor=governor,
+        hedging=HedgingPolicy(min_delay_seconds=0.05, min_samples=0),
+        model="gpt-4o",
+        api_key="test",
+    )
+
+    with patch.object(ChatOpenAI, "_agenerate", agenerate):
+        assert asyncio.run(model.ainvoke("hello")).content == "hi"
+    assert max_in_flight == 2
+    assert governor.stats()["calls"] == 2
+    assert governor.stats()["in_flight"] == 0
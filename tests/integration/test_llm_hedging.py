@@ -0,0 +1,119 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+from unittest.mock import patch
+
+import pytest
+from langchain_core.callbacks import AsyncCallbackHandler
+from langchain_core.messages import AIMessageChunk
+from langchain_core.outputs import ChatGenerationChunk
+from langchain_openai import ChatOpenAI
+
+from src.llms.hedging import HedgingPolicy
+from src.llms.llm import CachedChatOpenAI
+
+
+def test_deadline_follows_the_latency_percentile():
+    policy = HedgingPolicy(percentile=0.9, min_delay_seconds=0.05, min_samples=10)
+    for latency in range(1, 10):
+        policy.record("stream", latency / 10)
+    assert policy.get_delay("stream") is None
+    policy.record("stream", 1.0)
+    assert policy.get_delay("stream") == pytest.approx(1.0)
+    assert policy.get_delay("generate") is None
+
+    policy = HedgingPolicy(min_delay_seconds=0.5, min_samples=1)
+    policy.record("stream", 0.1)
+    assert policy.get_delay("stream") == 0.5
+    assert HedgingPolicy(min_delay_seconds=0.5, min_samples=0).get_delay("x") == 0.5
+
+
+def test_duplicates_are_capped_by_the_budget():
+    policy = HedgingPolicy(max_ratio=0.5, burst=1)
+    assert policy.try_hedge()
+    assert not policy.try_hedge()
+    policy.start_request()
+    assert not policy.try_hedge()
+    policy.start_request()
+    assert policy.try_hedge()
+
+
+def test_slow_requests_are_hedged_and_the_loser_cancelled():
+    policy = HedgingPolicy(min_delay_seconds=0.05, min_samples=0)
+    delays = [1.0, 0.01]
+    cancelled = []
+
+    async def attempt():
+        delay = delays.pop(0)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            cancelled.append(delay)
+            raise
+        return delay
+
+    async def run():
+        result = await policy.run("generate", attempt)
+        await asyncio.sleep(0)
+        return result
+
+    assert asyncio.run(run()) == 0.01
+    assert cancelled == [1.0]
+    assert policy.stats()["hedges"] == policy.stats()["hedge_wins"] == 1
+    # The hedge delay is not part of the latency of the winning attempt
+    assert policy._latencies["generate"][-1] < 0.05
+
+    # An error fails the request only once the other attempt failed too
+    delays = [0.1, 0.01]
+
+    async def failing_attempt():
+        delay = delays.pop(0)
+        await asyncio.sleep(delay)
+        if delay < 0.1:
+            raise ValueError("failed")
+        return delay
+
+    assert asyncio.run(policy.run("generate", failing_attempt)) == 0.1
+
+
+class TokenCounter(AsyncCallbackHandler):
+    def __init__(self):
+        self.tokens = []
+
+    async def on_llm_new_token(self, token, **kwargs):
+        self.tokens.append(token)
+
+
+def test_streams_are_hedged_until_their_first_chunk():
+    calls = []
+    closed = []
+
+    async def astream(self, messages, stop=None, run_manager=None, **kwargs):
+        call = len(calls)
+        calls.append(run_manager)
+        try:
+            if call == 0:
+                await asyncio.sleep(1)
+            for token in ["from ", str(call)]:
+                yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+        finally:
+            closed.append(call)
+
+    policy = HedgingPolicy(min_delay_seconds=0.05, min_samples=0)
+    model = CachedChatOpenAI(hedging=policy, model="gpt-4o", api_key="test")
+    counter = TokenCounter()
+
+    async def run():
+        chunks = [
+            chunk.content
+            async for chunk in model.astream("hello", {"callbacks": [counter]})
+        ]
+        await asyncio.sleep(0.01)
+        return chunks
+
+    with patch.object(ChatOpenAI, "_astream", astream):
+        assert asyncio.run(run()) == ["from ", "1"]
+    assert calls == [None, None]
+    assert counter.tokens == ["from ", "1"]
+    assert sorted(closed) == [0, 1]
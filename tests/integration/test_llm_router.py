@@ -0,0 +1,134 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+
+import httpx
+import openai
+import pytest
+from langchain_core.messages import AIMessage, AIMessageChunk
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+from src.llms import llm
+from src.llms.router import Endpoint, EndpointRouter, RoutingStrategy
+
+
+def _rate_limit_error(retry_after: str = None) -> openai.RateLimitError:
+    response = httpx.Response(
+        429,
+        request=httpx.Request("POST", "https://replica.example.com"),
+        headers={"retry-after": retry_after} if retry_after else {},
+    )
+    return openai.RateLimitError("rate limited", response=response, body=None)
+
+
+class FakeEndpointLLM:
+    def __init__(self, name, errors=()):
+        self.openai_api_base = name
+        self.errors = list(errors)
+        self.calls = 0
+
+    def _generate(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        if self.errors and (error := self.errors.pop(0)):
+            raise error
+        message = AIMessage(content=self.openai_api_base)
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(self, *args, **kwargs):
+        return self._generate(*args, **kwargs)
+
+    def _stream(self, messages, stop=None, run_manager=None, **kwargs):
+        self.calls += 1
+        for token in ["from ", self.openai_api_base]:
+            if self.errors and (error := self.errors.pop(0)):
+                raise error
+            yield ChatGenerationChunk(message=AIMessageChunk(content=token))
+
+
+def _routed(*endpoint_llms, **router_kwargs):
+    router = EndpointRouter([Endpoint(e) for e in endpoint_llms], **router_kwargs)
+    return llm.RoutedChatOpenAI(router=router, api_key="test")
+
+
+def test_least_outstanding_endpoint_is_picked_by_weight():
+    first, second = Endpoint(FakeEndpointLLM("a"), 2), Endpoint(FakeEndpointLLM("b"))
+    router = EndpointRouter([first, second])
+    first.outstanding = 2
+    # The next request would be the 3rd on a weight of 2, against the 1st on 1
+    assert router.select() is second
+    with router.track(second):
+        assert router.select() is first
+
+    router = EndpointRouter([first, second], RoutingStrategy.LATENCY)
+    first.latency_ewma, second.latency_ewma = 1.0, 3.0
+    assert router.select() is first
+    router.record_success(first, 11.0)
+    assert first.latency_ewma == pytest.approx(4.0)
+    assert router.select() is second
+
+
+def test_requests_fail_over_and_avoid_failing_endpoints():
+    first = FakeEndpointLLM("a", errors=[_rate_limit_error("30")])
+    second = FakeEndpointLLM("b")
+    model = _routed(first, second)
+    assert model.invoke("hello").content == "b"
+    assert [e["healthy"] for e in model._router.stats()] == [False, True]
+    assert (
+        model._router.endpoints[0].failing_until
+        > model._router.endpoints[1].failing_until + 29
+    )
+    assert asyncio.run(model.ainvoke("hello")).content == "b"
+    assert first.calls == 1 and second.calls == 2
+
+
+def test_only_endpoint_errors_fail_over():
+    first = FakeEndpointLLM("a", errors=[ValueError("invalid request")])
+    second = FakeEndpointLLM("b")
+    with pytest.raises(ValueError):
+        _routed(first, second).invoke("hello")
+    assert second.calls == 0
+
+    first = FakeEndpointLLM("a", errors=[_rate_limit_error()])
+    second = FakeEndpointLLM("b", errors=[_rate_limit_error()])
+    with pytest.raises(openai.RateLimitError):
+        _routed(first, second).invoke("hello")
+    assert first.calls == second.calls == 1
+
+
+def test_streams_fail_over_until_their_first_chunk():
+    first = FakeEndpointLLM("a", errors=[_rate_limit_error()])
+    second = FakeEndpointLLM("b")
+    model = _routed(first, second)
+    assert "".join(chunk.content for chunk in model.stream("hello")) == "from b"
+
+    model._router.endpoints[0].failing_until = 0
+    first.errors = [openai.APIConnectionError(request=httpx.Request("POST", "a"))]
+    second.errors = [None, _rate_limit_error()]
+    chunks = []
+    with pytest.raises(openai.RateLimitError):
+        for chunk in model.stream("hello"):
+            chunks.append(chunk.content)
+    assert chunks == ["from "]
+
+
+def test_endpoints_are_created_from_the_model_conf():
+    conf = {
+        "BASIC_MODEL": {
+            "model": "a",
+            "api_key": "test",
+            "routing": "latency",
+            "endpoints": [
+                {"base_url": "https://replica-1.example.com/v1", "weight": 2},
+                {"base_url": "https://replica-2.example.com/v1", "max_retries": 1},
+            ],
+        }
+    }
+    model = llm._create_llm_use_conf("basic", conf)
+    router = model._router
+    assert router.strategy == RoutingStrategy.LATENCY
+    assert [e.weight for e in router.endpoints] == [2.0, 1.0]
+    assert [e.llm.max_retries for e in router.endpoints] == [0, 1]
+    assert router.endpoints[0].llm.model_name == "a"
+    assert router.endpoints[0].llm.model_kwargs == {}
+    assert model.openai_api_base is None
@@ -0,0 +1,34 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import pytest
+
+from src.utils.lru_table import LRUTable
+
+
+def test_least_recently_used_rows_are_evicted_over_the_limits(tmp_path):
+    table = LRUTable(str(tmp_path / "cache.db"), "items", ("tag",))
+    for i, key in enumerate("abcd"):
+        table.put(key, "xx", float(i), tag=key.upper())
+    table.set("a", accessed_at=10.0)
+    table.evict(max_entries=3)
+    assert table.get("b", "value") is None
+    assert table.get("a", "value, tag") == ("xx", "A")
+    table.put("e", "xxxxxx", 11.0)
+    table.evict(max_bytes=8)
+    assert table.size() == (2, 8)
+    assert table.get("a", "value") and table.get("e", "value")
+    table.close()
+
+
+def test_nested_transactions_commit_or_roll_back_together(tmp_path):
+    table = LRUTable(str(tmp_path / "cache.db"), "items")
+    table.put("a", "x", 0.0)
+    with pytest.raises(RuntimeError):
+        with table.transaction():
+            table.delete_created_before(1.0)
+            table.put("b", "x", 2.0)
+            raise RuntimeError()
+    assert table.get("a", "value") == ("x",)
+    assert table.get("b", "value") is None
+    table.close()
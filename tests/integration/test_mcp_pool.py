@@ -0,0 +1,137 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import asyncio
+import sys
+
+import pytest
+
+from src.tools.mcp_pool import MCPSessionPool, MCPToolCache, get_server_key
+
+SERVER_SCRIPT = """
+import os
+from mcp.server.fastmcp import FastMCP
+
+mcp = FastMCP("pid")
+
+
+@mcp.tool()
+def pid() -> str:
+    \"\"\"Get the process id of the server.\"\"\"
+    return str(os.getpid())
+
+
+mcp.run()
+"""
+
+
+@pytest.fixture
+def server_config(tmp_path):
+    script = tmp_path / "server.py"
+    script.write_text(SERVER_SCRIPT)
+    return {"transport": "stdio", "command": sys.executable, "args": [str(script)]}
+
+
+async def _get_pid(pool, server_config):
+    async with pool.session(server_config) as session:
+        result = await session.call_tool("pid", {})
+        return result.content[0].text
+
+
+def test_server_key_ignores_unrelated_and_empty_settings():
+    assert get_server_key(
+        {"command": "uvx", "args": ["server"], "env": {}, "enabled_tools": ["a"]}
+    ) == get_server_key({"transport": "stdio", "command": "uvx", "args": ["server"]})
+
+
+def test_sessions_are_reused(server_config):
+    async def run():
+        pool = MCPSessionPool()
+        pids = [await _get_pid(pool, server_config) for _ in range(3)]
+        pids += await asyncio.gather(*(_get_pid(pool, server_config) for _ in range(3)))
+        assert len(pool) == 1
+        await pool.close_all()
+        assert len(pool) == 0
+        return pids
+
+    assert len(set(asyncio.run(run()))) == 1
+
+
+def test_idle_and_least_recently_used_sessions_are_closed(server_config):
+    async def run():
+        pool = MCPSessionPool(max_sessions=1, idle_timeout_seconds=0.2)
+        other_config = {**server_config, "env": {"SERVER": "other"}}
+        first_pid = await _get_pid(pool, server_config)
+        await _get_pid(pool, other_config)
+        assert len(pool) == 1
+        # The first session was evicted to stay within the limit
+        assert await _get_pid(pool, server_config) != first_pid
+        pid = await _get_pid(pool, server_config)
+        await asyncio.sleep(0.3)
+        assert await _get_pid(pool, server_config) != pid
+        await pool.close_all()
+
+    asyncio.run(run())
+
+
+def test_closed_sessions_are_replaced(server_config):
+    async def run():
+        pool = MCPSessionPool(health_check_interval_seconds=0)
+        pid = await _get_pid(pool, server_config)
+        entry = next(iter(pool._entries.values()))
+        entry.close()
+        await entry.wait_closed()
+        assert await _get_pid(pool, server_config) != pid
+        await pool.close_all()
+
+    asyncio.run(run())
+
+
+def test_tool_listings_are_cached_and_shared(server_config):
+    async def run():
+        cache = MCPToolCache(MCPSessionPool(), ttl_seconds=60)
+        loads = 0
+        load = cache._load
+
+        async def counting_load(*args):
+            nonlocal loads
+            loads += 1
+            return await load(*args)
+
+        cache._load = counting_load
+        listings = await asyncio.gather(
+            *(cache.get_tools(server_config) for _ in range(5))
+        )
+        assert loads == 1
+        assert [tool.name for tool in listings[0]] == ["pid"]
+
+        await cache.get_tools(server_config)
+        assert loads == 1
+        await cache.get_tools(server_config, refresh=True)
+        assert loads == 2
+        cache.invalidate(server_config)
+        await cache.get_tools(server_config)
+        assert loads == 3
+        cache.ttl_seconds = 0
+        await cache.get_tools(server_config)
+        assert loads == 4
+        await cache.pool.close_all()
+
+    asyncio.run(run())
+
+
+def test_idle_sessions_are_reaped_without_being_requested(server_config):
+    closed = []
+
+    async def run():
+        pool = MCPSessionPool(idle_timeout_seconds=0.1, reap_interval_seconds=0.05)
+        pool.add_close_listener(closed.append)
+        async with pool.session(server_config) as session:
+            pass
+        await asyncio.sleep(0.5)
+        assert len(pool) == 0
+        assert closed == [session]
+        await pool.close_all()
+        assert pool._reaper is None
+
+    asyncio.run(run())
@@ -1,13 +1,27 @@
+import asyncio
 import json
 import pytest
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
 
 # 在这里 mock 掉 get_llm_by_type，避免 ValueError
 with patch("src.llms.llm.get_llm_by_type", return_value=MagicMock()):
     from langgraph.types import Command
-    from src.graph.nodes import background_investigation_node
+    from src.graph.nodes import (
+        _cancel_early_steps,
+        _collect_early_steps,
+        background_investigation_node,
+        coordinator_node,
+        planner_node,
+        reporter_node,
+        research_team_node,
+    )
     from src.config import SearchEngine
-    from langchain_core.messages import HumanMessage
+    from src.config.agents import AGENT_LLM_CASCADE
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.language_models.fake_chat_models import (
+        GenericFakeChatModel,
+    )
+    from src.prompts.planner_model import Plan, Step
 
 # Mock data
 MOCK_SEARCH_RESULTS = [
@@ -28,6 +42,7 @@ def mock_state():
 def mock_configurable():
     mock = MagicMock()
     mock.max_search_results = 5
+    mock.background_investigation_timeout = 30
     return mock
 
 
@@ -50,7 +65,8 @@ def patch_config_from_runnable_config(mock_configurable):
 def mock_tavily_search():
     with patch("src.graph.nodes.LoggedTavilySearch") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -61,7 +77,8 @@ def mock_tavily_search():
 def mock_web_search_tool():
     with patch("src.graph.nodes.get_web_search_tool") as mock:
         instance = mock.return_value
-        instance.invoke.return_value = [
+        instance.ainvoke = AsyncMock()
+        instance.ainvoke.return_value = [
             {"title": "Test Title 1", "content": "Test Content 1"},
             {"title": "Test Title 2", "content": "Test Content 2"},
         ]
@@ -79,7 +96,7 @@ def test_background_investigation_node_tavily(
 ):
     """Test background_investigation_node with Tavily search engine"""
     with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", search_engine):
-        result = background_investigation_node(mock_state, mock_config)
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, Command)
@@ -94,14 +111,14 @@ def test_background_investigation_node_tavily(
         assert isinstance(results, list)
 
         if search_engine == SearchEngine.TAVILY:
-            mock_tavily_search.return_value.invoke.assert_called_once_with(
+            mock_tavily_search.return_value.ainvoke.assert_called_once_with(
                 {"query": "test query"}
             )
             assert len(results) == 2
             assert results[0]["title"] == "Test Title 1"
             assert results[0]["content"] == "Test Content 1"
         else:
-            mock_web_search_tool.return_value.invoke.assert_called_once_with(
+            mock_web_search_tool.return_value.ainvoke.assert_called_once_with(
                 "test query"
             )
             assert len(results) == 2
@@ -113,9 +130,9 @@ def test_background_investigation_node_malformed_response(
     """Test background_investigation_node with malformed Tavily response"""
     with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY):
         # Mock a malformed response
-        mock_tavily_search.return_value.invoke.return_value = "invalid response"
+        mock_tavily_search.return_value.ainvoke.return_value = "invalid response"
 
-        result = background_investigation_node(mock_state, mock_config)
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
 
         # Verify the result structure
         assert isinstance(result, Command)
@@ -128,3 +145,468 @@ def test_background_investigation_node_malformed_response(
         # Parse and verify the JSON content
         results = json.loads(update["background_investigation_results"])
         assert results is None
+
+
+def test_background_investigation_node_timeout(
+    mock_state,
+    mock_tavily_search,
+    mock_configurable,
+    patch_config_from_runnable_config,
+    mock_config,
+):
+    """Test background_investigation_node carries on to planning on timeout"""
+
+    async def slow_search(*args, **kwargs):
+        await asyncio.sleep(10)
+
+    mock_configurable.background_investigation_timeout = 0.05
+    mock_tavily_search.return_value.ainvoke.side_effect = slow_search
+    with patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY):
+        result = asyncio.run(background_investigation_node(mock_state, mock_config))
+
+    assert result.goto == "planner"
+    assert json.loads(result.update["background_investigation_results"]) is None
+
+
+def _mock_coordinator_llm(tool_calls):
+    async def ainvoke(messages):
+        # Let the speculative investigation start meanwhile
+        await asyncio.sleep(0.01)
+        return AIMessage(content="", tool_calls=tool_calls)
+
+    llm = MagicMock()
+    llm.bind_tools.return_value.with_config.return_value.ainvoke = ainvoke
+    return llm
+
+
+@pytest.mark.parametrize("speculative", [False, True])
+def test_coordinator_node_handoff(
+    mock_state,
+    mock_tavily_search,
+    patch_config_from_runnable_config,
+    mock_config,
+    speculative,
+):
+    """Test coordinator_node hands off with or without speculative investigation"""
+    state = {
+        **mock_state,
+        "enable_background_investigation": True,
+        "enable_speculative_investigation": speculative,
+    }
+    handoff = {
+        "name": "handoff_to_planner",
+        "args": {"task_title": "test query", "locale": "zh-CN"},
+        "id": "call_1",
+    }
+    with (
+        patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch(
+            "src.graph.nodes.get_llm_by_type",
+            return_value=_mock_coordinator_llm([handoff]),
+        ),
+    ):
+        result = asyncio.run(coordinator_node(state, mock_config))
+
+    assert result.update["locale"] == "zh-CN"
+    if speculative:
+        assert result.goto == "planner"
+        results = json.loads(result.update["background_investigation_results"])
+        assert results[0]["title"] == "Test Title 1"
+    else:
+        assert result.goto == "background_investigator"
+        assert "background_investigation_results" not in result.update
+        mock_tavily_search.return_value.ainvoke.assert_not_called()
+
+
+def test_coordinator_node_cancels_speculative_investigation(
+    mock_state,
+    mock_tavily_search,
+    patch_config_from_runnable_config,
+    mock_config,
+):
+    """Test coordinator_node cancels the speculative search when it ends"""
+    cancelled = False
+
+    async def slow_search(*args, **kwargs):
+        nonlocal cancelled
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled = True
+            raise
+
+    async def run():
+        result = await coordinator_node(state, mock_config)
+        await asyncio.sleep(0)
+        return result
+
+    mock_tavily_search.return_value.ainvoke.side_effect = slow_search
+    state = {
+        **mock_state,
+        "enable_background_investigation": True,
+        "enable_speculative_investigation": True,
+    }
+    with (
+        patch("src.graph.nodes.SELECTED_SEARCH_ENGINE", SearchEngine.TAVILY),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch(
+            "src.graph.nodes.get_llm_by_type", return_value=_mock_coordinator_llm([])
+        ),
+    ):
+        result = asyncio.run(run())
+
+    assert result.goto == "__end__"
+    assert "background_investigation_results" not in result.update
+    assert cancelled
+
+
+def test_coordinator_node_escalates_answers_without_handoff(
+    mock_state, patch_config_from_runnable_config, mock_config
+):
+    """Test coordinator_node escalates to the next model of its cascade"""
+    handoff = {"name": "handoff_to_planner", "args": {"locale": "en-US"}, "id": "1"}
+    llms = {
+        "fast": _mock_coordinator_llm([]),
+        "basic": _mock_coordinator_llm([handoff]),
+    }
+    with (
+        patch.dict(AGENT_LLM_CASCADE, {"coordinator": ["fast", "basic"]}),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch("src.graph.nodes.get_llm_by_type", side_effect=llms.get),
+    ):
+        result = asyncio.run(coordinator_node(mock_state, mock_config))
+
+    assert result.goto == "planner"
+
+
+def _plan_json(steps):
+    return json.dumps(
+        {
+            "locale": "en-US",
+            "has_enough_context": False,
+            "thought": "thought",
+            "title": "Plan",
+            "steps": steps,
+        }
+    )
+
+
+@pytest.mark.parametrize("auto_accepted_plan", [False, True])
+def test_planner_node_starts_steps_early(mock_config, auto_accepted_plan):
+    """Test planner_node starts the steps without dependencies while streaming"""
+    steps = [
+        {
+            "need_web_search": True,
+            "title": f"Step {i}",
+            "description": "description",
+            "step_type": step_type,
+        }
+        for i, step_type in enumerate(["research", "processing", "research"])
+    ]
+    started = []
+
+    async def researcher(state, config):
+        index = state["current_step_index"]
+        started.append(index)
+        assert state["current_plan"].steps[index].title == f"Step {index}"
+        return Command(
+            update={
+                "messages": [
+                    HumanMessage(content=f"Result {index}", name="researcher")
+                ],
+                "step_results": [{"step_index": index, "execution_res": "Result"}],
+            },
+            goto="research_team",
+        )
+
+    configurable = MagicMock(max_plan_iterations=1, max_concurrent_steps=3)
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=_plan_json(steps))]))
+    state = {"messages": [], "auto_accepted_plan": auto_accepted_plan}
+    with (
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch("src.graph.nodes.get_llm_by_type", return_value=llm),
+        patch("src.graph.nodes.researcher_node", side_effect=researcher),
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+    ):
+        result = asyncio.run(planner_node(state, mock_config))
+
+    assert result.goto == "human_feedback"
+    assert result.update["current_plan"].model_dump(
+        include={"steps": {"__all__": set(steps[0])}}
+    ) == {"steps": steps}
+    if auto_accepted_plan:
+        # The research step after the processing step depends on it
+        assert started == [0]
+        assert result.update["step_results"] == [
+            {"step_index": 0, "execution_res": "Result"}
+        ]
+        assert result.update["messages"][-1].content == "Result 0"
+    else:
+        assert started == []
+        assert result.update["step_results"] == []
+
+
+def test_planner_node_only_starts_early_steps_from_the_final_cascade_model():
+    """Steps of a plan that may be escalated from never start early"""
+    steps = {
+        llm_type: [
+            {
+                "need_web_search": True,
+                "title": f"{llm_type} step",
+                "description": "description",
+                "step_type": "research",
+            }
+        ]
+        for llm_type in ("fast", "basic")
+    }
+    llms = {
+        llm_type: GenericFakeChatModel(
+            messages=iter([AIMessage(content=_plan_json(steps[llm_type]))])
+        )
+        for llm_type in steps
+    }
+    started = []
+
+    async def researcher(state, config):
+        step = state["current_plan"].steps[state["current_step_index"]]
+        started.append(step.title)
+        return Command(
+            update={
+                "messages": [HumanMessage(content=f"Result of {step.title}")],
+                "step_results": [{"step_index": 0, "execution_res": "Result"}],
+            },
+            goto="research_team",
+        )
+
+    configurable = MagicMock(max_plan_iterations=1, max_concurrent_steps=3)
+    state = {"messages": [], "auto_accepted_plan": True}
+    with (
+        patch.dict(AGENT_LLM_CASCADE, {"planner": ["fast", "basic"]}),
+        patch("src.graph.nodes.apply_prompt_template", return_value=[]),
+        patch("src.graph.nodes.get_llm_by_type", side_effect=llms.get),
+        # The plan of the fast model is escalated from once complete
+        patch(
+            "src.graph.nodes._is_valid_plan",
+            side_effect=lambda content: "fast step" not in content,
+        ),
+        patch("src.graph.nodes.researcher_node", side_effect=researcher),
+        patch(
+            "src.graph.nodes.Configuration.from_runnable_config",
+            return_value=configurable,
+        ),
+    ):
+        result = asyncio.run(planner_node(state, MagicMock()))
+
+    assert started == ["basic step"]
+    assert result.update["current_plan"].steps[0].title == "basic step"
+    assert result.update["step_results"] == [
+        {"step_index": 0, "execution_res": "Result"}
+    ]
+
+
+def test_cancelled_early_steps_are_awaited():
+    """Cancelled early steps have ended once they are cancelled"""
+    cleaned_up = []
+
+    async def step():
+        try:
+            await asyncio.sleep(10)
+        finally:
+            await asyncio.sleep(0)
+            cleaned_up.append(True)
+
+    async def run():
+        task = asyncio.create_task(step())
+        await asyncio.sleep(0)
+        await _cancel_early_steps({0: (_make_plan(["research"]).steps[0], task)})
+        return task
+
+    task = asyncio.run(run())
+    assert task.cancelled() and cleaned_up == [True]
+
+
+def test_early_results_are_only_kept_for_unchanged_steps():
+    """A result is only reused for a final step with the same instructions"""
+    early_plan = _make_plan(["research", "research"])
+    plan = _make_plan(["research", "research"])
+    plan.steps[1].description = "Another description"
+
+    async def run():
+        async def execute(index):
+            return Command(
+                update={
+                    "messages": [HumanMessage(content=f"Result {index}")],
+                    "step_results": [
+                        {"step_index": index, "execution_res": f"Result {index}"}
+                    ],
+                }
+            )
+
+        early_steps = {
+            index: (early_plan.steps[index], asyncio.create_task(execute(index)))
+            for index in range(2)
+        }
+        return await _collect_early_steps(early_steps, plan)
+
+    step_messages, step_results = asyncio.run(run())
+    assert [message.content for message in step_messages] == ["Result 0"]
+    assert step_results == [{"step_index": 0, "execution_res": "Result 0"}]
+
+
+def _make_plan(step_types):
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="Test thought",
+        title="Test Plan",
+        steps=[
+            Step(
+                need_web_search=step_type == "research",
+                title=f"Step {i}",
+                description=f"Description {i}",
+                step_type=step_type,
+            )
+            for i, step_type in enumerate(step_types)
+        ],
+    )
+
+
+def _mock_step_agents(delays, started, finished):
+    """Mock the researcher and coder, each step taking its delay to execute."""
+
+    async def execute(state, config):
+        index = state["current_step_index"]
+        started.append(index)
+        await asyncio.sleep(delays[index])
+        finished.append(index)
+        return Command(
+            update={
+                "messages": [HumanMessage(content=f"Result {index}")],
+                "step_results": [
+                    {"step_index": index, "execution_res": f"Result {index}"}
+                ],
+            },
+            goto="research_team",
+        )
+
+    return (
+        patch("src.graph.nodes.researcher_node", side_effect=execute),
+        patch("src.graph.nodes.coder_node", side_effect=execute),
+    )
+
+
+def test_research_team_node_starts_steps_when_their_dependencies_are_done():
+    """A step starts once its dependencies are done, not once a batch is"""
+    plan = _make_plan(["research", "research", "research", "processing"])
+    plan.steps[1].id = "b"
+    plan.steps[2].id = "c"
+    plan.steps[2].depends_on = ["b"]
+    plan.steps[3].id = "d"
+    plan.steps[3].depends_on = ["b", "c"]
+    state = {"messages": [], "current_plan": plan, "observations": []}
+    config = {"configurable": {"max_concurrent_steps": 2}}
+    started, finished = [], []
+
+    researcher, coder = _mock_step_agents([0.2, 0.01, 0.01, 0.01], started, finished)
+    with researcher, coder:
+        result = asyncio.run(research_team_node(state, config))
+
+    # The critical path b, c, d goes first, and c and d do not wait for step 0
+    assert started[:2] == [1, 0]
+    assert finished == [1, 2, 3, 0]
+    assert result.goto == "planner"
+    assert result.update["observations"] == [f"Result {i}" for i in range(4)]
+    assert [m.content for m in result.update["messages"]] == [
+        f"Result {i}" for i in range(4)
+    ]
+    assert result.update["step_results"] is None
+
+
+def test_research_team_node_merges_early_step_results():
+    """Results of the steps the planner started early are kept"""
+    plan = _make_plan(["research", "research", "processing"])
+    state = {
+        "messages": [],
+        "current_plan": plan,
+        "observations": [],
+        "step_results": [
+            {"step_index": 1, "execution_res": "Result 1"},
+            {"step_index": 0, "execution_res": "Result 0"},
+        ],
+    }
+    started, finished = [], []
+
+    researcher, coder = _mock_step_agents([0, 0, 0], started, finished)
+    with researcher, coder:
+        result = asyncio.run(research_team_node(state, {}))
+
+    # The processing step runs alone once the research it may rely on is done
+    assert started == [2]
+    assert result.update["observations"] == ["Result 0", "Result 1", "Result 2"]
+    assert [step.execution_res for step in plan.steps] == [
+        "Result 0",
+        "Result 1",
+        "Result 2",
+    ]
+
+
+def test_research_team_node_cancels_the_other_steps_when_one_fails():
+    """A failing step fails the node, and the steps still running are cancelled"""
+    plan = _make_plan(["research", "research"])
+    state = {"messages": [], "current_plan": plan, "observations": []}
+    cancelled = []
+
+    async def execute(state, config):
+        index = state["current_step_index"]
+        if index == 0:
+            raise ValueError("failed")
+        try:
+            await asyncio.sleep(10)
+        except asyncio.CancelledError:
+            cancelled.append(index)
+            raise
+
+    config = {"configurable": {"max_concurrent_steps": 2}}
+    with patch("src.graph.nodes.researcher_node", side_effect=execute):
+        with pytest.raises(ValueError):
+            asyncio.run(research_team_node(state, config))
+    assert cancelled == [1]
+
+
+def test_reporter_node_streams_final_report():
+    """The reporter assembles the final report from the streamed chunks"""
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content="Final report")]))
+    state = {
+        "messages": [],
+        "current_plan": _make_plan([]),
+        "observations": ["Observation 1"],
+    }
+
+    with patch("src.graph.nodes.get_llm_by_type", return_value=llm):
+        result = asyncio.run(reporter_node(state, {}))
+
+    assert result == {"final_report": "Final report"}
+
+
+def test_tools_of_closed_mcp_sessions_are_evicted():
+    from mcp.types import Tool as MCPTool
+
+    from src.graph import nodes
+
+    mcp_tool = MCPTool(name="pid", description="Get the pid", inputSchema={})
+    session, other_session = MagicMock(), MagicMock()
+    tool = nodes._get_mcp_tool(session, "server", mcp_tool)
+    assert nodes._get_mcp_tool(session, "server", mcp_tool) is tool
+    nodes._get_mcp_tool(other_session, "server", mcp_tool)
+
+    nodes._evict_mcp_tools(session)
+    assert nodes._get_mcp_tool(session, "server", mcp_tool) is not tool
+    nodes._evict_mcp_tools(session)
+    nodes._evict_mcp_tools(other_session)
+    assert not any(
+        key[0] in (id(session), id(other_session)) for key in nodes._mcp_tools
+    )
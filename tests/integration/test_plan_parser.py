@@ -0,0 +1,88 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+import json
+
+import pytest
+from pydantic import ValidationError
+
+from src.graph.plan_parser import IncrementalPlanParser, parse_plan
+
+PLAN = {
+    "locale": "en-US",
+    "has_enough_context": False,
+    "thought": 'A "quoted" thought, with {braces} and [brackets]',
+    "title": "Plan",
+    "steps": [
+        {
+            "need_web_search": True,
+            "title": "First step",
+            "description": 'Find a } and a \\" in a string',
+            "step_type": "research",
+        },
+        {
+            "id": "step-2",
+            "depends_on": ["step-1"],
+            "need_web_search": False,
+            "title": "Second step",
+            "description": "Process the data",
+            "step_type": "processing",
+        },
+    ],
+}
+
+
+def test_steps_are_emitted_as_soon_as_they_complete():
+    content = "```json\n" + json.dumps(PLAN, indent=2) + "\n```"
+    first_step_end = content.index("}", content.index('"research"')) + 1
+    parser = IncrementalPlanParser()
+
+    assert parser.feed(content[: first_step_end - 1]) == []
+    assert parser.fields == {
+        "locale": "en-US",
+        "has_enough_context": False,
+        "thought": PLAN["thought"],
+        "title": "Plan",
+    }
+    assert [step.title for step in parser.feed(content[first_step_end - 1 :])] == [
+        "First step",
+        "Second step",
+    ]
+    assert parser.steps[1].depends_on == ["step-1"]
+
+
+def test_chunk_boundaries_do_not_matter():
+    content = json.dumps(PLAN)
+    parser = IncrementalPlanParser()
+    steps = []
+    for char in content:
+        steps += parser.feed(char)
+    assert [step.title for step in steps] == ["First step", "Second step"]
+    partial_plan = parser.get_partial_plan()
+    assert partial_plan.title == "Plan"
+    assert partial_plan.steps[0].description == PLAN["steps"][0]["description"]
+
+
+def test_invalid_steps_stop_the_stream_of_steps():
+    plan = {**PLAN, "steps": [{"title": "Incomplete"}, *PLAN["steps"]]}
+    parser = IncrementalPlanParser()
+    assert parser.feed(json.dumps(plan)) == []
+    assert parser.fields["has_enough_context"] is False
+
+
+def test_parse_plan_uses_valid_json_as_is():
+    plan = parse_plan(json.dumps(PLAN))
+    assert plan.thought == PLAN["thought"]
+    assert [step.title for step in plan.steps] == ["First step", "Second step"]
+
+
+def test_parse_plan_repairs_invalid_json():
+    content = "```json\n" + json.dumps(PLAN, indent=2)[:-2] + ",\n```"
+    assert parse_plan(content).steps[1].depends_on == ["step-1"]
+
+
+def test_parse_plan_rejects_invalid_plans():
+    with pytest.raises(ValidationError):
+        parse_plan(json.dumps({"title": "No steps"}))
+    with pytest.raises(ValidationError):
+        parse_plan("Not a plan")
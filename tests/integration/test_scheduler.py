@@ -0,0 +1,108 @@
+# Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
+# SPDX-License-Identifier: MIT
+
+from src.graph.scheduler import (
+    get_context_steps,
+    get_ready_steps,
+    get_step_dependencies,
+)
+from src.prompts.planner_model import Plan, Step
+
+
+def _make_plan(steps):
+    return Plan(
+        locale="en-US",
+        has_enough_context=False,
+        thought="Test thought",
+        title="Test Plan",
+        steps=[
+            Step(
+                need_web_search=step_type == "research",
+                title=f"Step {i}",
+                description=f"Description {i}",
+                step_type=step_type,
+                **fields,
+            )
+            for i, (step_type, fields) in enumerate(steps)
+        ],
+    )
+
+
+def test_implicit_dependencies_without_step_ids():
+    """Plans without ids treat processing steps as barriers"""
+    plan = _make_plan(
+        [("research", {}), ("research", {}), ("processing", {}), ("research", {})]
+    )
+    assert get_step_dependencies(plan) == [set(), set(), {0, 1}, {2}]
+    assert get_ready_steps(plan, 5) == [0, 1]
+
+
+def test_ready_steps_follow_explicit_dependencies():
+    """Steps become ready as soon as the steps they depend on are done"""
+    plan = _make_plan(
+        [
+            ("research", {"id": "a"}),
+            ("research", {"id": "b"}),
+            ("processing", {"id": "c", "depends_on": ["a"]}),
+        ]
+    )
+    plan.steps[0].execution_res = "Result a"
+    assert get_ready_steps(plan, 5) == [1, 2]
+
+
+def test_partial_plans_wait_for_steps_yet_to_come(caplog):
+    """A dependency on a step not streamed yet is not ready rather than invalid"""
+    plan = _make_plan(
+        [
+            ("research", {"id": "a"}),
+            ("research", {"id": "b", "depends_on": ["c"]}),
+        ]
+    )
+    assert get_step_dependencies(plan, partial=True) == [set(), {2}]
+    assert "Ignoring invalid dependency" not in caplog.text
+    assert get_step_dependencies(plan) == [set(), set()]
+    assert "Ignoring invalid dependency 'c' of step 'Step 1'" in caplog.text
+
+
+def test_ready_steps_put_the_critical_path_first():
+    """The step heading the longest dependency chain is scheduled first"""
+    plan = _make_plan(
+        [
+            ("research", {"id": "a"}),
+            ("research", {"id": "b"}),
+            ("research", {"id": "c", "depends_on": ["b"]}),
+            ("processing", {"id": "d", "depends_on": ["c"]}),
+        ]
+    )
+    assert get_ready_steps(plan, 1) == [1]
+    assert get_ready_steps(plan, 2) == [1, 0]
+    # Running steps are not picked again, nor do they unblock their dependents
+    assert get_ready_steps(plan, 2, running=[1]) == [0]
+    assert get_ready_steps(plan, 2, running=[0, 1]) == []
+
+
+def test_ready_steps_fall_back_to_plan_order_on_cycles():
+    """A dependency cycle does not stall the plan"""
+    plan = _make_plan(
+        [
+            ("research", {"id": "a", "depends_on": ["b"]}),
+            ("research", {"id": "b", "depends_on": ["a"]}),
+        ]
+    )
+    assert get_ready_steps(plan, 2) == [0]
+    # The cycle is only broken once nothing is running anymore
+    assert get_ready_steps(plan, 2, running=[0]) == []
+
+
+def test_context_steps_only_include_dependencies():
+    """Only the findings a step depends on are passed to it"""
+    plan = _make_plan(
+        [
+            ("research", {"id": "a"}),
+            ("research", {"id": "b"}),
+            ("processing", {"id": "c", "depends_on": ["b", "unknown"]}),
+        ]
+    )
+    plan.steps[0].execution_res = "Result a"
+    plan.steps[1].execution_res = "Result b"
+    assert [step.title for step in get_context_steps(plan, 2)] == ["Step 1"]
@@ -1,7 +1,12 @@
 # Copyright (c) 2025 Bytedance Ltd. and/or its affiliates
 # SPDX-License-Identifier: MIT
 
+import logging
+import re
+from unittest.mock import patch
+
 import pytest
+from src.config.configuration import Configuration
 from src.prompts.template import get_prompt_template, apply_prompt_template
 
 
@@ -106,3 +111,53 @@ def test_current_time_format():
     assert any(
         line.strip().startswith("CURRENT_TIME:") for line in system_content.split("\n")
     )
+
+
+def test_static_templates_are_rendered_once():
+    """Test templates without variables are memoized"""
+    assert get_prompt_template("prose/prose_zap") is get_prompt_template(
+        "prose/prose_zap"
+    )
+
+
+def test_apply_prompt_template_with_configurable():
+    """Test configurable variables take precedence over state variables"""
+    test_state = {
+        "messages": [],
+        "locale": "zh-CN",
+        "max_step_num": 1,
+        "unused": object(),
+    }
+
+    messages = apply_prompt_template(
+        "planner", test_state, Configuration(max_step_num=7)
+    )
+    assert "NO MORE THAN 7 focused" in messages[0]["content"]
+    assert "locale = **zh-CN**" in messages[0]["content"]
+
+
+def test_apply_prompt_template_with_prefix_cache_layout():
+    """Test the prefix cache layout keeps the static content first"""
+    test_state = {"messages": [], "locale": "en-US"}
+    configurable = Configuration(
+        prompt_layout="prefix_cache", prompt_time_granularity=60
+    )
+
+    first = apply_prompt_template("researcher", test_state, configurable)[0]["content"]
+    second = apply_prompt_template("researcher", test_state, configurable)[0]["content"]
+    assert first.startswith("You are `researcher` agent")
+    # The time is rounded to the minute at the end of the prompt
+    assert re.search(r"\nCURRENT_TIME: .* \d{2}:\d{2}:00 .*\n---$", first)
+    assert first.split("CURRENT_TIME")[0] == second.split("CURRENT_TIME")[0]
+
+
+def test_prefix_stability_is_only_reported_when_debugging(caplog):
+    """Test the static prefix is only hashed for debug logs of the prefix cache layout"""
+    test_state = {"messages": [], "locale": "en-US"}
+    prefix_cache = Configuration(prompt_layout="prefix_cache")
+    with patch("src.prompts.template._report_prefix_stability") as report:
+        apply_prompt_template("researcher", test_state, prefix_cache)
+        with caplog.at_level(logging.DEBUG, logger="src.prompts.template"):
+            apply_prompt_template("researcher", test_state, Configuration())
+            apply_prompt_template("researcher", test_state, prefix_cache)
+    assert report.call_count == 1
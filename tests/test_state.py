@@ -76,6 +76,7 @@ def test_state_initialization():
     assert State.final_report == ""
     assert State.auto_accepted_plan is False
     assert State.enable_background_investigation is True
+    assert State.enable_speculative_investigation is False
     assert State.background_investigation_results is None
 
     # Verify state initialization